@@ -6,14 +6,17 @@ CREATE TABLE IF NOT EXISTS process_analysis_results (
     analysis_name VARCHAR(255) NOT NULL,
     process_type VARCHAR(100),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    result_data JSONB NOT NULL
+    result_data JSONB,
+    -- gzip-compressed response body (RESULT_STORAGE_FORMAT=gzip); result_data is NULL then
+    result_body BYTEA,
+    CHECK (result_data IS NOT NULL OR result_body IS NOT NULL)
 );
 
--- Create index on created_at for sorting
-CREATE INDEX IF NOT EXISTS idx_process_analysis_results_created_at ON process_analysis_results (created_at DESC);
+-- Create index on (created_at, analysis_id) for keyset pagination
+CREATE INDEX IF NOT EXISTS idx_process_analysis_results_created_at_id ON process_analysis_results (created_at DESC, analysis_id DESC);
 
--- Create index on process_type for filtering
-CREATE INDEX IF NOT EXISTS idx_process_analysis_results_process_type ON process_analysis_results (process_type);
+-- Create index on (process_type, created_at, analysis_id) for filtered keyset pagination
+CREATE INDEX IF NOT EXISTS idx_process_analysis_results_process_type_created_at ON process_analysis_results (process_type, created_at DESC, analysis_id DESC);
 
 -- Create organization_analysis_results table
 CREATE TABLE IF NOT EXISTS organization_analysis_results (
@@ -24,15 +27,20 @@ CREATE TABLE IF NOT EXISTS organization_analysis_results (
     filter_mode VARCHAR(50) NOT NULL,
     date_from TIMESTAMP,
     date_to TIMESTAMP,
-    handover_data JSONB NOT NULL,
-    workload_data JSONB NOT NULL,
-    performance_data JSONB NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    handover_data JSONB,
+    workload_data JSONB,
+    performance_data JSONB,
+    -- gzip-compressed response body (RESULT_STORAGE_FORMAT=gzip); the *_data columns are NULL then
+    result_body BYTEA,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CHECK (result_body IS NOT NULL OR (
+        handover_data IS NOT NULL AND workload_data IS NOT NULL AND performance_data IS NOT NULL
+    ))
 );
 
 -- Create indexes for organization_analysis_results
-CREATE INDEX IF NOT EXISTS idx_org_analysis_created_at ON organization_analysis_results (created_at DESC);
-CREATE INDEX IF NOT EXISTS idx_org_analysis_process_type ON organization_analysis_results (process_type);
+CREATE INDEX IF NOT EXISTS idx_org_analysis_created_at_id ON organization_analysis_results (created_at DESC, analysis_id DESC);
+CREATE INDEX IF NOT EXISTS idx_org_analysis_process_type_created_at ON organization_analysis_results (process_type, created_at DESC, analysis_id DESC);
 
 -- Create outcome_analysis_results table
 CREATE TABLE IF NOT EXISTS outcome_analysis_results (
@@ -42,21 +50,53 @@ CREATE TABLE IF NOT EXISTS outcome_analysis_results (
     metric_name VARCHAR(100) NOT NULL,
     analysis_type VARCHAR(50) NOT NULL,
     filter_config JSONB,
-    result_data JSONB NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    result_data JSONB,
+    -- gzip-compressed response body (RESULT_STORAGE_FORMAT=gzip); result_data is NULL then
+    result_body BYTEA,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CHECK (result_data IS NOT NULL OR result_body IS NOT NULL)
 );
 
 -- Create indexes for outcome_analysis_results
-CREATE INDEX IF NOT EXISTS idx_outcome_analysis_created_at ON outcome_analysis_results (created_at DESC);
-CREATE INDEX IF NOT EXISTS idx_outcome_analysis_process_type ON outcome_analysis_results (process_type);
+CREATE INDEX IF NOT EXISTS idx_outcome_analysis_created_at_id ON outcome_analysis_results (created_at DESC, analysis_id DESC);
+CREATE INDEX IF NOT EXISTS idx_outcome_analysis_process_type_created_at ON outcome_analysis_results (process_type, created_at DESC, analysis_id DESC);
 CREATE INDEX IF NOT EXISTS idx_outcome_analysis_metric_name ON outcome_analysis_results (metric_name);
-CREATE INDEX IF NOT EXISTS idx_outcome_result_data ON outcome_analysis_results USING gin (result_data);
 
--- Create JSONB indexes for performance
-CREATE INDEX IF NOT EXISTS idx_process_analysis_result_data ON process_analysis_results USING gin (result_data);
-CREATE INDEX IF NOT EXISTS idx_org_handover_data ON organization_analysis_results USING gin (handover_data);
-CREATE INDEX IF NOT EXISTS idx_org_workload_data ON organization_analysis_results USING gin (workload_data);
-CREATE INDEX IF NOT EXISTS idx_org_performance_data ON organization_analysis_results USING gin (performance_data);
+-- Result payloads are only read by analysis_id, so they have no GIN indexes
+-- (drop the ones created by earlier versions of this script)
+DROP INDEX IF EXISTS idx_outcome_result_data;
+DROP INDEX IF EXISTS idx_process_analysis_result_data;
+DROP INDEX IF EXISTS idx_org_handover_data;
+DROP INDEX IF EXISTS idx_org_workload_data;
+DROP INDEX IF EXISTS idx_org_performance_data;
+
+-- Create dbt_run_log table (written by the dbt on-run-end hook, read as data version by the result cache)
+CREATE TABLE IF NOT EXISTS dbt_run_log (
+    invocation_id VARCHAR(64) PRIMARY KEY,
+    command VARCHAR(20) NOT NULL,
+    finished_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_dbt_run_log_finished_at ON dbt_run_log (finished_at DESC);
+
+-- Create analysis_jobs table (background analyses, see job_service)
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    job_id UUID PRIMARY KEY,
+    job_type VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    params JSONB NOT NULL,
+    analysis_id UUID,
+    error TEXT,
+    -- API process running the job (host:pid:id) and its last lease renewal
+    owner VARCHAR(255),
+    heartbeat_at TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+-- Only unfinished jobs are looked up by status (lease renewal and expiry)
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_unfinished ON analysis_jobs (status)
+    WHERE status IN ('queued', 'running');
 
 -- Note: Indexes for dbt-managed tables (fct_event_log, fct_case_outcomes) should be created
 -- in dbt models or in a post-hook, not in init.sql, as these tables don't exist at init time.
@@ -0,0 +1,24 @@
+-- Migration: Background analysis jobs with owner and lease
+-- Date: 2026-10-17
+-- Purpose: Create analysis_jobs on databases initialized before background jobs, and add
+--          the owner / heartbeat_at columns used to fail only the jobs of API processes
+--          that stopped (expired lease) instead of every unfinished job.
+
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    job_id UUID PRIMARY KEY,
+    job_type VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    params JSONB NOT NULL,
+    analysis_id UUID,
+    error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+ALTER TABLE analysis_jobs ADD COLUMN IF NOT EXISTS owner VARCHAR(255);
+ALTER TABLE analysis_jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_unfinished ON analysis_jobs (status)
+    WHERE status IN ('queued', 'running');
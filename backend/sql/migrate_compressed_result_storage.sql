@@ -0,0 +1,38 @@
+-- Migration: Compressed storage of analysis results
+-- Date: 2026-10-17
+-- Purpose: Add the result_body column used by RESULT_STORAGE_FORMAT=gzip to databases
+--          created by earlier versions of init.sql. The result JSONB columns become
+--          nullable, as compressed rows keep their result in result_body only. The CHECK
+--          constraints get the names PostgreSQL gives the ones declared in init.sql.
+
+-- process_analysis_results
+ALTER TABLE process_analysis_results ADD COLUMN IF NOT EXISTS result_body BYTEA;
+ALTER TABLE process_analysis_results ALTER COLUMN result_data DROP NOT NULL;
+ALTER TABLE process_analysis_results
+    ADD CONSTRAINT process_analysis_results_check
+    CHECK (result_data IS NOT NULL OR result_body IS NOT NULL);
+
+-- organization_analysis_results
+ALTER TABLE organization_analysis_results ADD COLUMN IF NOT EXISTS result_body BYTEA;
+ALTER TABLE organization_analysis_results ALTER COLUMN handover_data DROP NOT NULL;
+ALTER TABLE organization_analysis_results ALTER COLUMN workload_data DROP NOT NULL;
+ALTER TABLE organization_analysis_results ALTER COLUMN performance_data DROP NOT NULL;
+ALTER TABLE organization_analysis_results
+    ADD CONSTRAINT organization_analysis_results_check
+    CHECK (result_body IS NOT NULL OR (
+        handover_data IS NOT NULL AND workload_data IS NOT NULL AND performance_data IS NOT NULL
+    ));
+
+-- outcome_analysis_results
+ALTER TABLE outcome_analysis_results ADD COLUMN IF NOT EXISTS result_body BYTEA;
+ALTER TABLE outcome_analysis_results ALTER COLUMN result_data DROP NOT NULL;
+ALTER TABLE outcome_analysis_results
+    ADD CONSTRAINT outcome_analysis_results_check
+    CHECK (result_data IS NOT NULL OR result_body IS NOT NULL);
+
+-- Result payloads are only read by analysis_id, so their GIN indexes are dropped
+DROP INDEX IF EXISTS idx_process_analysis_result_data;
+DROP INDEX IF EXISTS idx_org_handover_data;
+DROP INDEX IF EXISTS idx_org_workload_data;
+DROP INDEX IF EXISTS idx_org_performance_data;
+DROP INDEX IF EXISTS idx_outcome_result_data;
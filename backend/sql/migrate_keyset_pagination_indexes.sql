@@ -0,0 +1,31 @@
+-- Migration: Composite indexes for keyset pagination of analysis lists
+-- Date: 2026-10-17
+-- Purpose: Existing databases keep the single-column indexes created by earlier
+--          versions of init.sql (IF NOT EXISTS skips the new definitions under the
+--          old names), so create the (created_at, analysis_id) indexes under new
+--          names and drop the old ones.
+-- Run with psql outside a transaction block (CREATE INDEX CONCURRENTLY).
+
+-- process_analysis_results
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_process_analysis_results_created_at_id
+    ON process_analysis_results (created_at DESC, analysis_id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_process_analysis_results_process_type_created_at
+    ON process_analysis_results (process_type, created_at DESC, analysis_id DESC);
+DROP INDEX CONCURRENTLY IF EXISTS idx_process_analysis_results_created_at;
+DROP INDEX CONCURRENTLY IF EXISTS idx_process_analysis_results_process_type;
+
+-- organization_analysis_results
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_org_analysis_created_at_id
+    ON organization_analysis_results (created_at DESC, analysis_id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_org_analysis_process_type_created_at
+    ON organization_analysis_results (process_type, created_at DESC, analysis_id DESC);
+DROP INDEX CONCURRENTLY IF EXISTS idx_org_analysis_created_at;
+DROP INDEX CONCURRENTLY IF EXISTS idx_org_analysis_process_type;
+
+-- outcome_analysis_results
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_outcome_analysis_created_at_id
+    ON outcome_analysis_results (created_at DESC, analysis_id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_outcome_analysis_process_type_created_at
+    ON outcome_analysis_results (process_type, created_at DESC, analysis_id DESC);
+DROP INDEX CONCURRENTLY IF EXISTS idx_outcome_analysis_created_at;
+DROP INDEX CONCURRENTLY IF EXISTS idx_outcome_analysis_process_type;
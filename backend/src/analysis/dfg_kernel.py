@@ -0,0 +1,315 @@
+"""
+Single-pass directly-follows kernel.
+
+Computes node frequencies, edge frequencies and edge waiting times from a
+columnar event log in one vectorized pass. The log is sorted by case and
+timestamp, so the directly-follows relation is the log shifted by one event
+and masked at case boundaries. Results are kept as dense activity x activity
+count matrices; a NetworkX graph is only built when a caller asks for one.
+"""
+
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from src.models.event_log import ColumnarEventLog
+
+NANOSECONDS_PER_HOUR = 3600 * 10**9
+
+
+class Transitions(NamedTuple):
+    """Directly-follows pairs of a log (one entry per consecutive event pair)."""
+
+    case_codes: np.ndarray
+    sources: np.ndarray
+    targets: np.ndarray
+    waiting_time_hours: np.ndarray
+    source_index: np.ndarray
+
+
+def find_transitions(log: ColumnarEventLog) -> Transitions:
+    """
+    Find all directly-follows pairs using shifted arrays.
+
+    Args:
+        log: Columnar event log sorted by case and timestamp
+
+    Returns:
+        Transitions with the case, source/target activity codes, waiting time
+        in hours and the event index of the source event
+    """
+    same_case = log.case_codes[1:] == log.case_codes[:-1]
+    source_index = np.flatnonzero(same_case)
+    target_index = source_index + 1
+    waiting_time_ns = log.timestamps[target_index] - log.timestamps[source_index]
+
+    return Transitions(
+        case_codes=log.case_codes[source_index],
+        sources=log.activity_codes[source_index],
+        targets=log.activity_codes[target_index],
+        waiting_time_hours=waiting_time_ns / NANOSECONDS_PER_HOUR,
+        source_index=source_index,
+    )
+
+
+class DFGCounts:
+    """
+    Directly-follows counts over a fixed activity dictionary.
+
+    Attributes:
+        activities: Activity labels; index i is activity code i
+        node_frequency: Event count per activity, shape (n,)
+        edge_frequency: Transition count per (source, target), shape (n, n)
+        waiting_time_sum: Sum of waiting hours per (source, target), shape (n, n)
+        waiting_time_count: Number of waiting times per (source, target), shape (n, n)
+    """
+
+    def __init__(
+        self,
+        activities: np.ndarray,
+        node_frequency: np.ndarray,
+        edge_frequency: np.ndarray,
+        waiting_time_sum: np.ndarray,
+        waiting_time_count: np.ndarray,
+    ):
+        self.activities = activities
+        self.node_frequency = node_frequency
+        self.edge_frequency = edge_frequency
+        self.waiting_time_sum = waiting_time_sum
+        self.waiting_time_count = waiting_time_count
+
+    @classmethod
+    def from_aggregates(cls, nodes: pd.DataFrame, edges: pd.DataFrame) -> "DFGCounts":
+        """
+        Build counts from pre-aggregated node and edge rows.
+
+        Used when the directly-follows relation is aggregated outside Python
+        (e.g. inside PostgreSQL).
+
+        Args:
+            nodes: Rows with activity and frequency; row order defines the
+                activity codes
+            edges: Rows with source, target, frequency, waiting_time_sum and
+                waiting_time_count
+
+        Returns:
+            DFGCounts over the activities in ``nodes``
+        """
+        activities = nodes["activity"].to_numpy(dtype=object)
+        n = len(activities)
+        codes = pd.Index(activities)
+        sources = codes.get_indexer(edges["source"])
+        targets = codes.get_indexer(edges["target"])
+        edge_index = sources.astype(np.int64) * n + targets
+
+        def _matrix(values: pd.Series, dtype) -> np.ndarray:
+            return (
+                np.bincount(
+                    edge_index,
+                    weights=values.to_numpy(dtype=np.float64),
+                    minlength=n * n,
+                )
+                .reshape(n, n)
+                .astype(dtype)
+            )
+
+        return cls(
+            activities=activities,
+            node_frequency=nodes["frequency"].to_numpy(dtype=np.int64),
+            edge_frequency=_matrix(edges["frequency"], np.int64),
+            waiting_time_sum=_matrix(edges["waiting_time_sum"], np.float64),
+            waiting_time_count=_matrix(edges["waiting_time_count"], np.int64),
+        )
+
+    @property
+    def n_activities(self) -> int:
+        return len(self.activities)
+
+    def nodes(self) -> Iterator[Tuple[str, int]]:
+        """Yield (activity, frequency) for every activity that occurs."""
+        for code in np.flatnonzero(self.node_frequency):
+            yield self.activities[code], int(self.node_frequency[code])
+
+    def edge_positions(self) -> np.ndarray:
+        """Flat (source * n + target) index of every edge, in edges() order."""
+        return np.flatnonzero(self.edge_frequency)
+
+    def edges(self) -> Iterator[Tuple[str, str, int, float]]:
+        """Yield (source, target, frequency, avg_waiting_time_hours) per edge."""
+        n = self.n_activities
+        for index in self.edge_positions():
+            source, target = divmod(int(index), n)
+            count = self.waiting_time_count[source, target]
+            avg_waiting_time = (
+                self.waiting_time_sum[source, target] / count if count > 0 else 0.0
+            )
+            yield (
+                self.activities[source],
+                self.activities[target],
+                int(self.edge_frequency[source, target]),
+                float(avg_waiting_time),
+            )
+
+    def edge_dict(self) -> Dict[Tuple[str, str], int]:
+        """Edge frequencies keyed by (source, target)."""
+        return {(s, t): frequency for s, t, frequency, _ in self.edges()}
+
+    def to_networkx(self, include_waiting_time: bool = True) -> nx.DiGraph:
+        """
+        Build a NetworkX DiGraph from the counts.
+
+        Args:
+            include_waiting_time: Add avg_waiting_time_hours (rounded to 2
+                decimals) to every edge
+
+        Returns:
+            DiGraph with node/edge frequency attributes
+        """
+        dfg = nx.DiGraph()
+        for activity, frequency in self.nodes():
+            dfg.add_node(activity, frequency=frequency)
+        for source, target, frequency, avg_waiting_time in self.edges():
+            if include_waiting_time:
+                dfg.add_edge(
+                    source,
+                    target,
+                    frequency=frequency,
+                    avg_waiting_time_hours=round(avg_waiting_time, 2),
+                )
+            else:
+                dfg.add_edge(source, target, frequency=frequency)
+        return dfg
+
+    def to_react_flow(self) -> Dict:
+        """
+        Convert the counts to React Flow compatible JSON format.
+
+        Produces the same structure as convert_dfg_to_react_flow without
+        building an intermediate graph.
+        """
+        nodes = [
+            {
+                "id": activity,
+                "type": "actionNode",
+                "data": {"label": activity, "frequency": frequency},
+            }
+            for activity, frequency in self.nodes()
+        ]
+        edges = [
+            {
+                "id": f"edge-{i}",
+                "source": source,
+                "target": target,
+                "data": {
+                    "frequency": frequency,
+                    "avg_waiting_time_hours": round(avg_waiting_time, 2),
+                },
+            }
+            for i, (source, target, frequency, avg_waiting_time) in enumerate(
+                self.edges(), start=1
+            )
+        ]
+        return {"nodes": nodes, "edges": edges}
+
+
+def count_transitions(
+    activities: np.ndarray, activity_codes: np.ndarray, transitions: Transitions
+) -> DFGCounts:
+    """
+    Aggregate events and transitions into DFG count matrices.
+
+    Args:
+        activities: Activity labels of the log
+        activity_codes: Activity code of every event to count as a node
+        transitions: Transitions to count as edges
+
+    Returns:
+        DFGCounts over the full activity dictionary
+    """
+    n = len(activities)
+    size = n * n
+    edge_index = transitions.sources.astype(np.int64) * n + transitions.targets
+
+    node_frequency = np.bincount(activity_codes, minlength=n)
+    edge_frequency = np.bincount(edge_index, minlength=size).reshape(n, n)
+    waiting_time_sum = np.bincount(
+        edge_index, weights=transitions.waiting_time_hours, minlength=size
+    ).reshape(n, n)
+
+    return DFGCounts(
+        activities=activities,
+        node_frequency=node_frequency,
+        edge_frequency=edge_frequency,
+        waiting_time_sum=waiting_time_sum,
+        # Every in-memory transition carries a waiting time
+        waiting_time_count=edge_frequency.copy(),
+    )
+
+
+def directly_follows(log: ColumnarEventLog) -> DFGCounts:
+    """
+    Compute node frequencies, edge frequencies and waiting times in one pass.
+
+    Args:
+        log: Columnar event log sorted by case and timestamp
+
+    Returns:
+        DFGCounts for the log
+    """
+    return count_transitions(log.activities, log.activity_codes, find_transitions(log))
+
+
+def directly_follows_by_group(
+    log: ColumnarEventLog, case_groups: np.ndarray, n_groups: int
+) -> List[DFGCounts]:
+    """
+    Compute one DFG per case group in a single pass over the log.
+
+    Every transition is labelled with the group of its case and counted into
+    a (group, source, target) matrix, so splitting the log into segments costs
+    no extra scans.
+
+    Args:
+        log: Columnar event log sorted by case and timestamp
+        case_groups: Group number of every case, indexed by case code
+            (-1 excludes the case from all groups)
+        n_groups: Number of groups
+
+    Returns:
+        List of DFGCounts, one per group, sharing the log's activity dictionary
+    """
+    n = len(log.activities)
+    transitions = find_transitions(log)
+
+    event_groups = case_groups[log.case_codes].astype(np.int64)
+    in_group = event_groups >= 0
+    node_frequency = np.bincount(
+        event_groups[in_group] * n + log.activity_codes[in_group],
+        minlength=n_groups * n,
+    ).reshape(n_groups, n)
+
+    transition_groups = case_groups[transitions.case_codes].astype(np.int64)
+    in_group = transition_groups >= 0
+    edge_index = (
+        transition_groups[in_group] * n + transitions.sources[in_group]
+    ) * n + transitions.targets[in_group]
+    edge_frequency = np.bincount(edge_index, minlength=n_groups * n * n).reshape(
+        n_groups, n, n
+    )
+    waiting_time_sum = np.bincount(
+        edge_index,
+        weights=transitions.waiting_time_hours[in_group],
+        minlength=n_groups * n * n,
+    ).reshape(n_groups, n, n)
+
+    return [
+        DFGCounts(
+            activities=log.activities,
+            node_frequency=node_frequency[group],
+            edge_frequency=edge_frequency[group],
+            waiting_time_sum=waiting_time_sum[group],
+            waiting_time_count=edge_frequency[group].copy(),
+        )
+        for group in range(n_groups)
+    ]
@@ -0,0 +1,318 @@
+"""
+Parallel map-reduce of directly-follows aggregations.
+
+Cases are partitioned by a hash of their case_id, so every case and all of
+its transitions belong to exactly one partition. Each worker process counts
+the transitions of one partition; the partial counts and waiting-time sums
+are merged by addition (and the first-seen positions by minimum), which gives
+the same aggregate as a single pass over the whole log.
+
+The parent orders the events by partition once (a stable sort, so every
+partition keeps its case and time order) and copies the reordered columns into
+shared memory blocks that the workers attach to by name. Each worker reads the
+contiguous slice of its partition, so the log is never pickled or scanned per
+worker; only the compact partial aggregates travel back to the parent.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from src.models.event_log import ColumnarEventLog
+from src.analysis.dfg_kernel import NANOSECONDS_PER_HOUR, DFGCounts
+
+# Analyses run in offload worker processes (OFFLOAD_WORKERS, see
+# src.services.offload), each with an aggregation pool of its own, so by
+# default the CPUs are split between them instead of oversubscribed
+_OFFLOAD_WORKERS = max(int(os.getenv("OFFLOAD_WORKERS", "2")), 1)
+
+# Worker processes of the aggregation pool (of every offload worker)
+PARALLEL_WORKERS = int(
+    os.getenv(
+        "PARALLEL_WORKERS", str(max((os.cpu_count() or 1) // _OFFLOAD_WORKERS, 1))
+    )
+)
+
+# Logs with fewer events are aggregated in-process (pool overhead dominates)
+PARALLEL_MIN_EVENTS = int(os.getenv("PARALLEL_MIN_EVENTS", "100000"))
+
+_NOT_SEEN = np.iinfo(np.int64).max
+
+
+class TransitionCounts(NamedTuple):
+    """
+    Sparse directly-follows aggregates over a key dictionary of size n.
+
+    Attributes:
+        node_frequency: Events per key, shape (n,)
+        edge_keys: Flat (source * n + target) index of every edge, ascending
+        edge_frequency: Transitions per edge
+        waiting_time_sum: Sum of waiting hours per edge
+        first_seen: Log position of the first source event of every edge
+    """
+
+    node_frequency: np.ndarray
+    edge_keys: np.ndarray
+    edge_frequency: np.ndarray
+    waiting_time_sum: np.ndarray
+    first_seen: np.ndarray
+
+
+def count_transitions_sparse(
+    case_codes: np.ndarray,
+    key_codes: np.ndarray,
+    timestamps: np.ndarray,
+    positions: np.ndarray,
+    n_keys: int,
+    distinct_keys: bool = False,
+) -> TransitionCounts:
+    """
+    Count events and transitions between keys of a log (or of whole cases of it).
+
+    Args:
+        case_codes: Case code of every event, events sorted by case and time
+        key_codes: Key of every event (activity, resource, ...); -1 is skipped
+        timestamps: Event timestamps as int64 nanoseconds
+        positions: Position of every event in the full log
+        n_keys: Size of the key dictionary
+        distinct_keys: Only count transitions between different keys
+            (e.g. handovers between resources)
+
+    Returns:
+        TransitionCounts of the events
+    """
+    node_frequency = np.bincount(key_codes[key_codes >= 0], minlength=n_keys)
+
+    source_index = np.flatnonzero(case_codes[1:] == case_codes[:-1])
+    sources = key_codes[source_index].astype(np.int64)
+    targets = key_codes[source_index + 1].astype(np.int64)
+    keep = (sources >= 0) & (targets >= 0)
+    if distinct_keys:
+        keep &= sources != targets
+    source_index = source_index[keep]
+
+    edge_keys, edge_index = np.unique(
+        sources[keep] * n_keys + targets[keep], return_inverse=True
+    )
+    waiting_time_hours = (
+        timestamps[source_index + 1] - timestamps[source_index]
+    ) / NANOSECONDS_PER_HOUR
+    first_seen = np.full(len(edge_keys), _NOT_SEEN, dtype=np.int64)
+    np.minimum.at(first_seen, edge_index, positions[source_index])
+
+    return TransitionCounts(
+        node_frequency=node_frequency.astype(np.int64),
+        edge_keys=edge_keys,
+        edge_frequency=np.bincount(edge_index, minlength=len(edge_keys)),
+        waiting_time_sum=np.bincount(
+            edge_index, weights=waiting_time_hours, minlength=len(edge_keys)
+        ),
+        first_seen=first_seen,
+    )
+
+
+def merge_transition_counts(parts: List[TransitionCounts]) -> TransitionCounts:
+    """Merge partial counts of disjoint case partitions."""
+    edge_keys, edge_index = np.unique(
+        np.concatenate([part.edge_keys for part in parts]), return_inverse=True
+    )
+    first_seen = np.full(len(edge_keys), _NOT_SEEN, dtype=np.int64)
+    np.minimum.at(
+        first_seen, edge_index, np.concatenate([part.first_seen for part in parts])
+    )
+
+    def merged_sum(values: List[np.ndarray]) -> np.ndarray:
+        return np.bincount(
+            edge_index, weights=np.concatenate(values), minlength=len(edge_keys)
+        )
+
+    return TransitionCounts(
+        node_frequency=np.sum([part.node_frequency for part in parts], axis=0),
+        edge_keys=edge_keys,
+        edge_frequency=merged_sum([p.edge_frequency for p in parts]).astype(np.int64),
+        waiting_time_sum=merged_sum([p.waiting_time_sum for p in parts]),
+        first_seen=first_seen,
+    )
+
+
+class _SharedArrays:
+    """NumPy arrays copied into shared memory blocks, attachable by name."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        # Picklable description: name -> (block name, dtype, shape)
+        self.spec: Dict[str, Tuple[str, str, Tuple[int, ...]]] = {}
+        try:
+            for name, array in arrays.items():
+                block = shared_memory.SharedMemory(
+                    create=True, size=max(array.nbytes, 1)
+                )
+                self._blocks.append(block)
+                np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+                self.spec[name] = (block.name, array.dtype.str, array.shape)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+def _partition_task(
+    spec: Dict[str, Tuple[str, str, Tuple[int, ...]]],
+    start: int,
+    end: int,
+    n_keys: int,
+    distinct_keys: bool,
+) -> TransitionCounts:
+    """Worker: count the transitions of the partition at [start, end) in shared memory."""
+    blocks = {name: shared_memory.SharedMemory(name=spec[name][0]) for name in spec}
+    try:
+        arrays = {
+            name: np.ndarray(shape, dtype, buffer=blocks[name].buf)[start:end]
+            for name, (_, dtype, shape) in spec.items()
+        }
+        counts = count_transitions_sparse(
+            arrays["case_codes"],
+            arrays["key_codes"],
+            arrays["timestamps"],
+            arrays["positions"],
+            n_keys,
+            distinct_keys,
+        )
+        # Views must be released before the blocks can be closed
+        del arrays
+        return counts
+    finally:
+        for block in blocks.values():
+            block.close()
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Shared worker pool (spawned, as the API process is multi-threaded)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PARALLEL_WORKERS, mp_context=get_context("spawn")
+            )
+        return _pool
+
+
+def parallel_transition_counts(
+    case_codes: np.ndarray,
+    case_labels: np.ndarray,
+    key_codes: np.ndarray,
+    timestamps: np.ndarray,
+    n_keys: int,
+    distinct_keys: bool = False,
+    workers: Optional[int] = None,
+) -> TransitionCounts:
+    """
+    Count transitions with one worker process per hash partition of cases.
+
+    Args:
+        case_codes: Case code of every event, events sorted by case and time
+        case_labels: case_id of every case code (hashed for partitioning)
+        key_codes: Key of every event; -1 is skipped
+        timestamps: Event timestamps as int64 nanoseconds
+        n_keys: Size of the key dictionary
+        distinct_keys: Only count transitions between different keys
+        workers: Number of partitions (defaults to PARALLEL_WORKERS)
+
+    Returns:
+        Merged TransitionCounts, equal to a single pass over the log
+    """
+    workers = workers or PARALLEL_WORKERS
+    if workers <= 1 or len(case_codes) < PARALLEL_MIN_EVENTS:
+        return count_transitions_sparse(
+            case_codes,
+            key_codes,
+            timestamps,
+            np.arange(len(case_codes)),
+            n_keys,
+            distinct_keys,
+        )
+
+    case_partitions = (
+        pd.util.hash_array(np.asarray(case_labels, dtype=object)) % workers
+    ).astype(np.int16 if workers <= np.iinfo(np.int16).max else np.int32)
+    event_partitions = case_partitions[case_codes]
+    # Stable (radix sort for int16): events of a partition keep their order
+    positions = np.argsort(event_partitions, kind="stable")
+    offsets = np.concatenate(
+        [[0], np.cumsum(np.bincount(event_partitions, minlength=workers))]
+    )
+    shared = _SharedArrays(
+        {
+            "case_codes": case_codes[positions],
+            "key_codes": key_codes[positions],
+            "timestamps": timestamps[positions],
+            "positions": positions,
+        }
+    )
+    try:
+        pool = _get_pool()
+        futures = [
+            pool.submit(
+                _partition_task,
+                shared.spec,
+                int(offsets[p]),
+                int(offsets[p + 1]),
+                n_keys,
+                distinct_keys,
+            )
+            for p in range(workers)
+        ]
+        return merge_transition_counts([future.result() for future in futures])
+    finally:
+        shared.close()
+
+
+def parallel_directly_follows(
+    log: ColumnarEventLog, workers: Optional[int] = None
+) -> DFGCounts:
+    """
+    Compute DFG counts of a log across worker processes.
+
+    Args:
+        log: Columnar event log sorted by case and timestamp
+        workers: Number of partitions (defaults to PARALLEL_WORKERS)
+
+    Returns:
+        DFGCounts equal to directly_follows(log)
+    """
+    n = len(log.activities)
+    counts = parallel_transition_counts(
+        log.case_codes,
+        log.case_ids,
+        log.activity_codes,
+        log.timestamps,
+        n,
+        workers=workers,
+    )
+
+    def dense(values: np.ndarray, dtype) -> np.ndarray:
+        matrix = np.zeros(n * n, dtype=dtype)
+        matrix[counts.edge_keys] = values
+        return matrix.reshape(n, n)
+
+    edge_frequency = dense(counts.edge_frequency, np.int64)
+    return DFGCounts(
+        activities=log.activities,
+        node_frequency=counts.node_frequency,
+        edge_frequency=edge_frequency,
+        waiting_time_sum=dense(counts.waiting_time_sum, np.float64),
+        waiting_time_count=edge_frequency.copy(),
+    )
@@ -1,50 +1,28 @@
-from typing import List, Dict
-from collections import defaultdict
+from typing import List, Dict, Union
 import networkx as nx
 
-from src.models.event_log import EventLog
+from src.models.event_log import EventLog, ColumnarEventLog
+from src.analysis.dfg_kernel import directly_follows
 
 
 def calculate_performance_metrics(
-    event_log: List[EventLog], dfg: nx.DiGraph
+    event_log: Union[ColumnarEventLog, List[EventLog]], dfg: nx.DiGraph
 ) -> nx.DiGraph:
     """
     Calculate performance metrics and add them to the DFG.
 
     Args:
-        event_log: List of event log entries
+        event_log: Columnar event log (a list of EventLog entries is also accepted)
         dfg: Directly-Follows Graph
 
     Returns:
         DFG with performance metrics added
     """
-    # Group events by case_id
-    cases = defaultdict(list)
-    for event in event_log:
-        cases[event.case_id].append(event)
-
-    # Sort events within each case by timestamp
-    for case_id in cases:
-        cases[case_id].sort(key=lambda e: e.timestamp)
-
-    # Calculate average waiting time for each edge
-    edge_waiting_times = defaultdict(list)
-
-    for case_id, events in cases.items():
-        for i in range(len(events) - 1):
-            source = events[i].activity
-            target = events[i + 1].activity
-
-            # Calculate waiting time in hours
-            time_diff = events[i + 1].timestamp - events[i].timestamp
-            waiting_time_hours = time_diff.total_seconds() / 3600.0
-
-            edge_waiting_times[(source, target)].append(waiting_time_hours)
+    log = ColumnarEventLog.coerce(event_log)
 
     # Add average waiting time to edges
-    for (source, target), times in edge_waiting_times.items():
+    for source, target, _, avg_waiting_time in directly_follows(log).edges():
         if dfg.has_edge(source, target):
-            avg_waiting_time = sum(times) / len(times)
             dfg.edges[source, target]["avg_waiting_time_hours"] = round(
                 avg_waiting_time, 2
             )
@@ -0,0 +1,149 @@
+"""
+Streaming aggregation of event logs read in chunks.
+
+Chunks arrive ordered by case_id and timestamp, so every case except the last
+one of a chunk is complete. Complete cases are aggregated immediately with the
+directly-follows kernel; the rows of the last case are carried over and
+prepended to the next chunk. Peak memory is bounded by the chunk size (plus
+the longest case) instead of the log size; only one lead time and one variant
+id per case are kept.
+"""
+
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+from src.models.event_log import ColumnarEventLog
+from src.analysis.dfg_kernel import NANOSECONDS_PER_HOUR, DFGCounts, directly_follows
+
+
+class StreamingLogAggregator:
+    """
+    Incrementally aggregates DFG counts, case lead times and variants.
+
+    Usage:
+        aggregator = StreamingLogAggregator()
+        for chunk in chunks:
+            aggregator.add_chunk(chunk)
+        aggregator.finish()
+    """
+
+    def __init__(self):
+        self._activities: List[str] = []
+        self._activity_codes: Dict[str, int] = {}
+        self._node_frequency = np.zeros(0, dtype=np.int64)
+        self._edge_frequency = np.zeros((0, 0), dtype=np.int64)
+        self._waiting_time_sum = np.zeros((0, 0), dtype=np.float64)
+
+        self._variant_ids: Dict[bytes, int] = {}
+        self._variants: List[np.ndarray] = []
+        self._case_lead_times: List[np.ndarray] = []
+        self._case_variants: List[np.ndarray] = []
+
+        self._pending = None
+        self.event_count = 0
+
+    def add_chunk(self, chunk: pd.DataFrame) -> None:
+        """
+        Aggregate all complete cases of a chunk.
+
+        Args:
+            chunk: Rows with case_id, activity and timestamp, ordered by
+                case_id and timestamp
+        """
+        if self._pending is not None:
+            chunk = pd.concat([self._pending, chunk], ignore_index=True)
+        if chunk.empty:
+            return
+
+        # Rows of the last case may continue in the next chunk
+        case_ids = chunk["case_id"].to_numpy()
+        other_case = case_ids != case_ids[-1]
+        boundary = (
+            len(case_ids) - int(np.argmax(other_case[::-1])) if other_case.any() else 0
+        )
+
+        self._pending = chunk.iloc[boundary:]
+        if boundary > 0:
+            self._aggregate(chunk.iloc[:boundary])
+
+    def finish(self) -> None:
+        """Aggregate the carried-over last case."""
+        if self._pending is not None and not self._pending.empty:
+            self._aggregate(self._pending)
+        self._pending = None
+
+    def _aggregate(self, df: pd.DataFrame) -> None:
+        """Aggregate rows that contain only complete cases."""
+        log = ColumnarEventLog.from_dataframe(df)
+        counts = directly_follows(log)
+        codes = self._global_codes(log.activities)
+
+        self._node_frequency[codes] += counts.node_frequency
+        index = np.ix_(codes, codes)
+        self._edge_frequency[index] += counts.edge_frequency
+        self._waiting_time_sum[index] += counts.waiting_time_sum
+        self.event_count += len(log)
+
+        starts = log.case_starts()
+        ends = log.case_ends()
+        self._case_lead_times.append(
+            (log.timestamps[ends] - log.timestamps[starts]) / NANOSECONDS_PER_HOUR
+        )
+
+        traces = np.split(codes[log.activity_codes].astype(np.int32), starts[1:])
+        variant_ids = np.empty(len(traces), dtype=np.int64)
+        for i, trace in enumerate(traces):
+            key = trace.tobytes()
+            variant_id = self._variant_ids.get(key)
+            if variant_id is None:
+                variant_id = len(self._variants)
+                self._variant_ids[key] = variant_id
+                self._variants.append(trace)
+            variant_ids[i] = variant_id
+        self._case_variants.append(variant_ids)
+
+    def _global_codes(self, activities: np.ndarray) -> np.ndarray:
+        """Map chunk-local activity labels to global codes, growing the matrices."""
+        for activity in activities:
+            if activity not in self._activity_codes:
+                self._activity_codes[activity] = len(self._activities)
+                self._activities.append(activity)
+
+        grow = len(self._activities) - len(self._node_frequency)
+        if grow > 0:
+            self._node_frequency = np.pad(self._node_frequency, (0, grow))
+            self._edge_frequency = np.pad(self._edge_frequency, (0, grow))
+            self._waiting_time_sum = np.pad(self._waiting_time_sum, (0, grow))
+
+        return np.array([self._activity_codes[a] for a in activities], dtype=np.int64)
+
+    @property
+    def case_count(self) -> int:
+        return sum(len(lead_times) for lead_times in self._case_lead_times)
+
+    def dfg_counts(self) -> DFGCounts:
+        """DFG counts over all aggregated cases."""
+        return DFGCounts(
+            activities=np.array(self._activities, dtype=object),
+            node_frequency=self._node_frequency,
+            edge_frequency=self._edge_frequency,
+            waiting_time_sum=self._waiting_time_sum,
+            waiting_time_count=self._edge_frequency.copy(),
+        )
+
+    def case_lead_times(self) -> np.ndarray:
+        """Lead time of every case in hours, in stream order."""
+        if not self._case_lead_times:
+            return np.zeros(0, dtype=np.float64)
+        return np.concatenate(self._case_lead_times)
+
+    def case_variants(self) -> np.ndarray:
+        """Variant id of every case, in stream order."""
+        if not self._case_variants:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(self._case_variants)
+
+    def variant_path(self, variant_id: int) -> List[str]:
+        """Activity sequence of a variant."""
+        return [self._activities[code] for code in self._variants[variant_id]]
@@ -0,0 +1,77 @@
+"""
+Variant index of a columnar event log.
+
+A variant is a distinct activity sequence. Each case's trace is hashed once
+(its activity codes as bytes) and cases are grouped by variant, so per-path
+statistics can be computed once per variant and weighted by its case count.
+"""
+
+from typing import List
+import numpy as np
+import pandas as pd
+
+from src.models.event_log import ColumnarEventLog
+
+
+class VariantIndex:
+    """
+    Cases of a log grouped by their activity sequence.
+
+    Variant ids are assigned in order of first appearance (case order).
+
+    Attributes:
+        traces: Activity codes of every variant, indexed by variant id
+        case_variants: Variant id of every case, indexed by case code
+        counts: Number of cases per variant
+    """
+
+    def __init__(
+        self, traces: List[np.ndarray], case_variants: np.ndarray, counts: np.ndarray
+    ):
+        self.traces = traces
+        self.case_variants = case_variants
+        self.counts = counts
+        # Case codes grouped by variant: cases of variant v are
+        # _case_order[_offsets[v]:_offsets[v + 1]]
+        self._case_order = np.argsort(case_variants, kind="stable")
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    @classmethod
+    def from_log(cls, log: ColumnarEventLog) -> "VariantIndex":
+        """
+        Hash every case trace once and group cases by variant.
+
+        Args:
+            log: Columnar event log sorted by case and timestamp
+
+        Returns:
+            VariantIndex of the log
+        """
+        if not log:
+            return cls([], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+        itemsize = np.dtype(np.int32).itemsize
+        buffer = log.activity_codes.astype(np.int32).tobytes()
+        starts = log.case_starts() * itemsize
+        ends = (log.case_ends() + 1) * itemsize
+
+        keys = np.empty(len(starts), dtype=object)
+        keys[:] = [buffer[s:e] for s, e in zip(starts.tolist(), ends.tolist())]
+        case_variants, unique_keys = pd.factorize(keys)
+
+        traces = [np.frombuffer(key, dtype=np.int32) for key in unique_keys]
+        counts = np.bincount(case_variants, minlength=len(traces))
+        return cls(traces, case_variants.astype(np.int64), counts)
+
+    def __len__(self) -> int:
+        return len(self.traces)
+
+    def case_codes(self, variant_id: int) -> np.ndarray:
+        """Case codes following a variant, in case order."""
+        return self._case_order[
+            self._offsets[variant_id] : self._offsets[variant_id + 1]
+        ]
+
+    def most_frequent(self) -> int:
+        """Id of the most frequent variant (the first appearing one on ties)."""
+        return int(np.argmax(self.counts))
@@ -6,12 +6,17 @@ various filtering options and previewing analysis scope.
 """
 
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
-from src.db.connection import get_db
+from src.db.connection import SessionLocal, get_db
+from src.api.job_routes import submit_job
+from src.services.offload import ServerBusyError
+from src.services.cancellation import AnalysisCancelledError
+from src.services.cost_model import AnalysisTooLargeError
 from src.services.analyze_service import (
+    admit_analysis,
     execute_analysis,
     get_preview,
     calculate_lead_time_statistics,
@@ -38,25 +43,63 @@ class AnalyzeRequest(BaseModel):
     )
     date_from: Optional[str] = Field(None, description="Start date in ISO8601 format")
     date_to: Optional[str] = Field(None, description="End date in ISO8601 format")
+    execution_mode: str = Field(
+        default="in_memory",
+        pattern="^(in_memory|parallel|streaming|sql|mart)$",
+        description=(
+            "in_memory: load events into the API / "
+            "parallel: aggregate hash partitions of cases in worker processes / "
+            "streaming: aggregate chunk by chunk / sql: aggregate in PostgreSQL / "
+            "mart: merge the daily directly-follows mart"
+        ),
+    )
 
 
 @router.post("/analyze")
-def create_analysis(request: AnalyzeRequest, db: Session = Depends(get_db)):
+def create_analysis(
+    request: AnalyzeRequest,
+    background: bool = Query(False, description="Run as a background job"),
+    db: Session = Depends(get_db),
+):
     """
     Execute new analysis and save to database.
 
     Args:
         request: Analysis request parameters
+        background: Queue the analysis and return a job ID (202) immediately;
+            also applied when the estimated runtime exceeds
+            ANALYSIS_SYNC_SECONDS_BUDGET
         db: Database session
 
     Returns:
-        Analysis result metadata including analysis_id
+        Analysis result metadata including analysis_id, or the job ID
 
     Raises:
         HTTPException 400: Validation error or no events found
+        HTTPException 413: Estimated peak memory exceeds the budget
         HTTPException 500: Internal server error during analysis
+        HTTPException 503: Background job queue is full
     """
     try:
+        admission = admit_analysis(
+            f"process:{request.execution_mode}",
+            request.process_type,
+            request.filter_mode,
+            request.date_from,
+            request.date_to,
+            background,
+        )
+        if admission.background:
+
+            def run(progress):
+                with SessionLocal() as job_db:
+                    result = execute_analysis(
+                        db=job_db, **request.model_dump(), progress=progress
+                    )
+                return result["analysis_id"]
+
+            return submit_job("process", request.model_dump(), run, admission.estimate)
+
         result = execute_analysis(
             db=db,
             analysis_name=request.analysis_name,
@@ -64,8 +107,11 @@ def create_analysis(request: AnalyzeRequest, db: Session = Depends(get_db)):
             filter_mode=request.filter_mode,
             date_from=request.date_from,
             date_to=request.date_to,
+            execution_mode=request.execution_mode,
         )
         return result
+    except (ServerBusyError, AnalysisCancelledError, AnalysisTooLargeError):
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -89,7 +135,8 @@ def preview_analysis(
         date_to: End date in ISO8601 format (optional)
 
     Returns:
-        Preview information including event count, case count, and date range
+        Preview information including event count, case count, date range,
+        and the estimated runtime and peak memory of every analysis
 
     Raises:
         HTTPException 400: Invalid filter_mode
@@ -103,6 +150,8 @@ def preview_analysis(
             date_to=date_to,
         )
         return result
+    except AnalysisCancelledError:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -130,9 +179,12 @@ def get_lead_time_statistics(
 
     Raises:
         HTTPException 400: Invalid parameters
+        HTTPException 413: Estimated peak memory exceeds the budget
         HTTPException 500: Internal server error
     """
     try:
+        # Synchronous only: the runtime estimate is not applied
+        admit_analysis("lead_time", process_type, filter_mode, date_from, date_to)
         result = calculate_lead_time_statistics(
             process_type=process_type,
             filter_mode=filter_mode,
@@ -140,9 +192,9 @@ def get_lead_time_statistics(
             date_to=date_to,
         )
         return result
+    except (ServerBusyError, AnalysisCancelledError, AnalysisTooLargeError):
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"リードタイム統計計算エラー: {str(e)}"
-        )
+        raise HTTPException(status_code=500, detail=f"リードタイム統計計算エラー: {str(e)}")
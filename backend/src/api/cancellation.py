@@ -0,0 +1,76 @@
+"""
+Deadlines and client-disconnect cancellation of analysis endpoints.
+
+Requests to the endpoints in ENDPOINT_TIMEOUTS run in a cancel scope (see
+src.services.cancellation) that times out after the endpoint's timeout and
+is cancelled as soon as the client disconnects, so abandoned analyses stop
+their SQL statements and computation instead of running to completion.
+"""
+
+import math
+import os
+from typing import Dict
+
+import anyio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.services.cancellation import cancel_scope
+
+# Deadline (seconds) of synchronous analyses (0 disables the deadline)
+ANALYZE_TIMEOUT_SECONDS = float(os.getenv("ANALYZE_TIMEOUT_SECONDS", "300"))
+
+# Deadline (seconds) of the organization analysis endpoints
+ORGANIZATION_TIMEOUT_SECONDS = float(os.getenv("ORGANIZATION_TIMEOUT_SECONDS", "120"))
+
+# Deadline (seconds) of the analysis scope preview
+PREVIEW_TIMEOUT_SECONDS = float(os.getenv("PREVIEW_TIMEOUT_SECONDS", "30"))
+
+ENDPOINT_TIMEOUTS: Dict[str, float] = {
+    "/analyze": ANALYZE_TIMEOUT_SECONDS,
+    "/lead-time-stats": ANALYZE_TIMEOUT_SECONDS,
+    "/preview": PREVIEW_TIMEOUT_SECONDS,
+    "/organization/analyze": ANALYZE_TIMEOUT_SECONDS,
+    "/organization/handover": ORGANIZATION_TIMEOUT_SECONDS,
+    "/organization/workload": ORGANIZATION_TIMEOUT_SECONDS,
+    "/organization/performance": ORGANIZATION_TIMEOUT_SECONDS,
+    "/outcome/analyze": ANALYZE_TIMEOUT_SECONDS,
+}
+
+
+class CancellationMiddleware:
+    """Runs analysis requests in a cancel scope that watches for disconnects."""
+
+    def __init__(self, app: ASGIApp, timeouts: Dict[str, float] = ENDPOINT_TIMEOUTS):
+        self.app = app
+        self.timeouts = timeouts
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.timeouts:
+            await self.app(scope, receive, send)
+            return
+
+        # All messages are read here and forwarded to the application, so the
+        # disconnect is noticed while the (sync) endpoint is still running
+        forward, messages = anyio.create_memory_object_stream(math.inf)
+
+        with cancel_scope(self.timeouts[scope["path"]] or None) as cancel:
+
+            async def listen_for_disconnect() -> None:
+                async with forward:
+                    while True:
+                        message = await receive()
+                        await forward.send(message)
+                        if message["type"] == "http.disconnect":
+                            cancel.cancel()
+                            return
+
+            async def app_receive() -> Message:
+                try:
+                    return await messages.receive()
+                except anyio.EndOfStream:
+                    return {"type": "http.disconnect"}
+
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(listen_for_disconnect)
+                await self.app(scope, app_receive, send)
+                task_group.cancel_scope.cancel()
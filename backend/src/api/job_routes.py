@@ -0,0 +1,63 @@
+"""
+API routes for background analysis jobs.
+
+POST /analyze, /organization/analyze and /outcome/analyze accept
+``background=true`` to queue the analysis and return a job ID immediately;
+the job is polled with GET /jobs/{job_id} until it has an analysis_id.
+"""
+
+from typing import Any, Callable, Dict, Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+from src.services.cost_model import CostEstimate
+from src.services.job_service import ProgressCallback, get_job, job_runner
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["ジョブ"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+def submit_job(
+    job_type: str,
+    params: Dict[str, Any],
+    run: Callable[[ProgressCallback], str],
+    estimate: Optional[CostEstimate] = None,
+) -> JSONResponse:
+    """
+    Queue an analysis and respond with 202 and the job ID.
+
+    The estimated runtime and peak memory are included in the response if
+    given (e.g. when admission control moved a request to the background).
+
+    Raises:
+        JobQueueFullError: If the job queue is full (answered with 503)
+    """
+    job_id = job_runner.submit(job_type, params, run)
+    content: Dict[str, Any] = {"job_id": job_id, "status": "queued"}
+    if estimate is not None:
+        content["estimate"] = estimate.to_dict()
+    return JSONResponse(
+        status_code=202,
+        content=content,
+        headers={"Location": f"/jobs/{job_id}"},
+    )
+
+
+@router.get("/{job_id}")
+def get_job_status(job_id: str):
+    """
+    Get status of a background analysis job.
+
+    Returns status (queued, running, succeeded or failed), progress (0-1),
+    and the analysis_id once the job has succeeded.
+    """
+    try:
+        job = get_job(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -4,9 +4,16 @@ Organization Analysis API Routes
 Endpoints for handover, workload, and performance analysis.
 """
 
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from typing import Optional
 from pydantic import BaseModel
+from src.api.pagination import PageParams, paginate
+from src.api.job_routes import submit_job
+from src.services.offload import ServerBusyError
+from src.services.cancellation import AnalysisCancelledError
+from src.services.cost_model import AnalysisTooLargeError
+from src.api.response_cache import cached_json_response
+from src.services.analyze_service import admit_analysis
 from src.services.organization_service import (
     analyze_handover,
     analyze_workload,
@@ -14,6 +21,7 @@ from src.services.organization_service import (
     create_organization_analysis,
     get_organization_analyses,
     get_organization_analysis_by_id,
+    parse_filter_date,
 )
 
 router = APIRouter(
@@ -33,13 +41,42 @@ class CreateOrganizationAnalysisRequest(BaseModel):
 
 
 @router.post("/analyze")
-def create_analysis(request: CreateOrganizationAnalysisRequest):
+def create_analysis(
+    request: CreateOrganizationAnalysisRequest,
+    background: bool = Query(False, description="Run as a background job"),
+):
     """
     Create a new organization analysis and save results to database.
 
-    Returns the analysis ID and summary information.
+    Returns the analysis ID and summary information. With background=true,
+    or when the estimated runtime exceeds ANALYSIS_SYNC_SECONDS_BUDGET, the
+    analysis is queued and the job ID is returned immediately (202).
+    Analyses estimated to exceed the memory budget are rejected (413).
     """
     try:
+        # Reject unparseable dates (400) before admission or a background job
+        parse_filter_date(request.date_from)
+        parse_filter_date(request.date_to)
+        admission = admit_analysis(
+            "organization",
+            request.process_type,
+            request.filter_mode,
+            request.date_from,
+            request.date_to,
+            background,
+        )
+        if admission.background:
+
+            def run(progress):
+                result = create_organization_analysis(
+                    **request.model_dump(), progress=progress
+                )
+                return result["analysis_id"]
+
+            return submit_job(
+                "organization", request.model_dump(), run, admission.estimate
+            )
+
         result = create_organization_analysis(
             analysis_name=request.analysis_name,
             process_type=request.process_type,
@@ -49,35 +86,48 @@ def create_analysis(request: CreateOrganizationAnalysisRequest):
             date_to=request.date_to,
         )
         return result
+    except (ServerBusyError, AnalysisCancelledError, AnalysisTooLargeError):
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/analyses")
-def list_analyses(process_type: Optional[str] = None):
+def list_analyses(
+    response: Response,
+    process_type: Optional[str] = None,
+    page: PageParams = Depends(),
+):
     """
-    Get list of organization analysis results.
+    Get list of organization analysis results (newest first).
 
-    Optionally filter by process_type.
+    Optionally filter by process_type. Paginated by keyset; the next page's
+    cursor is in the X-Next-Cursor header.
     """
     try:
-        return get_organization_analyses(process_type)
+        analyses = get_organization_analyses(
+            process_type, limit=page.fetch_limit, after=page.after
+        )
+        return paginate(analyses, page, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/analyses/{analysis_id}")
-def get_analysis(analysis_id: str):
+def get_analysis(analysis_id: str, request: Request):
     """
     Get a specific organization analysis result by ID.
 
-    Returns handover, workload, and performance data.
+    Returns handover, workload, and performance data (supports If-None-Match).
     """
     try:
-        result = get_organization_analysis_by_id(analysis_id)
-        if not result:
-            raise HTTPException(status_code=404, detail="Analysis not found")
-        return result
+        return cached_json_response(
+            request,
+            f"organization:{analysis_id}",
+            lambda: get_organization_analysis_by_id(analysis_id, stored=True),
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -95,19 +145,34 @@ def get_handover_analysis(
         None, description="Start date filter (ISO format)"
     ),
     date_to: Optional[str] = Query(None, description="End date filter (ISO format)"),
+    execution_mode: str = Query(
+        "in_memory",
+        pattern="^(in_memory|parallel)$",
+        description="parallel: count handovers of case partitions in worker processes",
+    ),
 ):
     """
     Get handover analysis (social network of who works with whom).
 
     Returns nodes (people/departments) and edges (handovers with counts).
+    Analyses estimated to exceed the memory budget are rejected (413).
     """
-    return analyze_handover(
-        process_type=process_type,
-        aggregation_level=aggregation_level,
-        filter_mode=filter_mode,
-        date_from=date_from,
-        date_to=date_to,
-    )
+    try:
+        admit_analysis("organization", process_type, filter_mode, date_from, date_to)
+        return analyze_handover(
+            process_type=process_type,
+            aggregation_level=aggregation_level,
+            filter_mode=filter_mode,
+            date_from=date_from,
+            date_to=date_to,
+            execution_mode=execution_mode,
+        )
+    except (ServerBusyError, AnalysisCancelledError, AnalysisTooLargeError):
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/workload")
@@ -126,14 +191,23 @@ def get_workload_analysis(
     Get workload analysis (who has the most work).
 
     Returns activity and case counts per person/department.
+    Analyses estimated to exceed the memory budget are rejected (413).
     """
-    return analyze_workload(
-        process_type=process_type,
-        aggregation_level=aggregation_level,
-        filter_mode=filter_mode,
-        date_from=date_from,
-        date_to=date_to,
-    )
+    try:
+        admit_analysis("organization", process_type, filter_mode, date_from, date_to)
+        return analyze_workload(
+            process_type=process_type,
+            aggregation_level=aggregation_level,
+            filter_mode=filter_mode,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    except (ServerBusyError, AnalysisCancelledError, AnalysisTooLargeError):
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/performance")
@@ -152,11 +226,20 @@ def get_performance_analysis(
     Get performance analysis (who takes the longest time).
 
     Returns average and median duration per person/department.
+    Analyses estimated to exceed the memory budget are rejected (413).
     """
-    return analyze_performance(
-        process_type=process_type,
-        aggregation_level=aggregation_level,
-        filter_mode=filter_mode,
-        date_from=date_from,
-        date_to=date_to,
-    )
+    try:
+        admit_analysis("organization", process_type, filter_mode, date_from, date_to)
+        return analyze_performance(
+            process_type=process_type,
+            aggregation_level=aggregation_level,
+            filter_mode=filter_mode,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    except (ServerBusyError, AnalysisCancelledError, AnalysisTooLargeError):
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,10 +1,18 @@
 """Outcome analysis API routes"""
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
-from src.db.connection import get_db
+from src.db.connection import SessionLocal, get_db
+from src.api.job_routes import submit_job
+from src.services.offload import ServerBusyError
+from src.services.cancellation import AnalysisCancelledError
+from src.services.cost_model import AnalysisTooLargeError
+from src.api.pagination import PageParams, paginate
+from src.api.response_cache import cached_json_response
+from src.services.result_storage import StoredBody
+from src.services.analyze_service import admit_analysis
 from src.models.outcome import (
     MetricInfo,
     OutcomeAnalysisSummary,
@@ -31,25 +39,38 @@ def get_available_metrics(process_type: str, db: Session = Depends(get_db)):
 
 @router.get("/analyses", response_model=List[OutcomeAnalysisSummary])
 def get_outcome_analyses(
+    response: Response,
     process_type: Optional[str] = None,
     metric_name: Optional[str] = None,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
 ):
-    """成果分析結果の一覧を取得"""
+    """成果分析結果の一覧を取得（新しい順、次ページのカーソルは X-Next-Cursor ヘッダー）"""
     try:
-        return outcome_service.get_outcome_analyses(db, process_type, metric_name)
+        analyses = outcome_service.get_outcome_analyses(
+            db, process_type, metric_name, limit=page.fetch_limit, after=page.after
+        )
+        return paginate(analyses, page, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/analyses/{analysis_id}", response_model=OutcomeAnalysisDetail)
-def get_outcome_analysis_by_id(analysis_id: str, db: Session = Depends(get_db)):
-    """特定の成果分析結果を取得"""
+def get_outcome_analysis_by_id(
+    analysis_id: str, request: Request, db: Session = Depends(get_db)
+):
+    """特定の成果分析結果を取得（If-None-Match に対応）"""
+
+    def load():
+        result = outcome_service.get_outcome_analysis_by_id(
+            db, analysis_id, stored=True
+        )
+        if result is None or isinstance(result, StoredBody):
+            return result
+        return OutcomeAnalysisDetail.model_validate(result)
+
     try:
-        result = outcome_service.get_outcome_analysis_by_id(db, analysis_id)
-        if not result:
-            raise HTTPException(status_code=404, detail="Analysis not found")
-        return result
+        return cached_json_response(request, f"outcome:{analysis_id}", load)
     except HTTPException:
         raise
     except Exception as e:
@@ -58,12 +79,35 @@ def get_outcome_analysis_by_id(analysis_id: str, db: Session = Depends(get_db)):
 
 @router.post("/analyze")
 def create_outcome_analysis(
-    params: CreateAnalysisParams, db: Session = Depends(get_db)
+    params: CreateAnalysisParams,
+    background: bool = Query(False, description="バックグラウンドジョブとして実行"),
+    db: Session = Depends(get_db),
 ):
-    """成果分析を作成"""
+    """
+    成果分析を作成（background=true の場合はジョブIDを即時に返す）
+
+    推定実行時間が ANALYSIS_SYNC_SECONDS_BUDGET を超える場合もジョブとして実行し、
+    推定メモリ使用量が上限を超える場合は 413 を返す。
+    推定にはプロセスタイプ全体のイベント数・ケース数（上限値）を用いる。
+    """
     try:
+        admission = admit_analysis(
+            "outcome", params.process_type, background=background
+        )
+        if admission.background:
+
+            def run(progress):
+                with SessionLocal() as job_db:
+                    return outcome_service.create_outcome_analysis(
+                        job_db, params, progress=progress
+                    )
+
+            return submit_job("outcome", params.model_dump(), run, admission.estimate)
+
         analysis_id = outcome_service.create_outcome_analysis(db, params)
         return {"analysis_id": analysis_id}
+    except (ServerBusyError, AnalysisCancelledError, AnalysisTooLargeError):
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
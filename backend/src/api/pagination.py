@@ -0,0 +1,88 @@
+"""
+Keyset pagination for analysis list endpoints.
+
+Lists are ordered by (created_at DESC, analysis_id DESC). A page is requested
+with ``limit`` and an opaque ``cursor``; the cursor of the next page is
+returned in the X-Next-Cursor response header, so list bodies keep their
+shape. Without ``limit`` the whole list is returned, as before pagination.
+"""
+
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Query, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+MAX_PAGE_SIZE = 1000
+
+# Position after which the next page starts: (created_at, analysis_id)
+Cursor = Tuple[datetime, str]
+
+
+class PageParams:
+    """Query parameters of a paginated list request (FastAPI dependency)."""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(
+            None, ge=1, le=MAX_PAGE_SIZE, description="Page size (all rows if omitted)"
+        ),
+        cursor: Optional[str] = Query(
+            None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header"
+        ),
+    ):
+        self.limit = limit
+        try:
+            self.after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    @property
+    def fetch_limit(self) -> Optional[int]:
+        """Rows to fetch: one more than the page, to detect a next page."""
+        return None if self.limit is None else self.limit + 1
+
+
+def encode_cursor(created_at: Any, analysis_id: Any) -> str:
+    """Encode a list position as an opaque URL-safe cursor."""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = f"{created_at}|{analysis_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decode a cursor created by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    created_at, _, analysis_id = raw.partition("|")
+    return datetime.fromisoformat(created_at), str(UUID(analysis_id))
+
+
+def _position(item: Any) -> Tuple[Any, Any]:
+    if isinstance(item, dict):
+        return item["created_at"], item["analysis_id"]
+    return item.created_at, item.analysis_id
+
+
+def paginate(items: List[Any], page: PageParams, response: Response) -> List[Any]:
+    """
+    Trim a result fetched with ``page.fetch_limit`` rows to one page.
+
+    Sets the X-Next-Cursor header if there are more rows.
+    """
+    if page.limit is not None and len(items) > page.limit:
+        items = items[: page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*_position(items[-1]))
+    return items
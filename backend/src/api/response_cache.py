@@ -0,0 +1,182 @@
+"""
+In-process cache of serialized responses for stored analysis results.
+
+Stored analyses never change, so their JSON body is serialized once and kept
+in a size- and memory-bounded LRU together with a strong ETag (SHA-256 of the
+body). Conditional requests with a matching If-None-Match get 304 without
+touching the database.
+
+Bodies stored gzip-compressed (RESULT_STORAGE_FORMAT=gzip) are cached and
+sent compressed with Content-Encoding: gzip; they are only decompressed for
+clients that do not accept gzip.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+from src.services.result_storage import StoredBody, dump_json
+
+# Maximum number of cached response bodies
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+
+# Memory budget for cached response bodies in bytes
+RESPONSE_CACHE_MAX_BYTES = int(
+    os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+
+
+class CachedBody(NamedTuple):
+    """Serialized JSON body, its strong ETag and its content-coding."""
+
+    body: bytes
+    etag: str
+    encoding: Optional[str] = None
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized bodies bounded by entries and bytes."""
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Total bytes of the cached bodies."""
+        return self._size
+
+    def get(self, key: str) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedBody) -> None:
+        """Store an entry, evicting least recently used ones to fit the budget."""
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.body)
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+response_cache = ResponseCache()
+
+
+def serialize(content: Any) -> CachedBody:
+    """Serialize content like FastAPI's JSONResponse and compute its ETag."""
+    if isinstance(content, StoredBody):
+        # Stored bodies are already serialized and compressed
+        digest = hashlib.sha256(content.data).hexdigest()
+        return CachedBody(body=content.data, etag=f'"{digest}"', encoding="gzip")
+    body = dump_json(content)
+    return CachedBody(body=body, etag=f'"{hashlib.sha256(body).hexdigest()}"')
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses weak comparison (RFC 9110 13.1.2)
+    candidates = [
+        value.strip().removeprefix("W/") for value in if_none_match.split(",")
+    ]
+    return "*" in candidates or etag in candidates
+
+
+def _accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    """Whether Accept-Encoding allows a content-coding (q=0 rejects it)."""
+    if not accept_encoding:
+        return False
+    accepted = False
+    for value in accept_encoding.split(","):
+        coding, _, params = value.strip().partition(";")
+        coding = coding.strip().lower()
+        if coding not in (encoding, "*"):
+            continue
+        q = params.strip().lower()
+        try:
+            rejected = q.startswith("q=") and float(q[2:]) == 0
+        except ValueError:
+            rejected = False
+        if coding == encoding:
+            return not rejected
+        accepted = not rejected
+    return accepted
+
+
+def _representation(
+    entry: CachedBody, accept_encoding: Optional[str]
+) -> Tuple[bytes, str, Optional[str]]:
+    """Body, ETag and Content-Encoding to send for a cached entry."""
+    if entry.encoding is None:
+        return entry.body, entry.etag, None
+    if _accepts_encoding(accept_encoding, entry.encoding):
+        # Each content-coding is a distinct representation with its own ETag
+        return entry.body, f'{entry.etag[:-1]}-{entry.encoding}"', entry.encoding
+    return gzip.decompress(entry.body), entry.etag, None
+
+
+def cached_json_response(
+    request: Request, key: str, load: Callable[[], Optional[Any]]
+) -> Response:
+    """
+    Respond with a cached stored result, honoring If-None-Match.
+
+    Args:
+        request: Incoming request
+        key: Cache key of the stored result (e.g. "process:<analysis_id>")
+        load: Loads the result (content or StoredBody); returns None if it
+            does not exist
+
+    Returns:
+        200 response with body and ETag, or 304 if the client's copy is current
+
+    Raises:
+        HTTPException 404: If the result does not exist
+    """
+    entry = response_cache.get(key)
+    if entry is None:
+        content = load()
+        if content is None:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+        entry = serialize(content)
+        response_cache.put(key, entry)
+
+    body, etag, encoding = _representation(
+        entry, request.headers.get("accept-encoding")
+    )
+
+    # Stored results are immutable: clients may reuse their copy after revalidation
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if entry.encoding is not None:
+        headers["Vary"] = "Accept-Encoding"
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
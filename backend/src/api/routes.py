@@ -1,9 +1,13 @@
 from typing import List, Dict, Any, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 
 from src.db.connection import get_db
+from src.api.pagination import PageParams, paginate
+from src.api.response_cache import cached_json_response
+from src.services.result_storage import StoredBody, decode_result
 from src.models.analysis_result import (
     AnalysisResultORM,
     AnalysisListItem,
@@ -44,32 +48,62 @@ router = APIRouter(
 
 @router.get("/analyses", response_model=List[AnalysisListItem])
 def get_analyses(
+    response: Response,
     process_type: Optional[str] = Query(None, description="Filter by process type"),
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
 ):
-    """Get list of all analyses, optionally filtered by process type."""
-    query = db.query(AnalysisResultORM)
+    """
+    Get list of analyses (newest first), optionally filtered by process type.
+
+    Paginated by keyset; the next page's cursor is in the X-Next-Cursor header.
+    Only list columns are selected (result_data is not loaded).
+    """
+    query = db.query(
+        AnalysisResultORM.analysis_id,
+        AnalysisResultORM.analysis_name,
+        AnalysisResultORM.process_type,
+        AnalysisResultORM.created_at,
+    )
 
     if process_type:
         query = query.filter(AnalysisResultORM.process_type == process_type)
+    if page.after:
+        created_at, analysis_id = page.after
+        query = query.filter(
+            tuple_(AnalysisResultORM.created_at, AnalysisResultORM.analysis_id)
+            < tuple_(created_at, UUID(analysis_id))
+        )
 
-    analyses = query.order_by(AnalysisResultORM.created_at.desc()).all()
-    return analyses
+    analyses = (
+        query.order_by(
+            AnalysisResultORM.created_at.desc(), AnalysisResultORM.analysis_id.desc()
+        )
+        .limit(page.fetch_limit)
+        .all()
+    )
+    return paginate(analyses, page, response)
 
 
 @router.get("/analyses/{analysis_id}", response_model=Dict[str, Any])
-def get_analysis_by_id(analysis_id: UUID, db: Session = Depends(get_db)):
-    """Get specific analysis result by ID."""
-    analysis = (
-        db.query(AnalysisResultORM)
-        .filter(AnalysisResultORM.analysis_id == analysis_id)
-        .first()
-    )
+def get_analysis_by_id(
+    analysis_id: UUID, request: Request, db: Session = Depends(get_db)
+):
+    """Get specific analysis result by ID (supports If-None-Match)."""
 
-    if not analysis:
-        raise HTTPException(status_code=404, detail="Analysis not found")
+    def load():
+        analysis = (
+            db.query(AnalysisResultORM.result_data, AnalysisResultORM.result_body)
+            .filter(AnalysisResultORM.analysis_id == analysis_id)
+            .first()
+        )
+        if not analysis:
+            return None
+        if analysis.result_body is not None:
+            return StoredBody(analysis.result_body)
+        return analysis.result_data
 
-    return analysis.result_data
+    return cached_json_response(request, f"process:{analysis_id}", load)
 
 
 @router.get("/compare", response_model=Dict[str, Any])
@@ -100,8 +134,8 @@ def compare_analyses(before: UUID, after: UUID, db: Session = Depends(get_db)):
     if not after_analysis:
         raise HTTPException(status_code=404, detail=f"After analysis {after} not found")
 
-    before_data = before_analysis.result_data
-    after_data = after_analysis.result_data
+    before_data = _result_data(before_analysis)
+    after_data = _result_data(after_analysis)
 
     # Calculate differences
     comparison_result = calculate_comparison(before_data, after_data)
@@ -109,6 +143,13 @@ def compare_analyses(before: UUID, after: UUID, db: Session = Depends(get_db)):
     return comparison_result
 
 
+def _result_data(analysis: AnalysisResultORM) -> Dict[str, Any]:
+    """Result data of a saved analysis in either storage format."""
+    if analysis.result_body is not None:
+        return decode_result(analysis.result_body)
+    return analysis.result_data
+
+
 def calculate_comparison(before: Dict, after: Dict) -> Dict:
     """Calculate comparison between two analysis results."""
     before_nodes = {node["id"]: node for node in before.get("nodes", [])}
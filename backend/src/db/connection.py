@@ -2,6 +2,8 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from src.db.pool import InstrumentedNullPool, InstrumentedQueuePool
+
 # Database connection settings from environment variables
 POSTGRES_USER = os.getenv("POSTGRES_USER", "process_mining")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "secure_password")
@@ -11,8 +13,49 @@ POSTGRES_DB = os.getenv("POSTGRES_DB", "process_mining_db")
 
 DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
-# Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL, echo=False)
+DB_POOL_MODES = ("queue", "pgbouncer")
+
+# "queue" pools connections in the API; "pgbouncer" opens a connection per
+# checkout and leaves pooling to PgBouncer (transaction pooling mode)
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue")
+if DB_POOL_MODE not in DB_POOL_MODES:
+    raise ValueError(
+        f"DB_POOL_MODE must be one of {DB_POOL_MODES}, got {DB_POOL_MODE!r}"
+    )
+
+# Connections kept open per process, and additional connections under load
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# Seconds to wait for a free connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Seconds after which connections are replaced (-1 keeps them)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Test connections on checkout, replacing ones closed by the server
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+
+def _pool_options() -> dict:
+    """Engine keyword arguments for the configured pool mode."""
+    if DB_POOL_MODE == "pgbouncer":
+        # PgBouncer keeps the server connections; psycopg2 uses no prepared
+        # statements and statement_timeout is only SET LOCAL, so transaction
+        # pooling is safe
+        return {"poolclass": InstrumentedNullPool}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+# Create SQLAlchemy engine (shared by the ORM sessions and direct queries)
+engine = create_engine(DATABASE_URL, echo=False, **_pool_options())
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -28,3 +71,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_pool_telemetry() -> dict:
+    """Occupancy and checkout wait statistics of this process's pool."""
+    return engine.pool.telemetry()
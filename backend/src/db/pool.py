@@ -0,0 +1,132 @@
+"""
+Connection pools with checkout telemetry.
+
+The pools time every checkout (the wait for a free connection, or for a new
+one to be opened) and count checkouts that timed out, so the pool can be
+sized from the observed wait times and saturation. Statistics are kept per
+process: offload worker processes have pools of their own.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import NullPool, QueuePool
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0)
+
+
+class PoolStats:
+    """Thread-safe checkout wait statistics of one pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+            # Checkouts per bucket of WAIT_BUCKETS, plus one for longer waits
+            self.wait_histogram = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def record(self, wait_seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+            bucket = next(
+                (i for i, bound in enumerate(WAIT_BUCKETS) if wait_seconds <= bound),
+                len(WAIT_BUCKETS),
+            )
+            self.wait_histogram[bucket] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            buckets = [f"le_{bound}" for bound in WAIT_BUCKETS] + ["inf"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_avg": (
+                    self.wait_seconds_total / self.checkouts if self.checkouts else 0.0
+                ),
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_histogram": dict(zip(buckets, self.wait_histogram)),
+            }
+
+
+# Set while a checkout is timed (QueuePool._do_get may call itself)
+_timing = threading.local()
+
+
+class _TimedCheckout:
+    """Times _do_get, which blocks while the pool is exhausted."""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        if getattr(_timing, "active", False):
+            return super()._do_get()
+        _timing.active = True
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        finally:
+            _timing.active = False
+        self.stats.record(time.perf_counter() - started)
+        return record
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool reporting checkout waits and saturation."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def telemetry(self) -> Dict[str, Any]:
+        """Pool occupancy and checkout wait statistics."""
+        capacity = self.size() + max(self._max_overflow, 0)
+        checked_out = self.checkedout()
+        return {
+            "pool": "queue",
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": checked_out,
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "saturation": checked_out / capacity if capacity else 0.0,
+            **self.stats.snapshot(),
+        }
+
+
+class InstrumentedNullPool(_TimedCheckout, NullPool):
+    """NullPool (connections pooled by PgBouncer) reporting connect times."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self) -> "InstrumentedNullPool":
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def telemetry(self) -> Dict[str, Any]:
+        """Checkout (connect) time statistics; PgBouncer owns the pool."""
+        return {"pool": "pgbouncer", **self.stats.snapshot()}
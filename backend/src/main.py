@@ -1,13 +1,33 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from src.api.routes import router, common_router
 from src.api.analyze_routes import router as analyze_router
 from src.api.organization_routes import router as organization_router
 from src.api.outcome_routes import router as outcome_router
+from src.api.job_routes import router as job_router
+from src.api.cancellation import CancellationMiddleware
+from src.db.connection import get_pool_telemetry
+from src.services.job_service import job_runner
+from src.services.offload import ServerBusyError
+from src.services.cost_model import AnalysisTooLargeError
+from src.services.cancellation import AnalysisCancelledError
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fail background jobs whose process stopped, and keep the own jobs leased
+    job_runner.start()
+    yield
+    job_runner.stop()
+
 
 # Create FastAPI application
 app = FastAPI(
+    lifespan=lifespan,
     title="Open Process Mining API",
     description="""
 ## オープンソースのプロセスマイニングプラットフォーム
@@ -53,14 +73,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# Deadlines of analysis endpoints; analyses stop when the client disconnects
+app.add_middleware(CancellationMiddleware)
+
+
+@app.exception_handler(ServerBusyError)
+def server_busy_handler(request: Request, exc: ServerBusyError):
+    """Reject work while the analysis queues are full."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(AnalysisTooLargeError)
+def analysis_too_large_handler(request: Request, exc: AnalysisTooLargeError):
+    """Reject analyses estimated to exceed the memory budget."""
+    return JSONResponse(
+        status_code=413,
+        content={"detail": str(exc), "estimate": exc.estimate.to_dict()},
+    )
+
+
+@app.exception_handler(AnalysisCancelledError)
+def analysis_cancelled_handler(request: Request, exc: AnalysisCancelledError):
+    """Answer analyses stopped by their deadline or by the client."""
+    # 499 (client closed request) is never seen by the disconnected client
+    status_code = 504 if exc.timed_out else 499
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+
+
 # Include API routes
 app.include_router(common_router)  # 共通エンドポイント（プレフィックスなし）
 app.include_router(router)
 app.include_router(analyze_router)
 app.include_router(organization_router)
 app.include_router(outcome_router)
+app.include_router(job_router)
 
 
 @app.get("/health")
@@ -69,6 +122,17 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/db-pool")
+def db_pool_telemetry():
+    """
+    Database connection pool telemetry of this API process.
+
+    Reports checked-out connections, saturation (checked out / pool size plus
+    overflow), checkout timeouts and the distribution of checkout wait times.
+    """
+    return get_pool_telemetry()
+
+
 @app.get("/")
 def root():
     """Root endpoint."""
@@ -77,11 +141,13 @@ def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/health",
+            "db_pool": "/health/db-pool",
             "process_types": "/process/process-types",
             "analyses": "/process/analyses",
             "analysis_by_id": "/process/analyses/{analysis_id}",
             "compare": "/process/compare?before={id1}&after={id2}",
             "analyze": "/analyze (POST)",
+            "job": "/jobs/{job_id}",
             "preview": "/preview",
             "organization_handover": "/organization/handover",
             "organization_workload": "/organization/workload",
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Dict, Any
 from uuid import UUID
 from pydantic import BaseModel
-from sqlalchemy import Column, String, DateTime, JSON
+from sqlalchemy import Column, String, DateTime, JSON, LargeBinary
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 import uuid
 
@@ -18,7 +18,9 @@ class AnalysisResultORM(Base):
     analysis_name = Column(String(255), nullable=False)
     process_type = Column(String(100), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    result_data = Column(JSON, nullable=False)
+    # Either result_data or result_body (gzip-compressed body), see result_storage
+    result_data = Column(JSON, nullable=True)
+    result_body = Column(LargeBinary, nullable=True)
 
 
 class AnalysisResultCreate(BaseModel):
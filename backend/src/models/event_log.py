@@ -1,5 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Iterator, List, Optional, Union
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel
 
 
@@ -20,3 +22,172 @@ class EventLog(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+def _encode(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Dictionary-encode a column into (codes, labels); missing values map to -1."""
+    codes, labels = pd.factorize(values, use_na_sentinel=True)
+    return codes.astype(np.int32, copy=False), np.asarray(labels, dtype=object)
+
+
+def _to_epoch_ns(values: pd.Series) -> np.ndarray:
+    """Convert a timestamp column to int64 nanoseconds since the epoch."""
+    timestamps = pd.to_datetime(values)
+    if getattr(timestamps.dt, "tz", None) is not None:
+        timestamps = timestamps.dt.tz_convert("UTC").dt.tz_localize(None)
+    return timestamps.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+class ColumnarEventLog:
+    """
+    Column-oriented event log.
+
+    Events are stored as contiguous NumPy arrays sorted by (case, timestamp).
+    The string columns (case_id, activity, resource) are dictionary encoded:
+    each is an int32 code array plus a label array, with codes assigned in
+    order of first appearance. Timestamps are int64 nanoseconds since the epoch.
+
+    The list-of-EventLog representation is still available through iteration
+    or ``to_event_list()`` for callers that need individual event objects.
+    """
+
+    def __init__(
+        self,
+        case_codes: np.ndarray,
+        case_ids: np.ndarray,
+        activity_codes: np.ndarray,
+        activities: np.ndarray,
+        timestamps: np.ndarray,
+        resource_codes: np.ndarray,
+        resources: np.ndarray,
+    ):
+        self.case_codes = case_codes
+        self.case_ids = case_ids
+        self.activity_codes = activity_codes
+        self.activities = activities
+        self.timestamps = timestamps
+        self.resource_codes = resource_codes
+        self.resources = resources
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "ColumnarEventLog":
+        """
+        Build a columnar event log from a DataFrame.
+
+        Args:
+            df: DataFrame with case_id, activity and timestamp columns
+                (resource is optional)
+
+        Returns:
+            ColumnarEventLog sorted by case and timestamp
+        """
+        case_codes, case_ids = _encode(df["case_id"])
+        activity_codes, activities = _encode(df["activity"])
+        timestamps = _to_epoch_ns(df["timestamp"])
+
+        if "resource" in df.columns:
+            resource_codes, resources = _encode(df["resource"])
+        else:
+            resource_codes = np.full(len(df), -1, dtype=np.int32)
+            resources = np.empty(0, dtype=object)
+
+        # SQL で ORDER BY case_id, timestamp 済みなら並べ替えを省略
+        if not _is_sorted(case_codes, timestamps):
+            order = np.lexsort((timestamps, case_codes))
+            case_codes = case_codes[order]
+            activity_codes = activity_codes[order]
+            timestamps = timestamps[order]
+            resource_codes = resource_codes[order]
+
+        return cls(
+            case_codes=case_codes,
+            case_ids=case_ids,
+            activity_codes=activity_codes,
+            activities=activities,
+            timestamps=timestamps,
+            resource_codes=resource_codes,
+            resources=resources,
+        )
+
+    @classmethod
+    def from_events(cls, events: Iterable[EventLog]) -> "ColumnarEventLog":
+        """Build a columnar event log from EventLog objects."""
+        rows = [(e.case_id, e.activity, e.timestamp, e.resource) for e in events]
+        df = pd.DataFrame(
+            rows, columns=["case_id", "activity", "timestamp", "resource"]
+        )
+        return cls.from_dataframe(df)
+
+    @classmethod
+    def coerce(
+        cls, event_log: Union["ColumnarEventLog", Iterable[EventLog]]
+    ) -> "ColumnarEventLog":
+        """Return event_log as a ColumnarEventLog, converting a list if needed."""
+        if isinstance(event_log, cls):
+            return event_log
+        return cls.from_events(event_log)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __iter__(self) -> Iterator[EventLog]:
+        datetimes = pd.DatetimeIndex(self.timestamps.view("datetime64[ns]"))
+        for i in range(len(self)):
+            resource_code = self.resource_codes[i]
+            yield EventLog(
+                case_id=self.case_ids[self.case_codes[i]],
+                activity=self.activities[self.activity_codes[i]],
+                timestamp=datetimes[i].to_pydatetime(),
+                resource=(
+                    self.resources[resource_code] if resource_code >= 0 else None
+                ),
+            )
+
+    def to_event_list(self) -> List[EventLog]:
+        """Materialize the log as a list of EventLog objects."""
+        return list(self)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Decode the log into a DataFrame with the original column values."""
+        resource_codes = self.resource_codes
+        resources = np.append(self.resources, None)
+        return pd.DataFrame(
+            {
+                "case_id": self.case_ids[self.case_codes],
+                "activity": self.activities[self.activity_codes],
+                "timestamp": self.timestamps.view("datetime64[ns]"),
+                "resource": resources[resource_codes],
+            }
+        )
+
+    @property
+    def case_count(self) -> int:
+        """Number of distinct cases in the log."""
+        return len(self.case_ids)
+
+    def case_starts(self) -> np.ndarray:
+        """Index of the first event of every case."""
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(
+            np.concatenate(([True], self.case_codes[1:] != self.case_codes[:-1]))
+        )
+
+    def case_ends(self) -> np.ndarray:
+        """Index of the last event of every case."""
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(
+            np.concatenate((self.case_codes[1:] != self.case_codes[:-1], [True]))
+        )
+
+
+def _is_sorted(case_codes: np.ndarray, timestamps: np.ndarray) -> bool:
+    """Check whether events are already ordered by case and timestamp."""
+    if len(case_codes) < 2:
+        return True
+    case_step = np.diff(case_codes)
+    if np.any(case_step < 0):
+        return False
+    same_case = case_step == 0
+    return not np.any(np.diff(timestamps)[same_case] < 0)
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional, Dict, Any
 from pydantic import BaseModel
-from sqlalchemy import Column, String, DateTime, text
+from sqlalchemy import Column, String, DateTime, LargeBinary, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from src.db.connection import Base
 
@@ -21,7 +21,9 @@ class OutcomeAnalysisResult(Base):
     metric_name = Column(String(100), nullable=False)
     analysis_type = Column(String(50), nullable=False)
     filter_config = Column(JSONB, nullable=True)
-    result_data = Column(JSONB, nullable=False)
+    # result_data (JSONB) または result_body (gzip 圧縮したレスポンス本文) のどちらかを保存
+    result_data = Column(JSONB, nullable=True)
+    result_body = Column(LargeBinary, nullable=True)
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
 
 
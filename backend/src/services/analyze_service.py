@@ -5,32 +5,56 @@ This module provides functions to execute process mining analysis
 with various filtering options and save results to the database.
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Callable, Dict, Any, Iterator, Tuple
+from functools import cached_property
+import os
+import re
 import uuid
 from datetime import datetime
 import pandas as pd
 import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
 
 from src.db.connection import engine
-from src.models.event_log import EventLog
+from src.models.event_log import ColumnarEventLog
 from src.models.analysis_result import AnalysisResultORM
-from src.analysis.dfg_discovery import discover_dfg
-from src.analysis.performance_metrics import (
-    calculate_performance_metrics,
-    convert_dfg_to_react_flow,
+from src.analysis.dfg_kernel import (
+    NANOSECONDS_PER_HOUR,
+    DFGCounts,
+    directly_follows,
 )
+from src.analysis.parallel import parallel_directly_follows
+from src.analysis.streaming import StreamingLogAggregator
+from src.analysis.variants import VariantIndex
+from src.services.result_cache import result_cache
+from src.services.cost_model import Admission, cost_model
+from src.services.offload import offload_timed
+from src.services.cancellation import check_cancelled
+from src.services.result_storage import encode_result
 
 
-def load_event_log_from_db(
+# Plain date (YYYY-MM-DD) accepted by execution_mode="mart"
+_DATE_ONLY = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Supported execute_analysis execution modes
+EXECUTION_MODES = ("in_memory", "parallel", "streaming", "sql", "mart")
+
+# Rows per chunk when streaming the event log (execution_mode="streaming")
+EVENT_LOG_CHUNK_SIZE = int(os.getenv("EVENT_LOG_CHUNK_SIZE", "50000"))
+
+
+def _event_log_query(
     process_type: str,
     filter_mode: str = "all",
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
-) -> list[EventLog]:
+) -> Tuple[TextClause, Dict[str, Any]]:
     """
-    Load event log from fct_event_log table with date filtering.
+    Build the event log query for the filter_mode variants.
+
+    Rows are ordered by case_id and timestamp.
 
     Args:
         process_type: Process type to filter
@@ -39,7 +63,7 @@ def load_event_log_from_db(
         date_to: End date (ISO8601 format)
 
     Returns:
-        List of EventLog objects
+        Tuple of (query, bind parameters)
     """
 
     if filter_mode == "all" or (date_from is None and date_to is None):
@@ -58,19 +82,12 @@ def load_event_log_from_db(
         # ケース開始日フィルタ（推奨）
         query = text(
             """
-            WITH case_start_dates AS (
-              SELECT
-                case_id,
-                MIN(timestamp) as start_date
-              FROM public.fct_event_log
-              WHERE process_type = :process_type
-              GROUP BY case_id
-            )
             SELECT e.case_id, e.activity, e.timestamp, e.resource
-            FROM public.fct_event_log e
-            JOIN case_start_dates c ON e.case_id = c.case_id
-            WHERE e.process_type = :process_type
-              AND c.start_date BETWEEN :date_from AND :date_to
+            FROM public.fct_case_summary c
+            JOIN public.fct_event_log e
+              ON e.process_type = c.process_type AND e.case_id = c.case_id
+            WHERE c.process_type = :process_type
+              AND c.case_start_at BETWEEN :date_from AND :date_to
             ORDER BY e.case_id, e.timestamp
         """
         )
@@ -84,19 +101,12 @@ def load_event_log_from_db(
         # ケース完了日フィルタ
         query = text(
             """
-            WITH case_end_dates AS (
-              SELECT
-                case_id,
-                MAX(timestamp) as end_date
-              FROM public.fct_event_log
-              WHERE process_type = :process_type
-              GROUP BY case_id
-            )
             SELECT e.case_id, e.activity, e.timestamp, e.resource
-            FROM public.fct_event_log e
-            JOIN case_end_dates c ON e.case_id = c.case_id
-            WHERE e.process_type = :process_type
-              AND c.end_date BETWEEN :date_from AND :date_to
+            FROM public.fct_case_summary c
+            JOIN public.fct_event_log e
+              ON e.process_type = c.process_type AND e.case_id = c.case_id
+            WHERE c.process_type = :process_type
+              AND c.case_end_at BETWEEN :date_from AND :date_to
             ORDER BY e.case_id, e.timestamp
         """
         )
@@ -108,20 +118,644 @@ def load_event_log_from_db(
     else:
         raise ValueError(f"Invalid filter_mode: {filter_mode}")
 
+    return query, params
+
+
+def load_event_log_from_db(
+    process_type: str,
+    filter_mode: str = "all",
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> ColumnarEventLog:
+    """
+    Load event log from fct_event_log table with date filtering.
+
+    Args:
+        process_type: Process type to filter
+        filter_mode: "case_start" | "case_end" | "all"
+        date_from: Start date (ISO8601 format)
+        date_to: End date (ISO8601 format)
+
+    Returns:
+        Columnar event log sorted by case and timestamp
+    """
+    query, params = _event_log_query(process_type, filter_mode, date_from, date_to)
+    df = pd.read_sql(query, engine, params=params)
+
+    return ColumnarEventLog.from_dataframe(df)
+
+
+def iter_event_log_chunks(
+    process_type: str,
+    filter_mode: str = "all",
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    chunksize: int = EVENT_LOG_CHUNK_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read the event log in bounded chunks through a server-side cursor.
+
+    Args:
+        process_type: Process type to filter
+        filter_mode: "case_start" | "case_end" | "all"
+        date_from: Start date (ISO8601 format)
+        date_to: End date (ISO8601 format)
+        chunksize: Rows per chunk
+
+    Yields:
+        DataFrames ordered by case_id and timestamp
+    """
+    query, params = _event_log_query(process_type, filter_mode, date_from, date_to)
+    with engine.connect().execution_options(
+        stream_results=True, max_row_buffer=chunksize
+    ) as conn:
+        yield from pd.read_sql(query, conn, params=params, chunksize=chunksize)
+
+
+def stream_event_log_from_db(
+    process_type: str,
+    filter_mode: str = "all",
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    chunksize: int = EVENT_LOG_CHUNK_SIZE,
+) -> StreamingLogAggregator:
+    """
+    Aggregate the event log chunk by chunk without materializing it.
+
+    Args:
+        process_type: Process type to filter
+        filter_mode: "case_start" | "case_end" | "all"
+        date_from: Start date (ISO8601 format)
+        date_to: End date (ISO8601 format)
+        chunksize: Rows per chunk
+
+    Returns:
+        Finished StreamingLogAggregator
+    """
+    aggregator = StreamingLogAggregator()
+    for chunk in iter_event_log_chunks(
+        process_type, filter_mode, date_from, date_to, chunksize
+    ):
+        check_cancelled()
+        aggregator.add_chunk(chunk)
+    aggregator.finish()
+    return aggregator
+
+
+def _streamed_lead_time_statistics(
+    aggregator: StreamingLogAggregator,
+) -> Dict[str, Any]:
+    """
+    Calculate lead time statistics from a streamed aggregation.
+
+    Returns the same structure as calculate_lead_time_statistics. The happy
+    path is the most frequent variant (first seen wins on ties).
+    """
+    lead_times = aggregator.case_lead_times()
+    if len(lead_times) == 0:
+        return {
+            "case_count": 0,
+            "lead_time_hours": {"min": None, "max": None, "median": None},
+        }
+
+    case_variants = aggregator.case_variants()
+    happy_variant = int(np.argmax(np.bincount(case_variants)))
+    happy_lead_times = lead_times[case_variants == happy_variant]
+
+    return {
+        "case_count": len(lead_times),
+        "lead_time_hours": {
+            "min": float(np.min(lead_times)),
+            "max": float(np.max(lead_times)),
+            "median": float(np.median(lead_times)),
+        },
+        "happy_path": {
+            "case_count": len(happy_lead_times),
+            "lead_time_hours": {
+                "min": float(np.min(happy_lead_times)),
+                "max": float(np.max(happy_lead_times)),
+                "median": float(np.median(happy_lead_times)),
+            },
+            "path": aggregator.variant_path(happy_variant),
+        },
+    }
+
+
+def _case_summary_condition(
+    filter_mode: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> str:
+    """
+    Build the fct_case_summary predicate (alias ``c``) for a filter_mode.
+
+    Args:
+        filter_mode: "case_start" | "case_end" | "all"
+        date_from: Start date (ISO8601 format)
+        date_to: End date (ISO8601 format)
+
+    Returns:
+        SQL fragment to be appended to ``WHERE c.process_type = :process_type``
+    """
+    if filter_mode == "all" or (date_from is None and date_to is None):
+        return ""
+    if filter_mode == "case_start":
+        return "AND c.case_start_at BETWEEN :date_from AND :date_to"
+    if filter_mode == "case_end":
+        return "AND c.case_end_at BETWEEN :date_from AND :date_to"
+    raise ValueError(f"Invalid filter_mode: {filter_mode}")
+
+
+def _filtered_events_cte(
+    filter_mode: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> str:
+    """
+    Build ``filtered_cases`` and ``filtered_events`` CTEs for a filter_mode.
+
+    filtered_cases exposes case_id and lead_time_hours of the matching cases
+    from fct_case_summary; filtered_events exposes case_id, activity and
+    timestamp of their events. Uses the :process_type, :date_from and
+    :date_to bind parameters.
+
+    Args:
+        filter_mode: "case_start" | "case_end" | "all"
+        date_from: Start date (ISO8601 format)
+        date_to: End date (ISO8601 format)
+
+    Returns:
+        SQL fragment to be placed after ``WITH``
+    """
+    condition = _case_summary_condition(filter_mode, date_from, date_to)
+    if condition:
+        events = """
+              SELECT e.case_id, e.activity, e.timestamp
+              FROM public.fct_event_log e
+              JOIN filtered_cases c ON e.case_id = c.case_id
+              WHERE e.process_type = :process_type
+        """
+    else:
+        events = """
+              SELECT case_id, activity, timestamp
+              FROM public.fct_event_log
+              WHERE process_type = :process_type
+        """
+
+    return f"""
+            filtered_cases AS (
+              SELECT c.case_id, c.lead_time_hours
+              FROM public.fct_case_summary c
+              WHERE c.process_type = :process_type
+                {condition}
+            ),
+            filtered_events AS ({events})
+        """  # nosec B608 - condition is one of two fixed SQL predicates
+
+
+def load_dfg_counts_from_db(
+    process_type: str,
+    filter_mode: str = "all",
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> DFGCounts:
+    """
+    Compute the directly-follows relation inside PostgreSQL.
+
+    Uses LEAD() over each case's events and returns only the aggregated node
+    and edge rows, so no event rows are transferred to the API.
+
+    Args:
+        process_type: Process type to filter
+        filter_mode: "case_start" | "case_end" | "all"
+        date_from: Start date (ISO8601 format)
+        date_to: End date (ISO8601 format)
+
+    Returns:
+        DFGCounts with the same activity order as the in-memory path
+    """
+    query = text(
+        "WITH "
+        + _filtered_events_cte(filter_mode, date_from, date_to)
+        + """,
+            ordered_events AS (
+              SELECT
+                activity,
+                LEAD(activity) OVER w AS next_activity,
+                EXTRACT(EPOCH FROM LEAD(timestamp) OVER w - timestamp)::float8
+                  / 3600.0 AS waiting_time_hours,
+                ROW_NUMBER() OVER (ORDER BY case_id, timestamp) AS event_order
+              FROM filtered_events
+              WINDOW w AS (PARTITION BY case_id ORDER BY timestamp)
+            )
+            SELECT
+              activity AS source,
+              next_activity AS target,
+              COUNT(*) AS frequency,
+              SUM(waiting_time_hours) AS waiting_time_sum,
+              COUNT(waiting_time_hours) AS waiting_time_count,
+              MIN(event_order) AS first_seen
+            FROM ordered_events
+            GROUP BY activity, next_activity
+        """
+    )
+    params = {"process_type": process_type, "date_from": date_from, "date_to": date_to}
+
+    df = pd.read_sql(query, engine, params=params)
+
+    return _dfg_counts_from_transition_rows(df)
+
+
+def load_dfg_counts_from_mart(
+    process_type: str,
+    filter_mode: str = "all",
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> DFGCounts:
+    """
+    Merge the pre-aggregated rows of fct_daily_directly_follows.
+
+    Reads one row per day and activity pair instead of the events, so the
+    cost depends on the number of days in the window.
+
+    Args:
+        process_type: Process type to filter
+        filter_mode: "case_start" | "case_end" | "all"
+        date_from: Start date (YYYY-MM-DD)
+        date_to: End date (YYYY-MM-DD)
+
+    Returns:
+        DFGCounts identical to the in-memory path
+
+    Raises:
+        ValueError: If the dates are not plain dates
+    """
+    if filter_mode == "all" or (date_from is None and date_to is None):
+        date_condition = ""
+    elif filter_mode in ("case_start", "case_end"):
+        for value in (date_from, date_to):
+            if value is not None and not _DATE_ONLY.match(value):
+                raise ValueError("mart モードでは日付（YYYY-MM-DD）のみ指定できます")
+        # Equivalent to "<case start/end timestamp> BETWEEN :date_from AND :date_to"
+        day = filter_mode + "_date"
+        midnight = filter_mode + "_at_midnight"
+        date_condition = f"""
+              AND {day} >= CAST(:date_from AS date)
+              AND ({day} < CAST(:date_to AS date)
+                   OR ({day} = CAST(:date_to AS date) AND {midnight}))
+        """
+    else:
+        raise ValueError(f"Invalid filter_mode: {filter_mode}")
+
+    query = text(
+        f"""
+            SELECT
+              source_activity AS source,
+              target_activity AS target,
+              SUM(frequency) AS frequency,
+              SUM(waiting_time_sum_hours) AS waiting_time_sum,
+              SUM(waiting_time_count) AS waiting_time_count,
+              MIN(first_seen) AS first_seen
+            FROM public.fct_daily_directly_follows
+            WHERE process_type = :process_type
+              {date_condition}
+            GROUP BY source_activity, target_activity
+        """  # nosec B608 - date_condition is built from fixed column names
+    )
+    params = {"process_type": process_type, "date_from": date_from, "date_to": date_to}
+
     df = pd.read_sql(query, engine, params=params)
 
-    event_log = []
-    for _, row in df.iterrows():
-        event_log.append(
-            EventLog(
-                case_id=row["case_id"],
-                activity=row["activity"],
-                timestamp=row["timestamp"],
-                resource=row["resource"],
+    return _dfg_counts_from_transition_rows(df)
+
+
+def _dfg_counts_from_transition_rows(df: pd.DataFrame) -> DFGCounts:
+    """
+    Build DFGCounts from aggregated (source, target) rows.
+
+    Args:
+        df: Rows with source, target (NULL for the last event of a case),
+            frequency, waiting_time_sum, waiting_time_count and first_seen
+
+    Returns:
+        DFGCounts with activities in order of first appearance, as in
+        ColumnarEventLog
+    """
+    nodes = (
+        df.groupby("source", sort=False)
+        .agg(frequency=("frequency", "sum"), first_seen=("first_seen", "min"))
+        .sort_values("first_seen")
+        .rename_axis("activity")
+        .reset_index()
+    )
+    edges = df[df["target"].notna()]
+    return DFGCounts.from_aggregates(nodes, edges)
+
+
+def load_lead_time_statistics_from_db(
+    process_type: str,
+    filter_mode: str = "all",
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Calculate lead time and happy path statistics inside PostgreSQL.
+
+    Returns the same structure as calculate_lead_time_statistics.
+    """
+    query = text(
+        "WITH "
+        + _filtered_events_cte(filter_mode, date_from, date_to)
+        + """,
+            paths AS (
+              SELECT
+                case_id,
+                STRING_AGG(activity, CHR(31) ORDER BY timestamp) AS path
+              FROM filtered_events
+              GROUP BY case_id
+            ),
+            happy_path AS (
+              SELECT path
+              FROM paths
+              GROUP BY path
+              ORDER BY COUNT(*) DESC, MIN(case_id)
+              LIMIT 1
+            )
+            SELECT
+              'all' AS scope,
+              COUNT(*) AS case_count,
+              MIN(lead_time_hours) AS min,
+              MAX(lead_time_hours) AS max,
+              PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY lead_time_hours) AS median,
+              NULL AS path
+            FROM filtered_cases
+            UNION ALL
+            SELECT
+              'happy_path',
+              COUNT(*),
+              MIN(c.lead_time_hours),
+              MAX(c.lead_time_hours),
+              PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY c.lead_time_hours),
+              MAX(p.path)
+            FROM filtered_cases c
+            JOIN paths p ON c.case_id = p.case_id
+            JOIN happy_path h ON p.path = h.path
+        """
+    )
+    params = {"process_type": process_type, "date_from": date_from, "date_to": date_to}
+
+    return _lead_time_statistics_from_rows(pd.read_sql(query, engine, params=params))
+
+
+def load_lead_time_statistics_from_mart(
+    process_type: str,
+    filter_mode: str = "all",
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Calculate lead time and happy path statistics from fct_case_summary.
+
+    The happy path is the most frequent trace of the case rows, so no event
+    is read. Returns the same structure as calculate_lead_time_statistics.
+    """
+    condition = _case_summary_condition(filter_mode, date_from, date_to)
+    query = text(
+        f"""
+            WITH filtered_cases AS (
+              SELECT c.case_id, c.lead_time_hours, c.trace
+              FROM public.fct_case_summary c
+              WHERE c.process_type = :process_type
+                {condition}
+            ),
+            happy_path AS (
+              SELECT trace
+              FROM filtered_cases
+              GROUP BY trace
+              ORDER BY COUNT(*) DESC, MIN(case_id)
+              LIMIT 1
             )
+            SELECT
+              'all' AS scope,
+              COUNT(*) AS case_count,
+              MIN(lead_time_hours) AS min,
+              MAX(lead_time_hours) AS max,
+              PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY lead_time_hours) AS median,
+              NULL AS path
+            FROM filtered_cases
+            UNION ALL
+            SELECT
+              'happy_path',
+              COUNT(*),
+              MIN(c.lead_time_hours),
+              MAX(c.lead_time_hours),
+              PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY c.lead_time_hours),
+              MAX(c.trace)
+            FROM filtered_cases c
+            JOIN happy_path h ON c.trace = h.trace
+        """  # nosec B608 - condition is one of two fixed SQL predicates
+    )
+    params = {"process_type": process_type, "date_from": date_from, "date_to": date_to}
+
+    return _lead_time_statistics_from_rows(pd.read_sql(query, engine, params=params))
+
+
+def _lead_time_statistics_from_rows(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Build lead time statistics from the aggregated ``all``/``happy_path`` rows.
+
+    Args:
+        df: Rows with scope, case_count, min, max, median and path (the
+            happy path activities separated by CHR(31))
+
+    Returns:
+        The structure returned by calculate_lead_time_statistics
+    """
+    df = df.set_index("scope")
+
+    def _stats(row: pd.Series) -> Dict[str, Optional[float]]:
+        if int(row["case_count"]) == 0:
+            return {"min": None, "max": None, "median": None}
+        return {
+            "min": float(row["min"]),
+            "max": float(row["max"]),
+            "median": float(row["median"]),
+        }
+
+    overall = df.loc["all"]
+    if int(overall["case_count"]) == 0:
+        return {
+            "case_count": 0,
+            "lead_time_hours": {"min": None, "max": None, "median": None},
+        }
+
+    happy = df.loc["happy_path"]
+    return {
+        "case_count": int(overall["case_count"]),
+        "lead_time_hours": _stats(overall),
+        "happy_path": {
+            "case_count": int(happy["case_count"]),
+            "lead_time_hours": _stats(happy),
+            "path": happy["path"].split(chr(31)) if pd.notna(happy["path"]) else [],
+        },
+    }
+
+
+class AnalysisContext:
+    """
+    Request-scoped analysis data.
+
+    Loads the filtered event log once, on first use, and caches the results
+    derived from it so that DFG discovery, performance metrics, lead-time
+    statistics and happy-path detection all share a single extraction.
+    """
+
+    def __init__(
+        self,
+        process_type: str,
+        filter_mode: str = "all",
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ):
+        self.process_type = process_type
+        self.filter_mode = filter_mode
+        self.date_from = date_from
+        self.date_to = date_to
+
+    @cached_property
+    def event_log(self) -> ColumnarEventLog:
+        """Filtered event log (loaded from the database on first access)."""
+        return load_event_log_from_db(
+            self.process_type, self.filter_mode, self.date_from, self.date_to
+        )
+
+    @cached_property
+    def dfg_counts(self) -> DFGCounts:
+        """Node/edge frequencies and waiting times of the event log."""
+        return directly_follows(self.event_log)
+
+    @cached_property
+    def case_lead_times(self) -> np.ndarray:
+        """Lead time of every case in hours, in case code order."""
+        return _case_lead_time_hours(self.event_log)
+
+    @cached_property
+    def variants(self) -> VariantIndex:
+        """Cases of the event log grouped by activity sequence."""
+        return VariantIndex.from_log(self.event_log)
+
+
+def _compute_process_analysis(
+    process_type: str,
+    filter_mode: str,
+    date_from: Optional[str],
+    date_to: Optional[str],
+    execution_mode: str,
+) -> Dict[str, Any]:
+    """
+    Compute the React Flow result and counts of a process analysis.
+
+    Runs in an offload worker process (see src.services.offload).
+
+    Returns:
+        Dictionary with result_json, event_count and case_count
+
+    Raises:
+        ValueError: If no events found for the specified criteria
+    """
+    if execution_mode in ("sql", "mart"):
+        # 1-3. Aggregate nodes, edges and waiting times inside PostgreSQL
+        load_dfg_counts = (
+            load_dfg_counts_from_mart
+            if execution_mode == "mart"
+            else load_dfg_counts_from_db
+        )
+        dfg_counts = load_dfg_counts(process_type, filter_mode, date_from, date_to)
+        event_count = int(dfg_counts.node_frequency.sum())
+        # Every case contributes (events - 1) transitions
+        case_count = event_count - int(dfg_counts.edge_frequency.sum())
+    elif execution_mode == "streaming":
+        # 1-3. Read the events in chunks and aggregate complete cases
+        aggregator = stream_event_log_from_db(
+            process_type, filter_mode, date_from, date_to
+        )
+        dfg_counts = aggregator.dfg_counts()
+        event_count = aggregator.event_count
+        case_count = aggregator.case_count
+    elif execution_mode in ("in_memory", "parallel"):
+        # 1. Load event log from database (shared by all steps below)
+        context = AnalysisContext(process_type, filter_mode, date_from, date_to)
+        event_log = context.event_log
+
+        # 2-3. Discover DFG and calculate performance metrics in a single pass
+        # (or one pass per hash partition of cases across worker processes)
+        check_cancelled()
+        if execution_mode == "parallel":
+            dfg_counts = parallel_directly_follows(event_log)
+        else:
+            dfg_counts = context.dfg_counts
+        event_count = len(event_log)
+        case_count = event_log.case_count
+    else:
+        raise ValueError(f"Invalid execution_mode: {execution_mode}")
+
+    if event_count == 0:
+        raise ValueError("指定された期間にイベントが見つかりません")
+
+    # 4. Convert to React Flow format
+    check_cancelled()
+    result_json = dfg_counts.to_react_flow()
+
+    # 5. Calculate lead time statistics
+    if execution_mode == "mart":
+        lead_time_stats = load_lead_time_statistics_from_mart(
+            process_type, filter_mode, date_from, date_to
+        )
+    elif execution_mode == "sql":
+        lead_time_stats = load_lead_time_statistics_from_db(
+            process_type, filter_mode, date_from, date_to
+        )
+    elif execution_mode == "streaming":
+        lead_time_stats = _streamed_lead_time_statistics(aggregator)
+    else:
+        lead_time_stats = calculate_lead_time_statistics(
+            process_type, filter_mode, date_from, date_to, context=context
         )
 
-    return event_log
+    # Add lead time stats to result_json
+    result_json["lead_time_stats"] = lead_time_stats
+
+    return {
+        "result_json": result_json,
+        "event_count": event_count,
+        "case_count": case_count,
+    }
+
+
+def _measured_process_analysis(
+    process_type: str,
+    filter_mode: str,
+    date_from: Optional[str],
+    date_to: Optional[str],
+    execution_mode: str,
+) -> Dict[str, Any]:
+    """Compute a process analysis and calibrate the cost model by its runtime."""
+    # Measured in the worker, so time spent waiting for a slot is not counted
+    computed, seconds = offload_timed(
+        _compute_process_analysis,
+        process_type,
+        filter_mode,
+        date_from,
+        date_to,
+        execution_mode,
+    )
+    cost_model.record(
+        f"process:{execution_mode}",
+        computed["event_count"],
+        computed["case_count"],
+        seconds,
+    )
+    return computed
 
 
 def execute_analysis(
@@ -131,6 +765,8 @@ def execute_analysis(
     filter_mode: str = "all",
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
+    execution_mode: str = "in_memory",
+    progress: Optional[Callable[[float], None]] = None,
 ) -> Dict[str, Any]:
     """
     Execute process mining analysis and save to database.
@@ -142,6 +778,13 @@ def execute_analysis(
         filter_mode: "case_start" | "case_end" | "all"
         date_from: Start date (ISO8601 format)
         date_to: End date (ISO8601 format)
+        execution_mode: "in_memory" loads the events into the API;
+            "parallel" also loads them but aggregates partitions of the
+            cases in worker processes; "streaming" aggregates them chunk by chunk with bounded memory;
+            "sql" aggregates the directly-follows relation inside PostgreSQL;
+            "mart" merges the pre-aggregated fct_daily_directly_follows rows
+        progress: Optional callback receiving the completed fraction (0-1),
+            used by background jobs
 
     Returns:
         Dictionary with analysis result metadata
@@ -150,28 +793,31 @@ def execute_analysis(
         ValueError: If no events found for the specified criteria
     """
 
-    # 1. Load event log from database
-    event_log = load_event_log_from_db(process_type, filter_mode, date_from, date_to)
-
-    if not event_log:
-        raise ValueError("指定された期間にイベントが見つかりません")
-
-    # 2. Discover DFG
-    dfg = discover_dfg(event_log)
-
-    # 3. Calculate performance metrics
-    dfg_with_metrics = calculate_performance_metrics(event_log, dfg)
+    if execution_mode not in EXECUTION_MODES:
+        raise ValueError(f"Invalid execution_mode: {execution_mode}")
 
-    # 4. Convert to React Flow format
-    result_json = convert_dfg_to_react_flow(dfg_with_metrics)
-
-    # 5. Calculate lead time statistics
-    lead_time_stats = calculate_lead_time_statistics(
-        process_type, filter_mode, date_from, date_to
+    # 1-5. Compute the analysis, or reuse the result of an identical request
+    # on the same data version
+    computed, cached = result_cache.get_or_compute(
+        "process",
+        {
+            "process_type": process_type,
+            "filter_mode": filter_mode,
+            "date_from": date_from,
+            "date_to": date_to,
+            # Modes may differ slightly (e.g. floating point sums, the mart's
+            # date-only windows), so results are not shared across them
+            "execution_mode": execution_mode,
+        },
+        lambda: _measured_process_analysis(
+            process_type, filter_mode, date_from, date_to, execution_mode
+        ),
     )
-
-    # Add lead time stats to result_json
-    result_json["lead_time_stats"] = lead_time_stats
+    if progress:
+        progress(0.9)
+    result_json = computed["result_json"]
+    event_count = computed["event_count"]
+    case_count = computed["case_count"]
 
     # 6. Save to database
     analysis_id = uuid.uuid4()
@@ -180,24 +826,25 @@ def execute_analysis(
         analysis_name=analysis_name,
         process_type=process_type,
         created_at=datetime.utcnow(),
-        result_data=result_json,
     )
+    # The stored body is exactly what GET /process/analyses/{id} returns
+    analysis_result.result_body = encode_result(result_json)
+    if analysis_result.result_body is None:
+        analysis_result.result_data = result_json
     db.add(analysis_result)
     db.commit()
 
-    # 7. Calculate case count
-    case_count = len(set(event.case_id for event in event_log))
-
     return {
         "analysis_id": str(analysis_id),
         "analysis_name": analysis_name,
         "process_type": process_type,
         "created_at": analysis_result.created_at.isoformat(),
-        "event_count": len(event_log),
+        "event_count": event_count,
         "case_count": case_count,
         "node_count": len(result_json["nodes"]),
         "edge_count": len(result_json["edges"]),
-        "cached": False,
+        "cached": cached,
+        "execution_mode": execution_mode,
         "filter_applied": {
             "mode": filter_mode,
             "date_from": date_from,
@@ -222,88 +869,83 @@ def get_preview(
         date_to: End date (ISO8601 format)
 
     Returns:
-        Dictionary with preview information
+        Dictionary with preview information, including the estimated runtime
+        and peak memory of every analysis (see src.services.cost_model)
     """
-
-    if filter_mode == "all" or (date_from is None and date_to is None):
-        query = text(
-            """
-            SELECT
-                COUNT(*) as event_count,
-                COUNT(DISTINCT case_id) as case_count,
-                MIN(timestamp) as min_date,
-                MAX(timestamp) as max_date
-            FROM public.fct_event_log
-            WHERE process_type = :process_type
-        """
-        )
-        params = {"process_type": process_type}
-
-    elif filter_mode == "case_start":
-        query = text(
-            """
-            WITH case_start_dates AS (
-              SELECT
-                case_id,
-                MIN(timestamp) as start_date
-              FROM public.fct_event_log
-              WHERE process_type = :process_type
-              GROUP BY case_id
-            ),
-            filtered_cases AS (
-              SELECT case_id
-              FROM case_start_dates
-              WHERE start_date BETWEEN :date_from AND :date_to
-            )
-            SELECT
-                COUNT(*) as event_count,
-                COUNT(DISTINCT e.case_id) as case_count,
-                MIN(e.timestamp) as min_date,
-                MAX(e.timestamp) as max_date
-            FROM public.fct_event_log e
-            JOIN filtered_cases c ON e.case_id = c.case_id
-            WHERE e.process_type = :process_type
-        """
-        )
-        params = {
+    result, _ = result_cache.get_or_compute(
+        "preview",
+        {
             "process_type": process_type,
+            "filter_mode": filter_mode,
             "date_from": date_from,
             "date_to": date_to,
-        }
+        },
+        lambda: _load_preview(process_type, filter_mode, date_from, date_to),
+    )
+    # Estimated after the cache, as the runtime calibration keeps changing
+    result["estimates"] = cost_model.estimates(
+        result["event_count"], result["case_count"]
+    )
+    return result
 
-    elif filter_mode == "case_end":
-        query = text(
-            """
-            WITH case_end_dates AS (
-              SELECT
-                case_id,
-                MAX(timestamp) as end_date
-              FROM public.fct_event_log
-              WHERE process_type = :process_type
-              GROUP BY case_id
-            ),
-            filtered_cases AS (
-              SELECT case_id
-              FROM case_end_dates
-              WHERE end_date BETWEEN :date_from AND :date_to
-            )
+
+def admit_analysis(
+    analysis: str,
+    process_type: str,
+    filter_mode: str = "all",
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    background: bool = False,
+) -> Admission:
+    """
+    Apply admission control to an analysis request using its preview counts.
+
+    Args:
+        analysis: Key of the cost model (e.g. "process:in_memory", "organization")
+        process_type: Process type
+        filter_mode: "case_start" | "case_end" | "all"
+        date_from: Start date (ISO8601 format)
+        date_to: End date (ISO8601 format)
+        background: Whether the request asked for a background job
+
+    Returns:
+        Admission telling whether to run the analysis as a background job
+
+    Raises:
+        AnalysisTooLargeError: If the analysis would exceed the memory budget
+    """
+    preview = get_preview(process_type, filter_mode, date_from, date_to)
+    return cost_model.admit(
+        analysis, preview["event_count"], preview["case_count"], background
+    )
+
+
+def _load_preview(
+    process_type: str,
+    filter_mode: str,
+    date_from: Optional[str],
+    date_to: Optional[str],
+) -> Dict[str, Any]:
+    """Query the preview of analysis scope from fct_case_summary."""
+
+    condition = _case_summary_condition(filter_mode, date_from, date_to)
+    query = text(
+        f"""
             SELECT
-                COUNT(*) as event_count,
-                COUNT(DISTINCT e.case_id) as case_count,
-                MIN(e.timestamp) as min_date,
-                MAX(e.timestamp) as max_date
-            FROM public.fct_event_log e
-            JOIN filtered_cases c ON e.case_id = c.case_id
-            WHERE e.process_type = :process_type
-        """
-        )
-        params = {
-            "process_type": process_type,
-            "date_from": date_from,
-            "date_to": date_to,
-        }
-    else:
-        raise ValueError(f"Invalid filter_mode: {filter_mode}")
+                COALESCE(SUM(c.event_count), 0) as event_count,
+                COUNT(*) as case_count,
+                MIN(c.case_start_at) as min_date,
+                MAX(c.case_end_at) as max_date
+            FROM public.fct_case_summary c
+            WHERE c.process_type = :process_type
+              {condition}
+        """  # nosec B608 - condition is one of two fixed SQL predicates
+    )
+    params = {
+        "process_type": process_type,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
 
     df = pd.read_sql(query, engine, params=params)
     result = df.iloc[0]
@@ -332,6 +974,7 @@ def calculate_lead_time_statistics(
     filter_mode: str = "all",
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
+    context: Optional[AnalysisContext] = None,
 ) -> Dict[str, Any]:
     """
     Calculate case lead time statistics (time from case start to case end).
@@ -341,6 +984,8 @@ def calculate_lead_time_statistics(
         filter_mode: "case_start" | "case_end" | "all"
         date_from: Start date (ISO8601 format)
         date_to: End date (ISO8601 format)
+        context: Analysis context of the current request; reuses its
+            already-loaded event log instead of querying again
 
     Returns:
         Dictionary with lead time statistics:
@@ -354,8 +999,59 @@ def calculate_lead_time_statistics(
         }
     """
 
-    # Load event log
-    event_log = load_event_log_from_db(process_type, filter_mode, date_from, date_to)
+    if context is None:
+        # Standalone request: reuse the result of an identical request on the
+        # same data version
+        result, _ = result_cache.get_or_compute(
+            "lead_time",
+            {
+                "process_type": process_type,
+                "filter_mode": filter_mode,
+                "date_from": date_from,
+                "date_to": date_to,
+            },
+            lambda: _measured_lead_time_statistics(
+                process_type, filter_mode, date_from, date_to
+            ),
+        )
+        return result
+
+    return _lead_time_statistics(context)
+
+
+def _load_lead_time_statistics(
+    process_type: str,
+    filter_mode: str,
+    date_from: Optional[str],
+    date_to: Optional[str],
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Load the event log and calculate its lead time statistics (offloaded).
+
+    Returns:
+        Tuple of (lead time statistics, event count)
+    """
+    context = AnalysisContext(process_type, filter_mode, date_from, date_to)
+    return _lead_time_statistics(context), len(context.event_log)
+
+
+def _measured_lead_time_statistics(
+    process_type: str,
+    filter_mode: str,
+    date_from: Optional[str],
+    date_to: Optional[str],
+) -> Dict[str, Any]:
+    """Calculate lead time statistics and calibrate the cost model by their runtime."""
+    (stats, event_count), seconds = offload_timed(
+        _load_lead_time_statistics, process_type, filter_mode, date_from, date_to
+    )
+    cost_model.record("lead_time", event_count, stats["case_count"], seconds)
+    return stats
+
+
+def _lead_time_statistics(context: AnalysisContext) -> Dict[str, Any]:
+    """Calculate lead time statistics from the event log of a context."""
+    event_log = context.event_log
 
     if not event_log:
         return {
@@ -363,25 +1059,17 @@ def calculate_lead_time_statistics(
             "lead_time_hours": {"min": None, "max": None, "median": None},
         }
 
-    # Convert to DataFrame
-    df = pd.DataFrame(
-        [{"case_id": e.case_id, "timestamp": e.timestamp} for e in event_log]
-    )
-
     # Calculate lead time for each case
-    case_lead_times = df.groupby("case_id")["timestamp"].agg(["min", "max"])
-    case_lead_times["lead_time"] = (
-        case_lead_times["max"] - case_lead_times["min"]
-    ).dt.total_seconds() / 3600
-
-    # Calculate statistics
-    lead_times = case_lead_times["lead_time"].values
+    # (events are sorted by case and timestamp: first = start, last = end)
+    lead_times = context.case_lead_times
 
     # Also calculate happy path statistics
-    happy_path_stats = _calculate_happy_path_lead_time(event_log)
+    happy_path_stats = _calculate_happy_path_lead_time(
+        event_log, lead_times, context.variants
+    )
 
     return {
-        "case_count": len(case_lead_times),
+        "case_count": len(lead_times),
         "lead_time_hours": {
             "min": float(np.min(lead_times)),
             "max": float(np.max(lead_times)),
@@ -391,14 +1079,29 @@ def calculate_lead_time_statistics(
     }
 
 
-def _calculate_happy_path_lead_time(event_log: list[EventLog]) -> Dict[str, Any]:
+def _case_lead_time_hours(event_log: ColumnarEventLog) -> np.ndarray:
+    """Lead time of every case in hours, in case order."""
+    timestamps = event_log.timestamps
+    ends = timestamps[event_log.case_ends()]
+    starts = timestamps[event_log.case_starts()]
+    return (ends - starts) / NANOSECONDS_PER_HOUR
+
+
+def _calculate_happy_path_lead_time(
+    event_log: ColumnarEventLog,
+    case_lead_times: Optional[np.ndarray] = None,
+    variants: Optional[VariantIndex] = None,
+) -> Dict[str, Any]:
     """
     Calculate lead time statistics for cases following the happy path.
 
-    Happy path is defined as the most frequent complete path from start to end.
+    Happy path is defined as the most frequent complete path from start to end
+    (the first appearing one on ties).
 
     Args:
-        event_log: List of event log entries
+        event_log: Columnar event log
+        case_lead_times: Precomputed lead time per case in case code order
+        variants: Precomputed variant index of the event log
 
     Returns:
         Dictionary with happy path lead time statistics
@@ -410,55 +1113,18 @@ def _calculate_happy_path_lead_time(event_log: list[EventLog]) -> Dict[str, Any]
             "path": [],
         }
 
-    # Convert to DataFrame
-    df = pd.DataFrame(
-        [
-            {"case_id": e.case_id, "activity": e.activity, "timestamp": e.timestamp}
-            for e in event_log
-        ]
-    )
-
-    # Sort by case and timestamp
-    df = df.sort_values(["case_id", "timestamp"])
-
-    # Create path for each case (sequence of activities)
-    case_paths = (
-        df.groupby("case_id")["activity"]
-        .apply(lambda x: tuple(x.tolist()))
-        .reset_index()
-    )
-    case_paths.columns = ["case_id", "path"]
-
-    # Find the most frequent path (happy path)
-    path_counts = case_paths["path"].value_counts()
-
-    if len(path_counts) == 0:
-        return {
-            "case_count": 0,
-            "lead_time_hours": {"min": None, "max": None, "median": None},
-            "path": [],
-        }
-
-    happy_path = path_counts.index[0]
-
-    # Get cases that follow the happy path
-    happy_path_cases = case_paths[case_paths["path"] == happy_path]["case_id"].tolist()
-
-    if not happy_path_cases:
-        return {
-            "case_count": 0,
-            "lead_time_hours": {"min": None, "max": None, "median": None},
-            "path": list(happy_path),
-        }
+    if case_lead_times is None:
+        case_lead_times = _case_lead_time_hours(event_log)
+    if variants is None:
+        variants = VariantIndex.from_log(event_log)
 
-    # Calculate lead time for happy path cases
-    happy_df = df[df["case_id"].isin(happy_path_cases)]
-    case_lead_times = happy_df.groupby("case_id")["timestamp"].agg(["min", "max"])
-    case_lead_times["lead_time"] = (
-        case_lead_times["max"] - case_lead_times["min"]
-    ).dt.total_seconds() / 3600
+    # Find the most frequent variant (happy path) and the cases following it
+    happy_variant = variants.most_frequent()
+    happy_path = event_log.activities[variants.traces[happy_variant]].tolist()
+    happy_path_cases = variants.case_codes(happy_variant)
 
-    lead_times = case_lead_times["lead_time"].values
+    # Lead time of happy path cases
+    lead_times = case_lead_times[happy_path_cases]
 
     return {
         "case_count": len(happy_path_cases),
@@ -467,5 +1133,5 @@ def _calculate_happy_path_lead_time(event_log: list[EventLog]) -> Dict[str, Any]
             "max": float(np.max(lead_times)),
             "median": float(np.median(lead_times)),
         },
-        "path": list(happy_path),
+        "path": happy_path,
     }
@@ -0,0 +1,242 @@
+"""
+Deadlines and cooperative cancellation of analyses.
+
+Analysis requests run inside a CancelScope: a deadline derived from the
+endpoint's timeout, plus a flag that is set when the client disconnects.
+
+- Every SQL statement executed inside a scope gets ``SET LOCAL
+  statement_timeout`` of the remaining time, so PostgreSQL aborts queries
+  that would outlive the deadline.
+- When the scope is cancelled, statements still running are cancelled on
+  the server (psycopg2 ``connection.cancel()``) and the connection returns
+  to the pool.
+- Long-running analyses call check_cancelled() between their stages.
+
+Scopes follow the work into offload worker processes: the flag lives in a
+one-byte shared memory block that workers attach to by name.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from multiprocessing import shared_memory
+from typing import Any, Callable, Iterator, Optional, Set, TypeVar
+
+from sqlalchemy import event
+
+from src.db.connection import engine
+
+T = TypeVar("T")
+
+# Interval (seconds) at which running statements check for cancellation
+CANCEL_POLL_SECONDS = 0.1
+
+# SQLSTATE of a statement cancelled by statement_timeout or a cancel request
+_QUERY_CANCELED = "57014"
+
+_current_scope: ContextVar[Optional["CancelScope"]] = ContextVar(
+    "cancel_scope", default=None
+)
+
+
+class AnalysisCancelledError(Exception):
+    """Raised when an analysis is cancelled by its deadline or by the client."""
+
+    def __init__(self, message: str, timed_out: bool = False):
+        # Both arguments in args, so the error can be pickled by worker processes
+        super().__init__(message, timed_out)
+        self.timed_out = timed_out
+
+    def __str__(self) -> str:
+        return self.args[0]
+
+
+class CancelScope:
+    """Deadline and cancellation flag of one request, usable across processes."""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.deadline = time.time() + timeout if timeout else None
+        self._event = threading.Event()
+        self._block: Optional[shared_memory.SharedMemory] = None
+        self._block_name: Optional[str] = None
+        self._owner = True
+        self._lock = threading.Lock()
+        # DBAPI connections with a statement running in this process
+        self._running: Set[Any] = set()
+        self._watcher: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+    def __getstate__(self):
+        # The flag is only shared once the scope is sent to a worker process
+        with self._lock:
+            if self._block is None and self._owner:
+                self._block = shared_memory.SharedMemory(create=True, size=1)
+                self._block.buf[0] = int(self._event.is_set())
+                self._block_name = self._block.name
+        return {"deadline": self.deadline, "block_name": self._block_name}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.deadline = state["deadline"]
+        self._block_name = state["block_name"]
+        self._owner = False
+
+    def cancel(self) -> None:
+        """Cancel the work of the scope (e.g. when the client disconnected)."""
+        with self._lock:
+            self._event.set()
+            if self._block is not None:
+                self._block.buf[0] = 1
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set() or self._owner or self._block_name is None:
+            return self._event.is_set()
+        with self._lock:
+            try:
+                if self._block is None:
+                    # Attached only: the owner unlinks the block
+                    self._block = shared_memory.SharedMemory(name=self._block_name)
+            except FileNotFoundError:
+                # The request has already finished
+                self._event.set()
+                return True
+            if self._block.buf[0]:
+                self._event.set()
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline (None without a deadline)."""
+        return None if self.deadline is None else self.deadline - time.time()
+
+    def error(self) -> Optional[AnalysisCancelledError]:
+        """The error to raise if the scope was cancelled or timed out."""
+        if self.cancelled:
+            return AnalysisCancelledError("クライアントの切断により分析を中止しました")
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            return AnalysisCancelledError("分析が制限時間を超えたため中止しました", timed_out=True)
+        return None
+
+    def check(self) -> None:
+        """
+        Raise if the scope was cancelled or its deadline has passed.
+
+        Raises:
+            AnalysisCancelledError: If the work must stop
+        """
+        error = self.error()
+        if error is not None:
+            raise error
+
+    def _statement_started(self, dbapi_connection: Any) -> None:
+        with self._lock:
+            self._running.add(dbapi_connection)
+            if self._watcher is None:
+                self._watcher = threading.Thread(
+                    target=self._watch, name="cancel-scope", daemon=True
+                )
+                self._watcher.start()
+
+    def _statement_finished(self, dbapi_connection: Any) -> None:
+        with self._lock:
+            self._running.discard(dbapi_connection)
+
+    def _watch(self) -> None:
+        """Cancel running statements on the server once the scope is cancelled."""
+        while not self._closed.wait(CANCEL_POLL_SECONDS):
+            if self.cancelled:
+                with self._lock:
+                    running = list(self._running)
+                for dbapi_connection in running:
+                    dbapi_connection.cancel()
+                return
+
+    def close(self) -> None:
+        """Stop watching statements and release the shared flag."""
+        self._closed.set()
+        with self._lock:
+            if self._block is not None:
+                self._block.close()
+                if self._owner:
+                    self._block.unlink()
+                self._block = None
+
+
+def current_scope() -> Optional[CancelScope]:
+    """The scope of the current request or job, if any."""
+    return _current_scope.get()
+
+
+def check_cancelled() -> None:
+    """
+    Cancellation point between analysis stages (no-op outside a scope).
+
+    Raises:
+        AnalysisCancelledError: If the current scope was cancelled or timed out
+    """
+    scope = _current_scope.get()
+    if scope is not None:
+        scope.check()
+
+
+@contextmanager
+def cancel_scope(timeout: Optional[float] = None) -> Iterator[CancelScope]:
+    """Run the enclosed work in a new CancelScope with the given timeout."""
+    scope = CancelScope(timeout)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+        scope.close()
+
+
+def run_in_scope(scope: CancelScope, fn: Callable[..., T], *args: Any) -> T:
+    """Run fn(*args) inside a scope received from another process."""
+    token = _current_scope.set(scope)
+    try:
+        scope.check()
+        return fn(*args)
+    finally:
+        _current_scope.reset(token)
+        scope.close()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _apply_scope(conn, cursor, statement, parameters, context, executemany):
+    scope = _current_scope.get()
+    if scope is None:
+        return
+    scope.check()
+    dbapi_connection = cursor.connection
+    remaining = scope.remaining()
+    if remaining is not None:
+        # A separate cursor, as server-side (named) cursors execute only once
+        with dbapi_connection.cursor() as timeout_cursor:
+            timeout_cursor.execute(
+                "SET LOCAL statement_timeout = %s", (max(int(remaining * 1000), 1),)
+            )
+    scope._statement_started(dbapi_connection)
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _release_scope(conn, cursor, statement, parameters, context, executemany):
+    scope = _current_scope.get()
+    if scope is not None:
+        scope._statement_finished(cursor.connection)
+
+
+@event.listens_for(engine, "handle_error", retval=True)
+def _cancelled_statement(context):
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    if context.cursor is not None:
+        scope._statement_finished(context.cursor.connection)
+    if getattr(context.original_exception, "pgcode", None) == _QUERY_CANCELED:
+        return scope.error() or AnalysisCancelledError(
+            "分析が制限時間を超えたため中止しました", timed_out=True
+        )
+    return None
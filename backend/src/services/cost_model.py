@@ -0,0 +1,223 @@
+"""
+Cost estimation and admission control of analyses.
+
+Runtime and peak memory of an analysis are estimated from the event and case
+counts that get_preview knows before anything is loaded:
+
+    cost = base + per_event * event_count + per_case * case_count
+
+Each analysis (and execution mode) has its own coefficients. The defaults
+below are conservative starting points; COST_MODEL_CALIBRATION points to a
+JSON file with coefficients measured on the deployment, e.g.
+``{"process:in_memory": {"seconds_per_event": 4e-6, "bytes_per_event": 600}}``.
+Runtime estimates are additionally corrected by every computed analysis:
+the ratio of measured to estimated seconds is tracked per analysis as an
+exponentially weighted moving average.
+
+Admission control rejects analyses whose estimated peak memory exceeds
+ANALYSIS_MEMORY_BUDGET_MB and sends synchronous requests whose estimated
+runtime exceeds ANALYSIS_SYNC_SECONDS_BUDGET to the background job queue.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, NamedTuple, Optional
+
+# Peak memory an analysis may use (MB); larger analyses are rejected
+ANALYSIS_MEMORY_BUDGET_MB = int(os.getenv("ANALYSIS_MEMORY_BUDGET_MB", "2048"))
+
+# Estimated runtime (seconds) above which requests run as background jobs
+ANALYSIS_SYNC_SECONDS_BUDGET = float(os.getenv("ANALYSIS_SYNC_SECONDS_BUDGET", "30"))
+
+# JSON file with measured coefficients overriding the defaults (optional)
+COST_MODEL_CALIBRATION = os.getenv("COST_MODEL_CALIBRATION")
+
+# Weight of the latest measured run in the runtime correction
+_CALIBRATION_WEIGHT = 0.2
+
+# Bounds of the runtime correction, so one outlier cannot disable admission
+_MIN_CORRECTION, _MAX_CORRECTION = 0.1, 10.0
+
+_MB = 1024 * 1024
+
+
+class CostCoefficients(NamedTuple):
+    """Linear cost model of one analysis."""
+
+    seconds_base: float
+    seconds_per_event: float
+    seconds_per_case: float
+    bytes_base: float
+    bytes_per_event: float
+    bytes_per_case: float
+
+
+class CostEstimate(NamedTuple):
+    """Estimated runtime and peak memory of an analysis."""
+
+    seconds: float
+    memory_mb: float
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"seconds": round(self.seconds, 2), "memory_mb": round(self.memory_mb)}
+
+
+# Loading the events into pandas dominates: strings of case_id, activity and
+# resource columns cost a few hundred bytes per event before encoding.
+DEFAULT_COEFFICIENTS: Dict[str, CostCoefficients] = {
+    "process:in_memory": CostCoefficients(0.2, 3e-6, 2e-6, 64 * _MB, 450, 120),
+    "process:parallel": CostCoefficients(0.5, 2.5e-6, 2e-6, 64 * _MB, 500, 120),
+    # Bounded by EVENT_LOG_CHUNK_SIZE rows plus the lead time of every case
+    "process:streaming": CostCoefficients(0.2, 4e-6, 2e-6, 96 * _MB, 0, 150),
+    # Aggregated by PostgreSQL; only node/edge rows reach the API
+    "process:sql": CostCoefficients(0.3, 5e-7, 1e-7, 32 * _MB, 0, 0),
+    "process:mart": CostCoefficients(0.1, 5e-8, 1e-7, 32 * _MB, 0, 0),
+    "lead_time": CostCoefficients(0.1, 2e-6, 1e-6, 48 * _MB, 350, 60),
+    # Handover, workload and performance of every employee/department
+    "organization": CostCoefficients(0.3, 1e-5, 2e-6, 64 * _MB, 900, 120),
+    # Paths per case joined with the outcome of every case
+    "outcome": CostCoefficients(0.3, 6e-6, 1e-5, 64 * _MB, 500, 400),
+}
+
+
+class Admission(NamedTuple):
+    """Outcome of admission control."""
+
+    background: bool
+    estimate: CostEstimate
+
+
+class AnalysisTooLargeError(Exception):
+    """Raised when an analysis would exceed the memory budget."""
+
+    def __init__(self, message: str, estimate: CostEstimate):
+        super().__init__(message)
+        self.estimate = estimate
+
+
+def _linear_seconds(c: CostCoefficients, event_count: int, case_count: int) -> float:
+    return (
+        c.seconds_base
+        + c.seconds_per_event * event_count
+        + c.seconds_per_case * case_count
+    )
+
+
+class CostModel:
+    """Cost estimates with a runtime correction learned from measured runs."""
+
+    def __init__(self, coefficients: Optional[Dict[str, CostCoefficients]] = None):
+        self.coefficients = dict(coefficients or DEFAULT_COEFFICIENTS)
+        self._corrections: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def estimate(
+        self, analysis: str, event_count: int, case_count: int
+    ) -> CostEstimate:
+        """
+        Estimate the runtime and peak memory of an analysis.
+
+        Args:
+            analysis: Key of DEFAULT_COEFFICIENTS (e.g. "process:in_memory")
+            event_count: Events in scope of the analysis
+            case_count: Cases in scope of the analysis
+
+        Returns:
+            CostEstimate
+        """
+        c = self.coefficients[analysis]
+        seconds = _linear_seconds(c, event_count, case_count)
+        memory = c.bytes_base + c.bytes_per_event * event_count
+        memory += c.bytes_per_case * case_count
+        return CostEstimate(
+            seconds=seconds * self._corrections.get(analysis, 1.0),
+            memory_mb=memory / _MB,
+        )
+
+    def record(
+        self, analysis: str, event_count: int, case_count: int, seconds: float
+    ) -> None:
+        """Correct runtime estimates of an analysis by a measured run."""
+        estimated = _linear_seconds(
+            self.coefficients[analysis], event_count, case_count
+        )
+        ratio = min(max(seconds / estimated, _MIN_CORRECTION), _MAX_CORRECTION)
+        with self._lock:
+            previous = self._corrections.get(analysis, 1.0)
+            self._corrections[analysis] = (
+                1 - _CALIBRATION_WEIGHT
+            ) * previous + _CALIBRATION_WEIGHT * ratio
+
+    def estimates(self, event_count: int, case_count: int) -> Dict[str, Any]:
+        """Estimates of every analysis, as included in the preview."""
+        return {
+            analysis: self.estimate(analysis, event_count, case_count).to_dict()
+            for analysis in self.coefficients
+        }
+
+    def admit(
+        self,
+        analysis: str,
+        event_count: int,
+        case_count: int,
+        background: bool = False,
+    ) -> Admission:
+        """
+        Check an analysis against the memory and runtime budgets.
+
+        Args:
+            analysis: Key of the cost coefficients
+            event_count: Events in scope of the analysis
+            case_count: Cases in scope of the analysis
+            background: Whether the request already asked for a background job
+
+        Returns:
+            Admission telling whether the analysis runs as a background job
+
+        Raises:
+            AnalysisTooLargeError: If the estimated peak memory exceeds
+                ANALYSIS_MEMORY_BUDGET_MB
+        """
+        estimate = self.estimate(analysis, event_count, case_count)
+        if estimate.memory_mb > ANALYSIS_MEMORY_BUDGET_MB:
+            hint = "期間を絞り込んでください"
+            if analysis.startswith("process:"):
+                hint = "期間を絞り込むか、execution_mode に streaming・sql・mart を指定してください"
+            raise AnalysisTooLargeError(
+                f"推定メモリ使用量（{estimate.memory_mb:.0f} MB）が上限"
+                f"（{ANALYSIS_MEMORY_BUDGET_MB} MB）を超えています。{hint}",
+                estimate,
+            )
+        return Admission(
+            background=background or estimate.seconds > ANALYSIS_SYNC_SECONDS_BUDGET,
+            estimate=estimate,
+        )
+
+
+def load_calibration(path: str) -> Dict[str, CostCoefficients]:
+    """
+    Read measured coefficients from a JSON file.
+
+    Coefficients missing from the file keep their default value.
+
+    Raises:
+        ValueError: If the file names an unknown analysis or coefficient
+    """
+    with open(path, encoding="utf-8") as f:
+        measured = json.load(f)
+
+    coefficients = dict(DEFAULT_COEFFICIENTS)
+    for analysis, values in measured.items():
+        if analysis not in coefficients:
+            raise ValueError(f"Unknown analysis in cost calibration: {analysis}")
+        unknown = set(values) - set(CostCoefficients._fields)
+        if unknown:
+            raise ValueError(f"Unknown cost coefficients: {sorted(unknown)}")
+        coefficients[analysis] = coefficients[analysis]._replace(**values)
+    return coefficients
+
+
+cost_model = CostModel(
+    load_calibration(COST_MODEL_CALIBRATION) if COST_MODEL_CALIBRATION else None
+)
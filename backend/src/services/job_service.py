@@ -0,0 +1,304 @@
+"""
+Background execution of long-running analyses.
+
+Jobs run on a bounded thread pool. Their status, progress and the resulting
+analysis_id are recorded in ``public.analysis_jobs``, so finished and failed
+jobs survive an API restart. Every job records the API process that owns it
+and holds a lease that the process renews while it is alive, so several API
+processes can share the table: jobs whose lease has expired (their process
+stopped or crashed) are marked as failed, on startup and periodically by every
+process. Every job runs in a cancel scope with ANALYSIS_JOB_TIMEOUT_SECONDS as
+its deadline.
+"""
+
+import json
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.db.connection import engine
+from src.services.offload import ServerBusyError, wait_for_slots
+from src.services.cancellation import cancel_scope
+
+# Analyses executed concurrently in the background
+ANALYSIS_JOB_WORKERS = int(os.getenv("ANALYSIS_JOB_WORKERS", "2"))
+
+# Jobs that may wait for a worker before submissions are rejected
+ANALYSIS_JOB_MAX_QUEUED = int(os.getenv("ANALYSIS_JOB_MAX_QUEUED", "16"))
+
+# Deadline (seconds) of a background analysis (0 disables the deadline)
+ANALYSIS_JOB_TIMEOUT_SECONDS = float(os.getenv("ANALYSIS_JOB_TIMEOUT_SECONDS", "3600"))
+
+# Seconds without a lease renewal after which an unfinished job is failed
+# (renewed every quarter of this interval by the owning process)
+ANALYSIS_JOB_LEASE_SECONDS = float(os.getenv("ANALYSIS_JOB_LEASE_SECONDS", "120"))
+
+JOB_TYPES = ("process", "organization", "outcome")
+
+# Reports progress of a job as a fraction between 0 and 1
+ProgressCallback = Callable[[float], None]
+
+
+# Seconds clients should wait before resubmitting when the queue is full
+JOB_RETRY_AFTER_SECONDS = 30
+
+
+class JobQueueFullError(ServerBusyError):
+    """Raised when a job is submitted while all queue slots are taken."""
+
+
+class JobRunner:
+    """Bounded executor that records job state in analysis_jobs."""
+
+    def __init__(
+        self,
+        max_workers: int = ANALYSIS_JOB_WORKERS,
+        max_queued: int = ANALYSIS_JOB_MAX_QUEUED,
+        lease_seconds: float = ANALYSIS_JOB_LEASE_SECONDS,
+    ):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="analysis-job"
+        )
+        # One slot per running or queued job
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+        # Identifies this API process as owner of its jobs
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        self._stopped = threading.Event()
+        self._lease_thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Fail jobs with expired leases and start renewing the own leases."""
+        fail_interrupted_jobs(self.lease_seconds)
+        if self._lease_thread is None:
+            self._stopped.clear()
+            self._lease_thread = threading.Thread(
+                target=self._maintain_leases, name="analysis-job-lease", daemon=True
+            )
+            self._lease_thread.start()
+
+    def stop(self) -> None:
+        """Stop renewing leases (the jobs of this process then expire)."""
+        self._stopped.set()
+        if self._lease_thread is not None:
+            self._lease_thread.join()
+            self._lease_thread = None
+
+    def _maintain_leases(self) -> None:
+        while not self._stopped.wait(self.lease_seconds / 4):
+            renew_job_leases(self.owner)
+            # Jobs of other processes that stopped without finishing them
+            fail_interrupted_jobs(self.lease_seconds)
+
+    def submit(
+        self,
+        job_type: str,
+        params: Dict[str, Any],
+        run: Callable[[ProgressCallback], str],
+    ) -> str:
+        """
+        Record a job and queue it for execution.
+
+        Args:
+            job_type: Kind of analysis (one of JOB_TYPES)
+            params: Request parameters, stored with the job
+            run: Executes the analysis and returns the saved analysis_id;
+                receives a callback to report progress
+
+        Returns:
+            job_id
+
+        Raises:
+            JobQueueFullError: If the queue is full
+        """
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Invalid job_type: {job_type}")
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFullError(
+                "実行待ちのジョブが上限に達しています",
+                retry_after=JOB_RETRY_AFTER_SECONDS,
+            )
+
+        try:
+            job_id = str(uuid4())
+            _insert_job(job_id, job_type, params, self.owner)
+            self._executor.submit(self._run, job_id, run)
+        except Exception:
+            self._slots.release()
+            raise
+        return job_id
+
+    def _run(self, job_id: str, run: Callable[[ProgressCallback], str]) -> None:
+        try:
+            _update_job(job_id, status="running", started_at=datetime.utcnow())
+            # Jobs already hold a job slot, so they queue for an offload slot
+            # instead of failing when interactive requests fill the pool
+            with cancel_scope(ANALYSIS_JOB_TIMEOUT_SECONDS or None), wait_for_slots():
+                analysis_id = run(
+                    lambda progress: _update_job(job_id, progress=progress)
+                )
+            _update_job(
+                job_id,
+                status="succeeded",
+                progress=1.0,
+                analysis_id=analysis_id,
+                finished_at=datetime.utcnow(),
+            )
+        except Exception as e:
+            _update_job(
+                job_id, status="failed", error=str(e), finished_at=datetime.utcnow()
+            )
+        finally:
+            self._slots.release()
+
+
+def _insert_job(job_id: str, job_type: str, params: Dict[str, Any], owner: str) -> None:
+    query = text(
+        """
+        INSERT INTO analysis_jobs (
+            job_id, job_type, status, progress, params, owner, created_at, heartbeat_at
+        )
+        VALUES (
+            :job_id, :job_type, 'queued', 0, :params, :owner, :created_at, :created_at
+        )
+    """
+    )
+    with engine.begin() as conn:
+        conn.execute(
+            query,
+            {
+                "job_id": job_id,
+                "job_type": job_type,
+                "params": json.dumps(params, default=str),
+                "owner": owner,
+                "created_at": datetime.utcnow(),
+            },
+        )
+
+
+_JOB_COLUMNS = (
+    "status",
+    "progress",
+    "analysis_id",
+    "error",
+    "started_at",
+    "finished_at",
+)
+
+
+def _update_job(job_id: str, **values: Any) -> None:
+    """Update columns of a job (keys of values must be in _JOB_COLUMNS)."""
+    if not values or not set(values) <= set(_JOB_COLUMNS):
+        raise ValueError(f"Invalid job columns: {sorted(values)}")
+    assignments = ", ".join(f"{column} = :{column}" for column in values)
+    query = text(
+        f"UPDATE analysis_jobs SET {assignments} WHERE job_id = :job_id"  # nosec B608
+    )
+    with engine.begin() as conn:
+        conn.execute(query, {"job_id": job_id, **values})
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get status of a job.
+
+    Returns:
+        Job status, progress and analysis_id (once succeeded), or None if
+        the job does not exist
+    """
+    query = text(
+        """
+        SELECT job_id, job_type, status, progress, analysis_id, error,
+               created_at, started_at, finished_at
+        FROM analysis_jobs
+        WHERE job_id = :job_id
+    """
+    )
+    with engine.connect() as conn:
+        row = conn.execute(query, {"job_id": job_id}).mappings().fetchone()
+
+    if not row:
+        return None
+
+    def isoformat(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
+
+    return {
+        "job_id": str(row["job_id"]),
+        "job_type": row["job_type"],
+        "status": row["status"],
+        "progress": float(row["progress"]),
+        "analysis_id": str(row["analysis_id"]) if row["analysis_id"] else None,
+        "error": row["error"],
+        "created_at": isoformat(row["created_at"]),
+        "started_at": isoformat(row["started_at"]),
+        "finished_at": isoformat(row["finished_at"]),
+    }
+
+
+def renew_job_leases(owner: str) -> int:
+    """
+    Renew the leases of the unfinished jobs of an API process.
+
+    Returns:
+        Number of renewed jobs (0 if analysis_jobs is not available)
+    """
+    query = text(
+        """
+        UPDATE analysis_jobs
+        SET heartbeat_at = :now
+        WHERE owner = :owner AND status IN ('queued', 'running')
+    """
+    )
+    try:
+        with engine.begin() as conn:
+            result = conn.execute(query, {"owner": owner, "now": datetime.utcnow()})
+    except SQLAlchemyError:
+        return 0
+    return result.rowcount
+
+
+def fail_interrupted_jobs(lease_seconds: float = ANALYSIS_JOB_LEASE_SECONDS) -> int:
+    """
+    Mark queued or running jobs whose lease has expired as failed.
+
+    Their owning API process stopped renewing the lease (shutdown or crash),
+    so they can never finish. Jobs of live processes are left alone.
+
+    Args:
+        lease_seconds: Seconds since the last renewal after which a lease expires
+
+    Returns:
+        Number of interrupted jobs (0 if analysis_jobs is not available)
+    """
+    query = text(
+        """
+        UPDATE analysis_jobs
+        SET status = 'failed',
+            error = 'API の停止により中断されました',
+            finished_at = :finished_at
+        WHERE status IN ('queued', 'running')
+          AND COALESCE(heartbeat_at, created_at) < :expired_before
+    """
+    )
+    now = datetime.utcnow()
+    params = {
+        "finished_at": now,
+        "expired_before": now - timedelta(seconds=lease_seconds),
+    }
+    try:
+        with engine.begin() as conn:
+            result = conn.execute(query, params)
+    except SQLAlchemyError:
+        return 0
+    return result.rowcount
+
+
+job_runner = JobRunner()
@@ -0,0 +1,198 @@
+"""
+Offloading of CPU-bound analysis work to a process pool.
+
+Routes are sync handlers run on FastAPI's thread pool, so pandas/NetworkX
+work holding the GIL slows down every other request of the API process,
+including /health and the list endpoints. Heavy computations are therefore
+run in a bounded pool of worker processes; the request thread only waits for
+the result. When all worker and queue slots are taken, interactive requests
+get ServerBusyError (answered with 503 and Retry-After) instead of queueing
+more work; background jobs, which have no client to retry, wait for a slot
+(see wait_for_slots).
+
+The cancel scope of the request (see src.services.cancellation) is passed on
+to the worker. A cancelled request stops waiting at once; the worker stops at
+its next cancellation point and keeps its slot until then.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from contextvars import ContextVar
+from multiprocessing import get_context
+from typing import Any, Callable, Iterator, Optional, Tuple, TypeVar
+
+from sqlalchemy.orm import Session
+
+from src.db.connection import SessionLocal
+from src.services.cancellation import (
+    CANCEL_POLL_SECONDS,
+    check_cancelled,
+    current_scope,
+    run_in_scope,
+)
+
+T = TypeVar("T")
+
+# Worker processes for CPU-bound analyses (0 runs them in the API process)
+OFFLOAD_WORKERS = int(os.getenv("OFFLOAD_WORKERS", "2"))
+
+# Analyses that may wait for a worker before requests are rejected
+OFFLOAD_MAX_QUEUED = int(os.getenv("OFFLOAD_MAX_QUEUED", "8"))
+
+# Retry-After (seconds) sent when the pool is full
+OFFLOAD_RETRY_AFTER_SECONDS = int(os.getenv("OFFLOAD_RETRY_AFTER_SECONDS", "5"))
+
+# Set for background work, which waits for a slot instead of being rejected
+_waits_for_slots: ContextVar[bool] = ContextVar(
+    "offload_waits_for_slots", default=False
+)
+
+
+class ServerBusyError(RuntimeError):
+    """Raised when work is rejected because a bounded queue is full."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ProcessOffloader:
+    """Process pool with a bounded number of running and waiting tasks."""
+
+    def __init__(self, max_workers: int, max_queued: int):
+        self.max_workers = max_workers
+        # One slot per running or waiting task
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned, as forking a multi-threaded process is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=get_context("spawn")
+                )
+            return self._pool
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run fn(*args) in a worker process and wait for the result.
+
+        fn and args must be picklable (module-level functions, plain values).
+
+        Raises:
+            ServerBusyError: If all worker and queue slots are taken (unless
+                called inside wait_for_slots)
+            AnalysisCancelledError: If the request's cancel scope was cancelled
+                or timed out while waiting
+        """
+        if not self._acquire_slot():
+            raise ServerBusyError(
+                "分析処理が混雑しています。しばらくしてから再実行してください",
+                retry_after=OFFLOAD_RETRY_AFTER_SECONDS,
+            )
+        pool = None
+        try:
+            try:
+                pool = self._get_pool()
+                scope = current_scope()
+                if scope is not None:
+                    future = pool.submit(run_in_scope, scope, fn, *args)
+                else:
+                    future = pool.submit(fn, *args)
+            except BaseException:
+                self._slots.release()
+                raise
+            # The slot is held until the worker is done, even if nobody waits
+            future.add_done_callback(lambda _: self._slots.release())
+
+            while True:
+                try:
+                    return future.result(timeout=CANCEL_POLL_SECONDS)
+                except TimeoutError:
+                    check_cancelled()
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a new pool
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            raise
+
+    def _acquire_slot(self) -> bool:
+        if not _waits_for_slots.get():
+            return self._slots.acquire(blocking=False)
+        while not self._slots.acquire(timeout=CANCEL_POLL_SECONDS):
+            check_cancelled()
+        return True
+
+
+offloader = ProcessOffloader(max(OFFLOAD_WORKERS, 1), OFFLOAD_MAX_QUEUED)
+
+
+@contextmanager
+def wait_for_slots() -> Iterator[None]:
+    """Make offloads of the enclosed work wait for a free slot instead of raising."""
+    token = _waits_for_slots.set(True)
+    try:
+        yield
+    finally:
+        _waits_for_slots.reset(token)
+
+
+def offload(fn: Callable[..., T], *args: Any) -> T:
+    """Run fn(*args) in the process pool (in-process if OFFLOAD_WORKERS is 0)."""
+    if OFFLOAD_WORKERS <= 0:
+        return fn(*args)
+    return offloader.run(fn, *args)
+
+
+def _timed(fn: Callable[..., T], *args: Any) -> Tuple[T, float]:
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def offload_timed(fn: Callable[..., T], *args: Any) -> Tuple[T, float]:
+    """
+    Run fn(*args) like offload and measure its runtime where it runs.
+
+    Returns:
+        Tuple of (result, seconds fn ran, excluding the wait for a worker)
+    """
+    return offload(_timed, fn, *args)
+
+
+def _with_session(fn: Callable[..., T], *args: Any) -> T:
+    with SessionLocal() as db:
+        return fn(db, *args)
+
+
+def offload_with_session_timed(
+    db: Session, fn: Callable[..., T], *args: Any
+) -> Tuple[T, float]:
+    """
+    Run fn(db, *args) like offload_with_session and measure its runtime where it runs.
+
+    Returns:
+        Tuple of (result, seconds fn ran, excluding the wait for a worker)
+    """
+    if OFFLOAD_WORKERS <= 0:
+        return _timed(fn, db, *args)
+    return offloader.run(_timed, _with_session, fn, *args)
+
+
+def offload_with_session(db: Session, fn: Callable[..., T], *args: Any) -> T:
+    """
+    Run fn(db, *args) in the process pool.
+
+    Sessions cannot cross processes, so in a worker fn gets a new session;
+    in-process it gets db.
+    """
+    if OFFLOAD_WORKERS <= 0:
+        return fn(db, *args)
+    return offloader.run(_with_session, fn, *args)
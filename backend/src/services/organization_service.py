@@ -4,19 +4,30 @@ Organization Analysis Service
 Provides handover, workload, and performance analysis by person and department.
 """
 
-from typing import Dict, Any, Optional, List
-from collections import defaultdict
+from typing import Callable, Dict, Any, Optional, List, Tuple, Union
+from datetime import datetime
+from uuid import uuid4
+import numpy as np
 import pandas as pd
 from sqlalchemy import text
 from src.db.connection import engine
+from src.analysis.parallel import parallel_transition_counts
+from src.services.offload import offload, offload_timed
+from src.services.cancellation import check_cancelled
+from src.services.cost_model import cost_model
+from src.services.result_cache import result_cache
+from src.services.result_storage import StoredBody, decode_result, encode_result
 import json
 
+# Execution modes of the handover analysis
+HANDOVER_EXECUTION_MODES = ("in_memory", "parallel")
+
 
 def load_event_log_with_organization(
     process_type: str,
     filter_mode: str = "all",
-    date_from: Optional[str] = None,
-    date_to: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
 ) -> pd.DataFrame:
     """
     Load event log with organizational information from database.
@@ -24,8 +35,8 @@ def load_event_log_with_organization(
     Args:
         process_type: Process type to filter
         filter_mode: "case_start" | "case_end" | "all"
-        date_from: Start date (ISO8601 format)
-        date_to: End date (ISO8601 format)
+        date_from: Start date (naive UTC, see parse_filter_date)
+        date_to: End date (naive UTC, see parse_filter_date)
 
     Returns:
         DataFrame with event log and organizational data
@@ -55,14 +66,6 @@ def load_event_log_with_organization(
     elif filter_mode == "case_start":
         query = text(
             """
-            WITH case_start_dates AS (
-              SELECT
-                case_id,
-                MIN(timestamp) as start_date
-              FROM public.fct_event_log
-              WHERE process_type = :process_type
-              GROUP BY case_id
-            )
             SELECT
                 e.case_id,
                 e.activity,
@@ -74,10 +77,11 @@ def load_event_log_with_organization(
                 e.department_id,
                 e.department_name,
                 e.department_type
-            FROM public.fct_event_log e
-            JOIN case_start_dates c ON e.case_id = c.case_id
-            WHERE e.process_type = :process_type
-              AND c.start_date BETWEEN :date_from AND :date_to
+            FROM public.fct_case_summary c
+            JOIN public.fct_event_log e
+              ON e.process_type = c.process_type AND e.case_id = c.case_id
+            WHERE c.process_type = :process_type
+              AND c.case_start_at BETWEEN :date_from AND :date_to
             ORDER BY e.case_id, e.timestamp
         """
         )
@@ -90,14 +94,6 @@ def load_event_log_with_organization(
     elif filter_mode == "case_end":
         query = text(
             """
-            WITH case_end_dates AS (
-              SELECT
-                case_id,
-                MAX(timestamp) as end_date
-              FROM public.fct_event_log
-              WHERE process_type = :process_type
-              GROUP BY case_id
-            )
             SELECT
                 e.case_id,
                 e.activity,
@@ -109,10 +105,11 @@ def load_event_log_with_organization(
                 e.department_id,
                 e.department_name,
                 e.department_type
-            FROM public.fct_event_log e
-            JOIN case_end_dates c ON e.case_id = c.case_id
-            WHERE e.process_type = :process_type
-              AND c.end_date BETWEEN :date_from AND :date_to
+            FROM public.fct_case_summary c
+            JOIN public.fct_event_log e
+              ON e.process_type = c.process_type AND e.case_id = c.case_id
+            WHERE c.process_type = :process_type
+              AND c.case_end_at BETWEEN :date_from AND :date_to
             ORDER BY e.case_id, e.timestamp
         """
         )
@@ -128,20 +125,101 @@ def load_event_log_with_organization(
     return df
 
 
+def _sort_by_case(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return the event log ordered by case and timestamp.
+
+    Rows from load_event_log_with_organization are already in this order, in
+    which case the frame is returned unchanged.
+    """
+    same_case = df["case_id"].eq(df["case_id"].shift())
+    timestamp_step = df["timestamp"].diff()
+    if (
+        df["case_id"].is_monotonic_increasing
+        and not (timestamp_step[same_case] < pd.Timedelta(0)).any()
+    ):
+        return df
+    return df.sort_values(["case_id", "timestamp"], kind="stable").reset_index(
+        drop=True
+    )
+
+
+def _analyze_from_db(
+    compute: Callable[..., Dict[str, Any]],
+    process_type: str,
+    aggregation_level: str,
+    filter_mode: str,
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    *args: Any,
+) -> Dict[str, Any]:
+    """Load the event log and run one analysis on it (offloaded)."""
+    df = load_event_log_with_organization(process_type, filter_mode, date_from, date_to)
+    check_cancelled()
+    return compute(df, aggregation_level, *args)
+
+
 def analyze_handover(
     process_type: str,
     aggregation_level: str = "employee",  # "employee" or "department"
     filter_mode: str = "all",
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
+    execution_mode: str = "in_memory",
 ) -> Dict[str, Any]:
     """
     Analyze who works with whom (handover/social network analysis).
 
     Returns a network graph structure showing handovers between people/departments.
+    execution_mode "parallel" counts the handovers of hash partitions of the
+    cases in worker processes (same result as "in_memory").
     """
-    df = load_event_log_with_organization(process_type, filter_mode, date_from, date_to)
+    if execution_mode not in HANDOVER_EXECUTION_MODES:
+        raise ValueError(f"Invalid execution_mode: {execution_mode}")
+
+    start, end = parse_filter_date(date_from), parse_filter_date(date_to)
+    result, _ = result_cache.get_or_compute(
+        "organization_handover",
+        {
+            "process_type": process_type,
+            "aggregation_level": aggregation_level,
+            "filter_mode": filter_mode,
+            "date_from": start,
+            "date_to": end,
+            "execution_mode": execution_mode,
+        },
+        lambda: offload(
+            _analyze_from_db,
+            compute_handover,
+            process_type,
+            aggregation_level,
+            filter_mode,
+            start,
+            end,
+            execution_mode,
+        ),
+    )
+    return result
+
+
+def compute_handover(
+    df: pd.DataFrame,
+    aggregation_level: str,
+    execution_mode: str = "in_memory",
+    sorted_by_case: bool = False,
+) -> Dict[str, Any]:
+    """
+    Compute handover network from an already loaded event log.
+
+    Args:
+        df: Event log with organizational data (see load_event_log_with_organization)
+        aggregation_level: "employee" or "department"
+        execution_mode: "in_memory" or "parallel" (worker processes)
+        sorted_by_case: df is known to be ordered by case and timestamp
 
+    Returns:
+        Handover nodes and edges
+    """
     if df.empty:
         return {"nodes": [], "edges": [], "aggregation_level": aggregation_level}
 
@@ -154,30 +232,11 @@ def analyze_handover(
         resource_name_col = "department_name"
 
     # Calculate handovers (transitions between different resources) with waiting time
-    handovers = defaultdict(lambda: {"count": 0, "total_waiting_time": 0.0})
-
-    for case_id in df["case_id"].unique():
-        case_df = df[df["case_id"] == case_id].sort_values("timestamp")
-
-        for i in range(len(case_df) - 1):
-            current_row = case_df.iloc[i]
-            next_row = case_df.iloc[i + 1]
-            current_resource = current_row[resource_id_col]
-            next_resource = next_row[resource_id_col]
-
-            # Only count handovers between different resources
-            if (
-                current_resource != next_resource
-                and pd.notna(current_resource)
-                and pd.notna(next_resource)
-            ):
-                waiting_time_hours = (
-                    next_row["timestamp"] - current_row["timestamp"]
-                ).total_seconds() / 3600
-                handovers[(current_resource, next_resource)]["count"] += 1
-                handovers[(current_resource, next_resource)][
-                    "total_waiting_time"
-                ] += waiting_time_hours
+    ordered = df if sorted_by_case else _sort_by_case(df)
+    if execution_mode == "parallel":
+        handovers = _parallel_handovers(ordered, resource_id_col)
+    else:
+        handovers = _handovers(ordered, resource_id_col)
 
     # Build nodes (unique resources)
     resource_activity_count = df.groupby(resource_id_col).size().to_dict()
@@ -201,22 +260,85 @@ def analyze_handover(
 
     # Build edges (handovers)
     edges = []
-    for (source, target), data in handovers.items():
-        avg_waiting_time = (
-            data["total_waiting_time"] / data["count"] if data["count"] > 0 else 0.0
-        )
+    for (source, target), count, total_waiting_time in zip(
+        handovers.index, handovers["count"], handovers["sum"]
+    ):
         edges.append(
             {
                 "source": source,
                 "target": target,
-                "handover_count": data["count"],
-                "avg_waiting_time_hours": avg_waiting_time,
+                "handover_count": int(count),
+                "avg_waiting_time_hours": float(total_waiting_time) / int(count),
             }
         )
 
     return {"nodes": nodes, "edges": edges, "aggregation_level": aggregation_level}
 
 
+def _handovers(ordered: pd.DataFrame, resource_id_col: str) -> pd.DataFrame:
+    """
+    Count handovers and sum their waiting times per (source, target) resource.
+
+    Each event is paired with the next event of the same case via shifted
+    columns, then all pairs are aggregated in a single groupby.
+
+    Returns:
+        Frame indexed by (source, target) with count and sum columns, in order
+        of first occurrence
+    """
+    current_resource = ordered[resource_id_col]
+
+    next_resource = current_resource.shift(-1)
+    same_case = ordered["case_id"].eq(ordered["case_id"].shift(-1))
+    waiting_time_hours = (
+        ordered["timestamp"].shift(-1) - ordered["timestamp"]
+    ).dt.total_seconds() / 3600
+
+    # Only count handovers between different resources
+    is_handover = (
+        same_case
+        & current_resource.notna()
+        & next_resource.notna()
+        & current_resource.ne(next_resource)
+    )
+    handovers = (
+        pd.DataFrame(
+            {
+                "source": current_resource[is_handover],
+                "target": next_resource[is_handover],
+                "waiting_time_hours": waiting_time_hours[is_handover],
+            }
+        )
+        .groupby(["source", "target"], sort=False)["waiting_time_hours"]
+        .agg(["count", "sum"])
+    )
+    return handovers
+
+
+def _parallel_handovers(ordered: pd.DataFrame, resource_id_col: str) -> pd.DataFrame:
+    """Same as _handovers, counted per case partition in worker processes."""
+    case_codes, case_ids = pd.factorize(ordered["case_id"])
+    resource_codes, resources = pd.factorize(ordered[resource_id_col])
+    timestamps = pd.to_datetime(ordered["timestamp"]).to_numpy(dtype="datetime64[ns]")
+    counts = parallel_transition_counts(
+        case_codes,
+        np.asarray(case_ids, dtype=object),
+        resource_codes,
+        timestamps.view(np.int64),
+        len(resources),
+        distinct_keys=True,
+    )
+
+    order = np.argsort(counts.first_seen, kind="stable")
+    sources, targets = np.divmod(counts.edge_keys[order], len(resources))
+    return pd.DataFrame(
+        {"count": counts.edge_frequency[order], "sum": counts.waiting_time_sum[order]},
+        index=pd.MultiIndex.from_arrays(
+            [resources[sources], resources[targets]], names=["source", "target"]
+        ),
+    )
+
+
 def analyze_workload(
     process_type: str,
     aggregation_level: str = "employee",
@@ -229,8 +351,40 @@ def analyze_workload(
 
     Returns statistics on activity counts per person/department.
     """
-    df = load_event_log_with_organization(process_type, filter_mode, date_from, date_to)
+    start, end = parse_filter_date(date_from), parse_filter_date(date_to)
+    result, _ = result_cache.get_or_compute(
+        "organization_workload",
+        {
+            "process_type": process_type,
+            "aggregation_level": aggregation_level,
+            "filter_mode": filter_mode,
+            "date_from": start,
+            "date_to": end,
+        },
+        lambda: offload(
+            _analyze_from_db,
+            compute_workload,
+            process_type,
+            aggregation_level,
+            filter_mode,
+            start,
+            end,
+        ),
+    )
+    return result
+
+
+def compute_workload(df: pd.DataFrame, aggregation_level: str) -> Dict[str, Any]:
+    """
+    Compute workload distribution from an already loaded event log.
+
+    Args:
+        df: Event log with organizational data (see load_event_log_with_organization)
+        aggregation_level: "employee" or "department"
 
+    Returns:
+        Activity and case counts per resource
+    """
     if df.empty:
         return {"workload": [], "aggregation_level": aggregation_level}
 
@@ -284,8 +438,43 @@ def analyze_performance(
 
     Returns statistics on average activity duration per person/department.
     """
-    df = load_event_log_with_organization(process_type, filter_mode, date_from, date_to)
+    start, end = parse_filter_date(date_from), parse_filter_date(date_to)
+    result, _ = result_cache.get_or_compute(
+        "organization_performance",
+        {
+            "process_type": process_type,
+            "aggregation_level": aggregation_level,
+            "filter_mode": filter_mode,
+            "date_from": start,
+            "date_to": end,
+        },
+        lambda: offload(
+            _analyze_from_db,
+            compute_performance,
+            process_type,
+            aggregation_level,
+            filter_mode,
+            start,
+            end,
+        ),
+    )
+    return result
 
+
+def compute_performance(
+    df: pd.DataFrame, aggregation_level: str, sorted_by_case: bool = False
+) -> Dict[str, Any]:
+    """
+    Compute duration statistics from an already loaded event log.
+
+    Args:
+        df: Event log with organizational data (see load_event_log_with_organization)
+        aggregation_level: "employee" or "department"
+        sorted_by_case: df is known to be ordered by case and timestamp
+
+    Returns:
+        Duration statistics per resource
+    """
     if df.empty:
         return {"performance": [], "aggregation_level": aggregation_level}
 
@@ -297,36 +486,28 @@ def analyze_performance(
         resource_id_col = "department_id"
         resource_name_col = "department_name"
 
-    # Calculate time between activities (duration)
-    durations = []
-
-    for case_id in df["case_id"].unique():
-        case_df = df[df["case_id"] == case_id].sort_values("timestamp")
-
-        for i in range(len(case_df) - 1):
-            current_row = case_df.iloc[i]
-            next_row = case_df.iloc[i + 1]
-
-            duration_hours = (
-                next_row["timestamp"] - current_row["timestamp"]
-            ).total_seconds() / 3600
+    # Calculate time between activities (duration): each event's duration is
+    # the time until the next event of the same case (shifted columns)
+    ordered = df if sorted_by_case else _sort_by_case(df)
+    has_next = ordered["case_id"].eq(ordered["case_id"].shift(-1))
+    duration_hours = (
+        ordered["timestamp"].shift(-1) - ordered["timestamp"]
+    ).dt.total_seconds() / 3600
 
-            # Attribute duration to the resource who performed the current activity
-            if pd.notna(current_row[resource_id_col]):
-                durations.append(
-                    {
-                        "resource_id": current_row[resource_id_col],
-                        "resource_name": current_row[resource_name_col],
-                        "duration_hours": duration_hours,
-                        "activity": current_row["activity"],
-                    }
-                )
+    # Attribute duration to the resource who performed the current activity
+    attributed = has_next & ordered[resource_id_col].notna()
 
-    if not durations:
+    if not attributed.any():
         return {"performance": [], "aggregation_level": aggregation_level}
 
-    # Convert to DataFrame and calculate statistics
-    duration_df = pd.DataFrame(durations)
+    duration_df = pd.DataFrame(
+        {
+            "resource_id": ordered[resource_id_col][attributed],
+            "resource_name": ordered[resource_name_col][attributed],
+            "duration_hours": duration_hours[attributed],
+            "activity": ordered["activity"][attributed],
+        }
+    )
 
     performance_stats = (
         duration_df.groupby(["resource_id", "resource_name"])
@@ -363,6 +544,59 @@ def analyze_performance(
     return {"performance": performance, "aggregation_level": aggregation_level}
 
 
+def _compute_organization_analyses(
+    process_type: str,
+    aggregation_level: str,
+    filter_mode: str,
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+) -> Tuple[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]], int, int]:
+    """
+    Compute handover, workload and performance analyses from one extraction.
+
+    Runs in an offload worker process (see src.services.offload).
+
+    Returns:
+        Tuple of ((handover_data, workload_data, performance_data),
+        event count, case count)
+    """
+    # Load the event log once and share it (and its case/timestamp order)
+    # between all three analyses
+    df = load_event_log_with_organization(process_type, filter_mode, date_from, date_to)
+    ordered = _sort_by_case(df)
+
+    check_cancelled()
+    handover_data = compute_handover(ordered, aggregation_level, sorted_by_case=True)
+    check_cancelled()
+    workload_data = compute_workload(ordered, aggregation_level)
+    check_cancelled()
+    performance_data = compute_performance(
+        ordered, aggregation_level, sorted_by_case=True
+    )
+    analyses = (handover_data, workload_data, performance_data)
+    return analyses, len(df), df["case_id"].nunique()
+
+
+def _measured_organization_analyses(
+    process_type: str,
+    aggregation_level: str,
+    filter_mode: str,
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Compute the three analyses and calibrate the cost model by their runtime."""
+    (analyses, event_count, case_count), seconds = offload_timed(
+        _compute_organization_analyses,
+        process_type,
+        aggregation_level,
+        filter_mode,
+        date_from,
+        date_to,
+    )
+    cost_model.record("organization", event_count, case_count, seconds)
+    return analyses
+
+
 def create_organization_analysis(
     analysis_name: str,
     process_type: str,
@@ -370,48 +604,91 @@ def create_organization_analysis(
     filter_mode: str = "all",
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
+    progress: Optional[Callable[[float], None]] = None,
 ) -> Dict[str, Any]:
     """
     Create and save organization analysis results.
 
-    Returns analysis metadata and summary.
+    Returns analysis metadata and summary. progress optionally receives the
+    completed fraction (0-1), used by background jobs.
+
+    Raises:
+        ValueError: If date_from or date_to cannot be parsed
     """
-    # Run all three analyses
-    handover_data = analyze_handover(
-        process_type, aggregation_level, filter_mode, date_from, date_to
-    )
-    workload_data = analyze_workload(
-        process_type, aggregation_level, filter_mode, date_from, date_to
+    # The parsed window both filters the event log and is stored with the result
+    start, end = parse_filter_date(date_from), parse_filter_date(date_to)
+
+    # Compute the three analyses, or reuse the result of an identical request
+    # on the same data version
+    (handover_data, workload_data, performance_data), _ = result_cache.get_or_compute(
+        "organization",
+        {
+            "process_type": process_type,
+            "aggregation_level": aggregation_level,
+            "filter_mode": filter_mode,
+            "date_from": start,
+            "date_to": end,
+        },
+        lambda: _measured_organization_analyses(
+            process_type,
+            aggregation_level,
+            filter_mode,
+            start,
+            end,
+        ),
     )
-    performance_data = analyze_performance(
-        process_type, aggregation_level, filter_mode, date_from, date_to
+    if progress:
+        progress(0.9)
+
+    # Save to database. With compressed storage the stored body is exactly
+    # what GET /organization/analyses/{id} returns, so the id and timestamps
+    # are fixed before the insert.
+    created_at = datetime.utcnow()
+    detail = _organization_analysis_detail(
+        analysis_id=str(uuid4()),
+        analysis_name=analysis_name,
+        process_type=process_type,
+        aggregation_level=aggregation_level,
+        filter_mode=filter_mode,
+        date_from=start,
+        date_to=end,
+        created_at=created_at,
+        handover_data=handover_data,
+        workload_data=workload_data,
+        performance_data=performance_data,
     )
+    result_body = encode_result(detail)
+    store_jsonb = result_body is None
 
-    # Save to database
     query = text(
         """
         INSERT INTO organization_analysis_results (
-            analysis_name, process_type, aggregation_level, filter_mode,
-            date_from, date_to, handover_data, workload_data, performance_data
+            analysis_id, analysis_name, process_type, aggregation_level, filter_mode,
+            date_from, date_to, created_at,
+            handover_data, workload_data, performance_data, result_body
         )
         VALUES (
-            :analysis_name, :process_type, :aggregation_level, :filter_mode,
-            :date_from, :date_to, :handover_data, :workload_data, :performance_data
+            :analysis_id, :analysis_name, :process_type, :aggregation_level,
+            :filter_mode, :date_from, :date_to, :created_at,
+            :handover_data, :workload_data, :performance_data, :result_body
         )
         RETURNING analysis_id, created_at
     """
     )
 
     params = {
+        "analysis_id": detail["analysis_id"],
         "analysis_name": analysis_name,
         "process_type": process_type,
         "aggregation_level": aggregation_level,
         "filter_mode": filter_mode,
-        "date_from": date_from,
-        "date_to": date_to,
-        "handover_data": json.dumps(handover_data),
-        "workload_data": json.dumps(workload_data),
-        "performance_data": json.dumps(performance_data),
+        "date_from": start,
+        "date_to": end,
+        "created_at": created_at,
+        "handover_data": json.dumps(handover_data) if store_jsonb else None,
+        "workload_data": json.dumps(workload_data) if store_jsonb else None,
+        "performance_data": json.dumps(performance_data) if store_jsonb else None,
+        "result_body": result_body,
     }
 
     with engine.connect() as conn:
@@ -430,33 +707,92 @@ def create_organization_analysis(
     }
 
 
+def parse_filter_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a filter date as compared with TIMESTAMP columns (naive UTC).
+
+    Dates with an offset are converted to UTC; PostgreSQL would otherwise
+    drop the offset when binding them to TIMESTAMP.
+
+    Raises:
+        ValueError: If the date cannot be parsed
+    """
+    if not value:
+        return None
+    try:
+        parsed = pd.Timestamp(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}") from None
+    if parsed.tzinfo is not None:
+        parsed = parsed.tz_convert("UTC").tz_localize(None)
+    return parsed.to_pydatetime()
+
+
+def _organization_analysis_detail(
+    analysis_id: str,
+    analysis_name: str,
+    process_type: str,
+    aggregation_level: str,
+    filter_mode: str,
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    created_at: datetime,
+    handover_data: Dict[str, Any],
+    workload_data: Dict[str, Any],
+    performance_data: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Response body of a saved organization analysis."""
+    return {
+        "analysis_id": analysis_id,
+        "analysis_name": analysis_name,
+        "process_type": process_type,
+        "aggregation_level": aggregation_level,
+        "filter_mode": filter_mode,
+        "date_from": date_from.isoformat() if date_from else None,
+        "date_to": date_to.isoformat() if date_to else None,
+        "created_at": created_at.isoformat(),
+        "handover_data": handover_data,
+        "workload_data": workload_data,
+        "performance_data": performance_data,
+    }
+
+
 def get_organization_analyses(
     process_type: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, str]] = None,
 ) -> List[Dict[str, Any]]:
     """
-    Get list of organization analysis results.
+    Get list of organization analysis results (newest first).
 
-    Optionally filter by process_type.
+    Optionally filter by process_type. Only list columns are selected.
+
+    Args:
+        process_type: Process type to filter
+        limit: Maximum number of rows
+        after: Keyset position (created_at, analysis_id) to continue after
     """
+    conditions = []
+    params: Dict[str, Any] = {"limit": limit}
     if process_type:
-        query = text(
-            """
-            SELECT analysis_id, analysis_name, process_type, aggregation_level, created_at
-            FROM organization_analysis_results
-            WHERE process_type = :process_type
-            ORDER BY created_at DESC
-        """
+        conditions.append("process_type = :process_type")
+        params["process_type"] = process_type
+    if after:
+        conditions.append(
+            "(created_at, analysis_id) < (:after_created_at, CAST(:after_id AS uuid))"
         )
-        params = {"process_type": process_type}
-    else:
-        query = text(
-            """
-            SELECT analysis_id, analysis_name, process_type, aggregation_level, created_at
-            FROM organization_analysis_results
-            ORDER BY created_at DESC
-        """
-        )
-        params = {}
+        params["after_created_at"], params["after_id"] = after
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    query = text(
+        f"""
+        SELECT analysis_id, analysis_name, process_type, aggregation_level, created_at
+        FROM organization_analysis_results
+        {where}
+        ORDER BY created_at DESC, analysis_id DESC
+        LIMIT :limit
+    """  # nosec B608 - where is built from fixed predicates
+    )
 
     with engine.connect() as conn:
         result = conn.execute(query, params)
@@ -475,18 +811,22 @@ def get_organization_analyses(
     return analyses
 
 
-def get_organization_analysis_by_id(analysis_id: str) -> Optional[Dict[str, Any]]:
+def get_organization_analysis_by_id(
+    analysis_id: str, stored: bool = False
+) -> Optional[Union[Dict[str, Any], StoredBody]]:
     """
     Get organization analysis result by ID.
 
     Returns complete analysis data including handover, workload, and performance.
+    With stored=True a compressed stored result is returned as StoredBody
+    without decompressing it.
     """
     query = text(
         """
         SELECT
             analysis_id, analysis_name, process_type, aggregation_level,
             filter_mode, date_from, date_to, created_at,
-            handover_data, workload_data, performance_data
+            handover_data, workload_data, performance_data, result_body
         FROM organization_analysis_results
         WHERE analysis_id = :analysis_id
     """
@@ -499,16 +839,19 @@ def get_organization_analysis_by_id(analysis_id: str) -> Optional[Dict[str, Any]
         if not row:
             return None
 
-        return {
-            "analysis_id": str(row[0]),
-            "analysis_name": row[1],
-            "process_type": row[2],
-            "aggregation_level": row[3],
-            "filter_mode": row[4],
-            "date_from": row[5].isoformat() if row[5] else None,
-            "date_to": row[6].isoformat() if row[6] else None,
-            "created_at": row[7].isoformat(),
-            "handover_data": row[8],
-            "workload_data": row[9],
-            "performance_data": row[10],
-        }
+        if row[11] is not None:
+            return StoredBody(row[11]) if stored else decode_result(row[11])
+
+        return _organization_analysis_detail(
+            analysis_id=str(row[0]),
+            analysis_name=row[1],
+            process_type=row[2],
+            aggregation_level=row[3],
+            filter_mode=row[4],
+            date_from=row[5],
+            date_to=row[6],
+            created_at=row[7],
+            handover_data=row[8],
+            workload_data=row[9],
+            performance_data=row[10],
+        )
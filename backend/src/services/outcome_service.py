@@ -1,11 +1,20 @@
 """Outcome analysis service"""
 
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
+from datetime import datetime
+from uuid import UUID, uuid4
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, tuple_
 import pandas as pd
 import numpy as np
 
+from src.models.event_log import ColumnarEventLog
+from src.analysis.dfg_kernel import (
+    DFGCounts,
+    count_transitions,
+    directly_follows_by_group,
+    find_transitions,
+)
 from src.models.outcome import (
     OutcomeAnalysisResult,
     MetricInfo,
@@ -14,6 +23,12 @@ from src.models.outcome import (
     CreateAnalysisParams,
     OutcomeStats,
 )
+from src.services.analyze_service import get_preview
+from src.services.offload import offload_with_session_timed
+from src.services.cancellation import check_cancelled
+from src.services.cost_model import cost_model
+from src.services.result_cache import result_cache
+from src.services.result_storage import StoredBody, decode_result, encode_result
 
 
 def get_available_metrics(db: Session, process_type: str) -> List[MetricInfo]:
@@ -41,17 +56,46 @@ def get_available_metrics(db: Session, process_type: str) -> List[MetricInfo]:
 
 
 def get_outcome_analyses(
-    db: Session, process_type: Optional[str] = None, metric_name: Optional[str] = None
+    db: Session,
+    process_type: Optional[str] = None,
+    metric_name: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, str]] = None,
 ) -> List[OutcomeAnalysisSummary]:
-    """成果分析結果の一覧を取得"""
-    query = db.query(OutcomeAnalysisResult)
+    """
+    成果分析結果の一覧を取得（新しい順）
+
+    一覧用の列のみを取得し、result_data は読み込まない。
+    after には前ページ末尾の (created_at, analysis_id) を指定する。
+    """
+    query = db.query(
+        OutcomeAnalysisResult.analysis_id,
+        OutcomeAnalysisResult.analysis_name,
+        OutcomeAnalysisResult.process_type,
+        OutcomeAnalysisResult.metric_name,
+        OutcomeAnalysisResult.analysis_type,
+        OutcomeAnalysisResult.created_at,
+    )
 
     if process_type:
         query = query.filter(OutcomeAnalysisResult.process_type == process_type)
     if metric_name:
         query = query.filter(OutcomeAnalysisResult.metric_name == metric_name)
+    if after:
+        created_at, analysis_id = after
+        query = query.filter(
+            tuple_(OutcomeAnalysisResult.created_at, OutcomeAnalysisResult.analysis_id)
+            < tuple_(created_at, UUID(analysis_id))
+        )
 
-    results = query.order_by(OutcomeAnalysisResult.created_at.desc()).all()
+    results = (
+        query.order_by(
+            OutcomeAnalysisResult.created_at.desc(),
+            OutcomeAnalysisResult.analysis_id.desc(),
+        )
+        .limit(limit)
+        .all()
+    )
 
     return [
         OutcomeAnalysisSummary(
@@ -67,9 +111,13 @@ def get_outcome_analyses(
 
 
 def get_outcome_analysis_by_id(
-    db: Session, analysis_id: str
-) -> Optional[OutcomeAnalysisDetail]:
-    """特定の成果分析結果を取得"""
+    db: Session, analysis_id: str, stored: bool = False
+) -> Optional[Union[OutcomeAnalysisDetail, StoredBody]]:
+    """
+    特定の成果分析結果を取得
+
+    stored=True の場合、圧縮保存された結果は展開せず StoredBody のまま返す。
+    """
     result = (
         db.query(OutcomeAnalysisResult)
         .filter(OutcomeAnalysisResult.analysis_id == analysis_id)
@@ -79,6 +127,18 @@ def get_outcome_analysis_by_id(
     if not result:
         return None
 
+    if result.result_body is not None:
+        if stored:
+            return StoredBody(result.result_body)
+        return OutcomeAnalysisDetail.model_validate(decode_result(result.result_body))
+
+    return _to_detail(result, result.result_data)
+
+
+def _to_detail(
+    result: OutcomeAnalysisResult, result_data: Dict[str, Any]
+) -> OutcomeAnalysisDetail:
+    """保存行と分析結果から詳細レスポンスを作成"""
     return OutcomeAnalysisDetail(
         analysis_id=str(result.analysis_id),
         analysis_name=result.analysis_name,
@@ -86,7 +146,7 @@ def get_outcome_analysis_by_id(
         metric_name=result.metric_name,
         analysis_type=result.analysis_type,
         filter_config=result.filter_config,
-        result_data=result.result_data,
+        result_data=result_data,
         created_at=result.created_at,
     )
 
@@ -106,6 +166,14 @@ def _calculate_outcome_stats(values: List[float]) -> OutcomeStats:
     )
 
 
+def _case_outcome_array(case_ids: np.ndarray, outcomes_df: pd.DataFrame) -> np.ndarray:
+    """ケースコード順の成果値配列を作成（成果のないケースは NaN）"""
+    outcome_by_case = outcomes_df.drop_duplicates("case_id").set_index("case_id")[
+        "metric_value"
+    ]
+    return outcome_by_case.reindex(case_ids).to_numpy(dtype=np.float64)
+
+
 def analyze_path_outcome(
     db: Session,
     process_type: str,
@@ -156,45 +224,30 @@ def analyze_path_outcome(
         params={"process_type": process_type, "metric_name": metric_name},
     )
 
-    # DFGを構築
-    edges_map = {}  # (source, target) -> list of case_ids
-    activity_counts = {}
-
-    for case_id, group in events_df.groupby("case_id"):
-        activities = group.sort_values("timestamp")["activity"].tolist()
-
-        for activity in activities:
-            activity_counts[activity] = activity_counts.get(activity, 0) + 1
-
-        for i in range(len(activities) - 1):
-            source = activities[i]
-            target = activities[i + 1]
-            edge_key = (source, target)
-
-            if edge_key not in edges_map:
-                edges_map[edge_key] = []
-            edges_map[edge_key].append(case_id)
-
-    # 待機時間を計算
-    waiting_times = {}
-    for case_id, group in events_df.groupby("case_id"):
-        sorted_events = group.sort_values("timestamp")
-        for i in range(len(sorted_events) - 1):
-            source = sorted_events.iloc[i]["activity"]
-            target = sorted_events.iloc[i + 1]["activity"]
-            time_diff = (
-                sorted_events.iloc[i + 1]["timestamp"]
-                - sorted_events.iloc[i]["timestamp"]
-            ).total_seconds() / 3600
-
-            edge_key = (source, target)
-            if edge_key not in waiting_times:
-                waiting_times[edge_key] = []
-            waiting_times[edge_key].append(time_diff)
+    # DFGを構築（ノード頻度・エッジ頻度・待機時間を1パスで集計）
+    check_cancelled()
+    log = ColumnarEventLog.from_dataframe(events_df)
+    transitions = find_transitions(log)
+    dfg_counts = count_transitions(log.activities, log.activity_codes, transitions)
+
+    # 成果をケースコード順の配列に変換し、遷移ごとにケースの成果を結合
+    case_outcomes = _case_outcome_array(log.case_ids, outcomes_df)
+    transition_outcomes = case_outcomes[transitions.case_codes]
+    has_outcome = ~np.isnan(transition_outcomes)
+
+    # エッジごとの成果統計を1回のグループ集計で算出
+    n_activities = dfg_counts.n_activities
+    edge_index = transitions.sources.astype(np.int64) * n_activities
+    edge_index += transitions.targets
+    edge_outcome_stats = (
+        pd.Series(transition_outcomes[has_outcome])
+        .groupby(edge_index[has_outcome])
+        .agg(["mean", "median", "sum", "min", "max", "count"])
+    )
 
     # React Flow互換のノードとエッジを生成
     nodes = []
-    for activity, count in activity_counts.items():
+    for activity, count in dfg_counts.nodes():
         nodes.append(
             {
                 "id": activity,
@@ -204,20 +257,26 @@ def analyze_path_outcome(
         )
 
     edges = []
+    top_paths = []
     edge_id = 0
-    for (source, target), case_ids in edges_map.items():
+    for index, (source, target, frequency, avg_waiting_time) in zip(
+        dfg_counts.edge_positions(), dfg_counts.edges()
+    ):
         edge_id += 1
 
-        # このパスを通過したケースの成果を集計
-        outcome_values = []
-        for case_id in case_ids:
-            outcome_row = outcomes_df[outcomes_df["case_id"] == case_id]
-            if not outcome_row.empty:
-                outcome_values.append(float(outcome_row.iloc[0]["metric_value"]))
-
-        outcome_stats = _calculate_outcome_stats(outcome_values)
-
-        avg_waiting_time = np.mean(waiting_times.get((source, target), [0]))
+        # このパスを通過したケースの成果統計
+        if index in edge_outcome_stats.index:
+            stats = edge_outcome_stats.loc[index]
+            outcome_stats = OutcomeStats(
+                avg=float(stats["mean"]),
+                median=float(stats["median"]),
+                total=float(stats["sum"]),
+                min=float(stats["min"]),
+                max=float(stats["max"]),
+                count=int(stats["count"]),
+            )
+        else:
+            outcome_stats = _calculate_outcome_stats([])
 
         edges.append(
             {
@@ -225,37 +284,31 @@ def analyze_path_outcome(
                 "source": source,
                 "target": target,
                 "data": {
-                    "frequency": len(case_ids),
-                    "avg_waiting_time_hours": float(avg_waiting_time),
+                    "frequency": frequency,
+                    "avg_waiting_time_hours": avg_waiting_time,
                     "outcome_stats": {metric_name: outcome_stats.dict()},
                 },
             }
         )
+        top_paths.append(
+            {"source": source, "target": target, "avg_outcome": outcome_stats.avg}
+        )
 
     # サマリー情報を生成
     all_outcome_values = outcomes_df["metric_value"].tolist()
     overall_stats = _calculate_outcome_stats(all_outcome_values)
 
     # 高成果パスを特定（平均値が全体平均の1.2倍以上）
-    top_paths = []
-    for edge in edges:
-        edge_avg = edge["data"]["outcome_stats"][metric_name]["avg"]
-        if edge_avg >= overall_stats.avg * 1.2:
-            top_paths.append(
-                {
-                    "source": edge["source"],
-                    "target": edge["target"],
-                    "avg_outcome": edge_avg,
-                }
-            )
-
+    top_paths = [
+        path for path in top_paths if path["avg_outcome"] >= overall_stats.avg * 1.2
+    ]
     top_paths.sort(key=lambda x: x["avg_outcome"], reverse=True)
 
     return {
         "nodes": nodes,
         "edges": edges,
         "summary": {
-            "total_cases": len(events_df["case_id"].unique()),
+            "total_cases": log.case_count,
             "metrics": [metric_name],
             "overall_stats": overall_stats.dict(),
             "top_paths": top_paths[:5],  # 上位5件
@@ -263,6 +316,37 @@ def analyze_path_outcome(
     }
 
 
+def _dfg_nodes_and_edges(dfg_counts: DFGCounts) -> Tuple[List[Dict], List[Dict]]:
+    """DFG集計結果からReact Flow互換のノードとエッジを生成"""
+    nodes = []
+    for activity, count in dfg_counts.nodes():
+        nodes.append(
+            {
+                "id": activity,
+                "type": "actionNode",
+                "data": {"label": activity, "frequency": count},
+            }
+        )
+
+    edges = []
+    edge_id = 0
+    for source, target, frequency, avg_waiting_time in dfg_counts.edges():
+        edge_id += 1
+        edges.append(
+            {
+                "id": f"edge-{edge_id}",
+                "source": source,
+                "target": target,
+                "data": {
+                    "frequency": frequency,
+                    "avg_waiting_time_hours": avg_waiting_time,
+                },
+            }
+        )
+
+    return nodes, edges
+
+
 def analyze_segment_comparison(
     db: Session,
     process_type: str,
@@ -350,106 +434,45 @@ def analyze_segment_comparison(
 
     events_df = pd.read_sql(event_query, db.bind, params=params)
 
-    # 各セグメントのDFGを生成
-    def _build_dfg(case_ids):
-        segment_events = events_df[events_df["case_id"].isin(case_ids)]
-
-        edges_map = {}
-        activity_counts = {}
-        waiting_times = {}
-
-        for case_id, group in segment_events.groupby("case_id"):
-            activities = group.sort_values("timestamp")["activity"].tolist()
-
-            for activity in activities:
-                activity_counts[activity] = activity_counts.get(activity, 0) + 1
-
-            for i in range(len(activities) - 1):
-                source = activities[i]
-                target = activities[i + 1]
-                edge_key = (source, target)
-
-                if edge_key not in edges_map:
-                    edges_map[edge_key] = []
-                edges_map[edge_key].append(case_id)
-
-        # 待機時間を計算
-        for case_id, group in segment_events.groupby("case_id"):
-            sorted_events = group.sort_values("timestamp")
-            for i in range(len(sorted_events) - 1):
-                source = sorted_events.iloc[i]["activity"]
-                target = sorted_events.iloc[i + 1]["activity"]
-                time_diff = (
-                    sorted_events.iloc[i + 1]["timestamp"]
-                    - sorted_events.iloc[i]["timestamp"]
-                ).total_seconds() / 3600
-
-                edge_key = (source, target)
-                if edge_key not in waiting_times:
-                    waiting_times[edge_key] = []
-                waiting_times[edge_key].append(time_diff)
-
-        # ノード生成
-        nodes = []
-        for activity, count in activity_counts.items():
-            nodes.append(
-                {
-                    "id": activity,
-                    "type": "actionNode",
-                    "data": {"label": activity, "frequency": count},
-                }
-            )
-
-        # エッジ生成
-        edges = []
-        edge_id = 0
-        for (source, target), case_ids_list in edges_map.items():
-            edge_id += 1
-            avg_waiting_time = np.mean(waiting_times.get((source, target), [0]))
-
-            edges.append(
-                {
-                    "id": f"edge-{edge_id}",
-                    "source": source,
-                    "target": target,
-                    "data": {
-                        "frequency": len(case_ids_list),
-                        "avg_waiting_time_hours": float(avg_waiting_time),
-                    },
-                }
-            )
-
-        return nodes, edges, edges_map
+    # 各ケースにセグメントを付与（0: 高成果群, 1: 低成果群, -1: 対象外）
+    check_cancelled()
+    log = ColumnarEventLog.from_dataframe(events_df)
+    case_segments = np.full(log.case_count, -1, dtype=np.int64)
+    case_segments[pd.Index(log.case_ids).isin(low_segment_cases)] = 1
+    case_segments[pd.Index(log.case_ids).isin(high_segment_cases)] = 0
 
-    high_nodes, high_edges, high_edges_map = _build_dfg(high_segment_cases)
-    low_nodes, low_edges, low_edges_map = _build_dfg(low_segment_cases)
+    # 1回の走査で両セグメントのDFGを生成
+    high_counts, low_counts = directly_follows_by_group(log, case_segments, 2)
+    high_nodes, high_edges = _dfg_nodes_and_edges(high_counts)
+    low_nodes, low_edges = _dfg_nodes_and_edges(low_counts)
 
     # 差分を計算（パス出現率の差）
     total_high = len(high_segment_cases)
     total_low = len(low_segment_cases)
 
+    def _rate(edge_frequency, total):
+        if total > 0:
+            return edge_frequency / total
+        return np.zeros(edge_frequency.shape)
+
+    high_rate = _rate(high_counts.edge_frequency, total_high)
+    low_rate = _rate(low_counts.edge_frequency, total_low)
+    diff_rate = high_rate - low_rate
+
     differences = []
-    all_edge_keys = set(high_edges_map.keys()) | set(low_edges_map.keys())
-
-    for edge_key in all_edge_keys:
-        high_freq = len(high_edges_map.get(edge_key, []))
-        low_freq = len(low_edges_map.get(edge_key, []))
-
-        high_rate = high_freq / total_high if total_high > 0 else 0
-        low_rate = low_freq / total_low if total_low > 0 else 0
-
-        diff_rate = high_rate - low_rate
-
-        if abs(diff_rate) > 0.1:  # 10%以上の差分のみ
-            differences.append(
-                {
-                    "source": edge_key[0],
-                    "target": edge_key[1],
-                    "high_rate": round(high_rate * 100, 1),
-                    "low_rate": round(low_rate * 100, 1),
-                    "diff_rate": round(diff_rate * 100, 1),
-                }
-            )
+    n_activities = high_counts.n_activities
+    # 10%以上の差分のみ
+    for index in np.flatnonzero(np.abs(diff_rate) > 0.1):
+        source, target = divmod(int(index), n_activities)
+        differences.append(
+            {
+                "source": log.activities[source],
+                "target": log.activities[target],
+                "high_rate": round(float(high_rate[source, target]) * 100, 1),
+                "low_rate": round(float(low_rate[source, target]) * 100, 1),
+                "diff_rate": round(float(diff_rate[source, target]) * 100, 1),
+            }
+        )
 
     differences.sort(key=lambda x: abs(x["diff_rate"]), reverse=True)
 
@@ -489,8 +512,16 @@ def analyze_segment_comparison(
     }
 
 
-def create_outcome_analysis(db: Session, params: CreateAnalysisParams) -> str:
-    """成果分析を作成"""
+def create_outcome_analysis(
+    db: Session,
+    params: CreateAnalysisParams,
+    progress: Optional[Callable[[float], None]] = None,
+) -> str:
+    """
+    成果分析を作成
+
+    progress には進捗（0〜1）を通知するコールバックを指定できる（バックグラウンドジョブ用）。
+    """
 
     # filter_configを準備（date_from/date_toを統合）
     filter_config = params.filter_config or {}
@@ -499,39 +530,74 @@ def create_outcome_analysis(db: Session, params: CreateAnalysisParams) -> str:
     if params.date_to:
         filter_config["date_to"] = params.date_to
 
-    # 分析を実行
+    # 分析を実行（同じデータバージョンで同一条件の結果があれば再利用）
+    # 分析処理はプロセスプールのワーカーで実行する
     if params.analysis_type == "path-outcome":
-        result_data = analyze_path_outcome(
-            db,
-            params.process_type,
-            params.metric_name,
-            filter_config if filter_config else None,
-        )
+
+        def compute():
+            return offload_with_session_timed(
+                db,
+                analyze_path_outcome,
+                params.process_type,
+                params.metric_name,
+                filter_config if filter_config else None,
+            )
+
     elif params.analysis_type == "segment-comparison":
         # filter_configからセグメント設定を取得
         segment_mode = filter_config.get("segment_mode", "top25")
         threshold = filter_config.get("threshold")
 
-        result_data = analyze_segment_comparison(
-            db,
-            params.process_type,
-            params.metric_name,
-            segment_mode,
-            threshold,
-            filter_config if filter_config else None,
-        )
+        def compute():
+            return offload_with_session_timed(
+                db,
+                analyze_segment_comparison,
+                params.process_type,
+                params.metric_name,
+                segment_mode,
+                threshold,
+                filter_config if filter_config else None,
+            )
+
     else:
         raise ValueError(f"Unsupported analysis type: {params.analysis_type}")
 
-    # DBに保存
+    def measured_compute():
+        result, seconds = compute()
+        # 実行時間の見積もりを実測で補正（見積もりと同じくプロセス全体の件数を基準にする）
+        preview = get_preview(params.process_type)
+        cost_model.record(
+            "outcome", preview["event_count"], preview["case_count"], seconds
+        )
+        return result
+
+    result_data, _ = result_cache.get_or_compute(
+        "outcome",
+        {
+            "analysis_type": params.analysis_type,
+            "process_type": params.process_type,
+            "metric_name": params.metric_name,
+            "filter_config": filter_config,
+        },
+        measured_compute,
+    )
+
+    if progress:
+        progress(0.9)
+
+    # DBに保存（圧縮保存時は GET で返すレスポンス本文をそのまま保存）
     analysis = OutcomeAnalysisResult(
+        analysis_id=uuid4(),
         analysis_name=params.analysis_name,
         process_type=params.process_type,
         metric_name=params.metric_name,
         analysis_type=params.analysis_type,
         filter_config=filter_config if filter_config else None,
-        result_data=result_data,
+        created_at=datetime.utcnow(),
     )
+    analysis.result_body = encode_result(_to_detail(analysis, result_data))
+    if analysis.result_body is None:
+        analysis.result_data = result_data
 
     db.add(analysis)
     db.commit()
@@ -0,0 +1,201 @@
+"""
+Cache of computed analysis results.
+
+Results are keyed on the analysis kind, its request parameters and the data
+version of the dbt marts. The data version is the invocation_id of the last
+dbt run, recorded by the ``on-run-end`` hook in ``public.dbt_run_log``, so a
+dbt refresh makes every older entry unreachable and it is evicted on the next
+insert. Without a recorded dbt run nothing is cached.
+
+Entries are kept pickled: the cache is bounded by their total size as well as
+by their number, and a hit is unpickled, which is much cheaper than deep
+copying the result objects.
+
+Identical requests that arrive while the result is being computed do not
+compute it again: they wait for the computation in flight and share its
+result (single-flight), whether or not the result is cached afterwards.
+"""
+
+import json
+import os
+import pickle  # nosec B403 - only results computed by this process are unpickled
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.db.connection import engine
+from src.services.cancellation import (
+    CANCEL_POLL_SECONDS,
+    AnalysisCancelledError,
+    check_cancelled,
+)
+
+T = TypeVar("T")
+
+# Maximum number of cached results (least recently used entries are evicted)
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+
+# Memory budget for cached results in bytes (as pickled)
+RESULT_CACHE_MAX_BYTES = int(
+    os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+
+# Seconds the data version is reused before dbt_run_log is queried again
+DATA_VERSION_TTL_SECONDS = float(os.getenv("DATA_VERSION_TTL_SECONDS", "5"))
+
+
+class ResultCache:
+    """Thread-safe LRU cache of analysis results for one data version."""
+
+    def __init__(
+        self,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # Pickled results
+        self._entries: "OrderedDict[Tuple[Hashable, ...], bytes]" = OrderedDict()
+        self._size = 0
+        # Computations in flight, awaited by identical concurrent requests
+        self._in_flight: Dict[Tuple[Hashable, ...], Future] = {}
+        self._lock = threading.Lock()
+        self._data_version: Optional[str] = None
+        self._data_version_checked_at = float("-inf")
+
+    def data_version(self) -> Optional[str]:
+        """
+        Latest dbt invocation_id (reused for DATA_VERSION_TTL_SECONDS).
+
+        Returns:
+            Data version, or None if no dbt run has been recorded
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._data_version_checked_at < DATA_VERSION_TTL_SECONDS:
+                return self._data_version
+
+        version = get_data_version()
+        with self._lock:
+            self._data_version = version
+            self._data_version_checked_at = now
+        return version
+
+    def get_or_compute(
+        self, kind: str, params: Dict[str, Any], compute: Callable[[], T]
+    ) -> Tuple[T, bool]:
+        """
+        Return the cached result for (kind, params) or compute and store it.
+
+        Args:
+            kind: Analysis kind (e.g. "process", "preview")
+            params: Request parameters that determine the result
+            compute: Function computing the result on a miss
+
+        Returns:
+            Tuple of (result, reused). reused is True for cache hits and for
+            results shared with an identical request in flight. Results are
+            returned as copies, so callers may modify them.
+
+        Raises:
+            Exception: Whatever compute raised, also for requests that
+                waited for it (except cancellation: if the computing request
+                is cancelled, a waiting request computes the result itself)
+        """
+        version = self.data_version()
+        key = (version, kind, json.dumps(params, sort_keys=True, default=str))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return pickle.loads(self._entries[key]), True  # nosec B301
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = Future()
+
+        if not leader:
+            try:
+                return pickle.loads(_wait_for(flight)), True  # nosec B301
+            except AnalysisCancelledError:
+                check_cancelled()
+                # Only the request computing it was cancelled: compute again
+                return self.get_or_compute(kind, params, compute)
+
+        try:
+            result = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            flight.set_exception(e)
+            raise
+
+        shared = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            # Store before leaving the flight, so no later request recomputes
+            del self._in_flight[key]
+            if version is not None and len(shared) <= self.max_bytes:
+                # Entries of older data versions can no longer be hit
+                for stale in [k for k in self._entries if k[0] != version]:
+                    self._size -= len(self._entries.pop(stale))
+                self._entries[key] = shared
+                self._size += len(shared)
+                while (
+                    len(self._entries) > self.max_entries or self._size > self.max_bytes
+                ):
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        flight.set_result(shared)
+        return result, False
+
+    @property
+    def size(self) -> int:
+        """Total bytes of the cached (pickled) results."""
+        return self._size
+
+    def clear(self) -> None:
+        """Drop all entries and the remembered data version (not in-flight work)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._data_version = None
+            self._data_version_checked_at = float("-inf")
+
+
+def get_data_version() -> Optional[str]:
+    """
+    Read the invocation_id of the last finished dbt run.
+
+    Returns:
+        invocation_id, or None if dbt_run_log is missing or empty
+    """
+    query = text(
+        """
+        SELECT invocation_id
+        FROM public.dbt_run_log
+        ORDER BY finished_at DESC
+        LIMIT 1
+    """
+    )
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(query).fetchone()
+    except SQLAlchemyError:
+        return None
+    return str(row[0]) if row else None
+
+
+def _wait_for(flight: Future) -> Any:
+    """Wait for a computation in flight, unless the own request is cancelled."""
+    while True:
+        try:
+            return flight.result(timeout=CANCEL_POLL_SECONDS)
+        except TimeoutError:
+            check_cancelled()
+
+
+result_cache = ResultCache()
@@ -0,0 +1,70 @@
+"""
+Storage format of saved analysis results.
+
+By default results are stored in their JSONB columns. With
+RESULT_STORAGE_FORMAT=gzip the complete response body of a saved analysis is
+serialized once when it is saved, gzip compressed and stored in the
+``result_body`` BYTEA column instead (the JSONB columns stay NULL). Stored
+bodies are sent as-is with ``Content-Encoding: gzip``, so reading an analysis
+neither parses JSONB nor serializes or compresses JSON again.
+"""
+
+import gzip
+import json
+import os
+from typing import Any, NamedTuple, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+RESULT_STORAGE_FORMATS = ("jsonb", "gzip")
+
+# Storage format for newly saved analyses ("jsonb" or "gzip")
+RESULT_STORAGE_FORMAT = os.getenv("RESULT_STORAGE_FORMAT", "jsonb")
+if RESULT_STORAGE_FORMAT not in RESULT_STORAGE_FORMATS:
+    raise ValueError(
+        f"RESULT_STORAGE_FORMAT must be one of {RESULT_STORAGE_FORMATS}, "
+        f"got {RESULT_STORAGE_FORMAT!r}"
+    )
+
+# gzip compression level (1-9) of stored bodies
+RESULT_STORAGE_COMPRESSLEVEL = int(os.getenv("RESULT_STORAGE_COMPRESSLEVEL", "6"))
+
+
+class StoredBody(NamedTuple):
+    """gzip-compressed JSON response body as stored in result_body."""
+
+    data: bytes
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize content exactly like FastAPI's JSONResponse."""
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def encode_result(content: Any) -> Optional[bytes]:
+    """
+    Encode the response body of an analysis for the result_body column.
+
+    Args:
+        content: Response body of the saved analysis
+
+    Returns:
+        gzip-compressed JSON, or None if results are stored as JSONB
+    """
+    if RESULT_STORAGE_FORMAT != "gzip":
+        return None
+    # mtime=0 keeps the bytes (and the ETag derived from them) deterministic
+    return gzip.compress(
+        dump_json(content), compresslevel=RESULT_STORAGE_COMPRESSLEVEL, mtime=0
+    )
+
+
+def decode_result(data: bytes) -> Any:
+    """Decode a body stored by encode_result."""
+    return json.loads(gzip.decompress(data))
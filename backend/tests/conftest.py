@@ -2,7 +2,41 @@
 
 import sys
 from pathlib import Path
+from unittest.mock import patch
+
+import pytest
 
 # Add parent directory to sys.path to allow importing from src
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_result_cache():
+    """Start every test with empty caches and no data version."""
+    from src.api.response_cache import response_cache
+    from src.services.result_cache import result_cache
+
+    result_cache.clear()
+    response_cache.clear()
+    with patch("src.services.result_cache.get_data_version", return_value=None):
+        yield
+    result_cache.clear()
+    response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _in_process_analyses():
+    """Run offloaded analyses in the test process, where mocks apply."""
+    with patch("src.services.offload.OFFLOAD_WORKERS", 0):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _admitted_analyses():
+    """Admit analysis requests without querying their preview counts."""
+    with patch(
+        "src.services.analyze_service.get_preview",
+        return_value={"event_count": 0, "case_count": 0},
+    ):
+        yield
@@ -0,0 +1,289 @@
+"""Unit tests for analyze service"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from unittest.mock import Mock, patch
+from src.services.cost_model import CostCoefficients, CostModel
+from src.services.analyze_service import (
+    AnalysisContext,
+    calculate_lead_time_statistics,
+    execute_analysis,
+    get_preview,
+    load_event_log_from_db,
+)
+
+
+def _events_df():
+    return pd.DataFrame(
+        {
+            "case_id": ["C1", "C1", "C2", "C2", "C3", "C3", "C3"],
+            "activity": ["A", "B", "A", "B", "A", "C", "B"],
+            "timestamp": pd.to_datetime(
+                [
+                    "2025-01-01 10:00",
+                    "2025-01-01 12:00",
+                    "2025-01-02 10:00",
+                    "2025-01-02 14:00",
+                    "2025-01-03 10:00",
+                    "2025-01-03 11:00",
+                    "2025-01-03 20:00",
+                ]
+            ),
+            "resource": ["U1", "U2", "U1", "U2", "U1", "U3", "U2"],
+        }
+    )
+
+
+def _dfg_aggregate_df():
+    """(source, target) rows that the pushdown query returns for _events_df"""
+    columns = [
+        "source",
+        "target",
+        "frequency",
+        "waiting_time_sum",
+        "waiting_time_count",
+        "first_seen",
+    ]
+    rows = [
+        ("C", "B", 1, 9.0, 1, 6),
+        ("A", "B", 2, 6.0, 2, 1),
+        ("B", None, 3, np.nan, 0, 2),
+        ("A", "C", 1, 1.0, 1, 5),
+    ]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def _lead_time_df():
+    """Rows that the lead time pushdown query returns for _events_df"""
+    return pd.DataFrame(
+        [
+            ("all", 3, 2.0, 10.0, 4.0, None),
+            ("happy_path", 2, 2.0, 4.0, 3.0, "A\x1fB"),
+        ],
+        columns=["scope", "case_count", "min", "max", "median", "path"],
+    )
+
+
+class TestExecuteAnalysis:
+    """Tests for execute_analysis function"""
+
+    @patch("src.services.analyze_service.pd.read_sql")
+    def test_event_log_loaded_once(self, mock_read_sql):
+        """Test that DFG and lead time statistics share one extraction"""
+        mock_read_sql.return_value = _events_df()
+        mock_db = Mock()
+
+        result = execute_analysis(mock_db, "test", "order-to-cash")
+
+        assert mock_read_sql.call_count == 1
+        assert result["event_count"] == 7
+        assert result["case_count"] == 3
+        assert result["node_count"] == 3
+        saved = mock_db.add.call_args[0][0].result_data
+        stats = saved["lead_time_stats"]
+        assert stats["case_count"] == 3
+        assert stats["lead_time_hours"] == {"min": 2.0, "max": 10.0, "median": 4.0}
+        assert stats["happy_path"]["path"] == ["A", "B"]
+        assert stats["happy_path"]["case_count"] == 2
+
+    @patch("src.services.analyze_service.pd.read_sql")
+    def test_sql_execution_mode(self, mock_read_sql):
+        """Test that SQL pushdown aggregates give the in-memory result"""
+        mock_read_sql.return_value = _events_df()
+        in_memory = Mock()
+        execute_analysis(in_memory, "test", "order-to-cash")
+
+        mock_read_sql.reset_mock()
+        mock_read_sql.return_value = None
+        mock_read_sql.side_effect = [_dfg_aggregate_df(), _lead_time_df()]
+        pushdown = Mock()
+        result = execute_analysis(
+            pushdown, "test", "order-to-cash", execution_mode="sql"
+        )
+
+        assert mock_read_sql.call_count == 2
+        assert result["event_count"] == 7
+        assert result["case_count"] == 3
+        assert (
+            pushdown.add.call_args[0][0].result_data
+            == in_memory.add.call_args[0][0].result_data
+        )
+
+    @patch("src.services.analyze_service.iter_event_log_chunks")
+    @patch("src.services.analyze_service.pd.read_sql")
+    def test_streaming_execution_mode(self, mock_read_sql, mock_chunks):
+        """Test that chunked aggregation gives the in-memory result"""
+        mock_read_sql.return_value = _events_df()
+        in_memory = Mock()
+        execute_analysis(in_memory, "test", "order-to-cash")
+
+        df = _events_df()
+        mock_chunks.return_value = iter([df.iloc[0:3], df.iloc[3:5], df.iloc[5:]])
+        streaming = Mock()
+        result = execute_analysis(
+            streaming, "test", "order-to-cash", execution_mode="streaming"
+        )
+
+        assert mock_read_sql.call_count == 1
+        assert result["event_count"] == 7
+        assert result["case_count"] == 3
+        assert (
+            streaming.add.call_args[0][0].result_data
+            == in_memory.add.call_args[0][0].result_data
+        )
+
+    @patch("src.services.analyze_service.pd.read_sql")
+    def test_mart_execution_mode(self, mock_read_sql):
+        """Test that merged daily mart rows give the in-memory result"""
+        mock_read_sql.return_value = _events_df()
+        in_memory = Mock()
+        execute_analysis(
+            in_memory, "test", "order-to-cash", "case_start", "2025-01-01", "2025-01-31"
+        )
+
+        mock_read_sql.reset_mock()
+        mock_read_sql.return_value = None
+        mock_read_sql.side_effect = [_dfg_aggregate_df(), _lead_time_df()]
+        mart = Mock()
+        result = execute_analysis(
+            mart,
+            "test",
+            "order-to-cash",
+            "case_start",
+            "2025-01-01",
+            "2025-01-31",
+            execution_mode="mart",
+        )
+
+        mart_query = str(mock_read_sql.call_args_list[0][0][0])
+        assert "fct_daily_directly_follows" in mart_query
+        assert "case_start_at_midnight" in mart_query
+        lead_time_query = str(mock_read_sql.call_args_list[1][0][0])
+        assert "fct_case_summary" in lead_time_query
+        assert "fct_event_log" not in lead_time_query
+        assert result["case_count"] == 3
+        assert (
+            mart.add.call_args[0][0].result_data
+            == in_memory.add.call_args[0][0].result_data
+        )
+
+    def test_mart_execution_mode_requires_dates(self):
+        """Test that the mart mode rejects timestamps with a time part"""
+        with pytest.raises(ValueError):
+            execute_analysis(
+                Mock(),
+                "test",
+                "order-to-cash",
+                "case_end",
+                "2025-01-01T10:00:00",
+                "2025-01-31",
+                execution_mode="mart",
+            )
+
+    @patch("src.services.result_cache.get_data_version", return_value="run-1")
+    @patch("src.services.analyze_service.pd.read_sql")
+    def test_cached_result_reused(self, mock_read_sql, _):
+        """Test that an identical request on the same data version is not recomputed"""
+        mock_read_sql.return_value = _events_df()
+
+        first = execute_analysis(Mock(), "first", "order-to-cash")
+        db = Mock()
+        second = execute_analysis(db, "second", "order-to-cash")
+
+        assert mock_read_sql.call_count == 1
+        assert (first["cached"], second["cached"]) == (False, True)
+        assert second["case_count"] == 3
+        assert db.add.call_args[0][0].analysis_name == "second"
+
+    def test_invalid_execution_mode(self):
+        """Test that an unknown execution mode is rejected"""
+        with pytest.raises(ValueError):
+            execute_analysis(Mock(), "test", "order-to-cash", execution_mode="x")
+
+
+class TestLeadTimeStatistics:
+    """Tests for calculate_lead_time_statistics function"""
+
+    @patch("src.services.analyze_service.pd.read_sql")
+    def test_reuses_context(self, mock_read_sql):
+        """Test that a supplied context is not reloaded"""
+        mock_read_sql.return_value = _events_df()
+        context = AnalysisContext("order-to-cash")
+        assert len(context.event_log) == 7
+
+        stats = calculate_lead_time_statistics("order-to-cash", context=context)
+
+        assert mock_read_sql.call_count == 1
+        assert stats["happy_path"]["lead_time_hours"]["median"] == 3.0
+
+    @patch("src.services.analyze_service.pd.read_sql")
+    def test_runtime_recorded(self, mock_read_sql):
+        """Test that a standalone calculation corrects the lead time estimate"""
+        mock_read_sql.return_value = _events_df()
+        # 100 s per event: the measured run is far faster than estimated
+        model = CostModel({"lead_time": CostCoefficients(0, 100, 0, 0, 0, 0)})
+        before = model.estimate("lead_time", 7, 3).seconds
+
+        with patch("src.services.analyze_service.cost_model", model):
+            calculate_lead_time_statistics("order-to-cash")
+
+        assert model.estimate("lead_time", 7, 3).seconds < before
+
+    @patch("src.services.analyze_service.pd.read_sql")
+    def test_empty_log(self, mock_read_sql):
+        """Test lead time statistics without events"""
+        mock_read_sql.return_value = pd.DataFrame(
+            columns=["case_id", "activity", "timestamp", "resource"]
+        )
+
+        stats = calculate_lead_time_statistics("order-to-cash")
+
+        assert stats["case_count"] == 0
+        assert stats["lead_time_hours"]["median"] is None
+
+
+class TestCaseSummaryFilters:
+    """Tests for filters served by fct_case_summary"""
+
+    @patch("src.services.analyze_service.pd.read_sql")
+    def test_preview_reads_case_summary(self, mock_read_sql):
+        """Test that preview aggregates case rows instead of events"""
+        mock_read_sql.return_value = pd.DataFrame(
+            [
+                {
+                    "event_count": 7,
+                    "case_count": 3,
+                    "min_date": pd.Timestamp("2025-01-01 10:00"),
+                    "max_date": pd.Timestamp("2025-01-03 20:00"),
+                }
+            ]
+        )
+
+        preview = get_preview("order-to-cash", "case_end", "2025-01-01", "2025-01-31")
+
+        query = str(mock_read_sql.call_args[0][0])
+        assert "fct_case_summary" in query
+        assert "c.case_end_at BETWEEN :date_from AND :date_to" in query
+        assert "GROUP BY" not in query
+        assert preview["event_count"] == 7
+        assert preview["case_count"] == 3
+        assert preview["date_range"]["max"] == "2025-01-03T20:00:00"
+        assert set(preview["estimates"]["process:in_memory"]) == {
+            "seconds",
+            "memory_mb",
+        }
+
+    @patch("src.services.analyze_service.pd.read_sql")
+    def test_event_log_filtered_by_case_summary(self, mock_read_sql):
+        """Test that case_start filtering joins fct_case_summary"""
+        mock_read_sql.return_value = _events_df()
+
+        load_event_log_from_db(
+            "order-to-cash", "case_start", "2025-01-01", "2025-01-31"
+        )
+
+        query = str(mock_read_sql.call_args[0][0])
+        assert "JOIN public.fct_event_log e" in query
+        assert "c.case_start_at BETWEEN :date_from AND :date_to" in query
+        assert "MIN(timestamp)" not in query
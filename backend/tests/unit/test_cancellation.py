@@ -0,0 +1,154 @@
+"""Unit tests for deadlines and cancellation of analyses"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from multiprocessing import get_context
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+import anyio
+import pytest
+from src.main import app
+from src.api.cancellation import CancellationMiddleware
+from src.services.cancellation import (
+    AnalysisCancelledError,
+    CancelScope,
+    _apply_scope,
+    _release_scope,
+    cancel_scope,
+    check_cancelled,
+    current_scope,
+    run_in_scope,
+)
+from src.services.offload import ProcessOffloader
+
+client = TestClient(app)
+
+
+class TestCancelScope:
+    """Tests for CancelScope"""
+
+    def test_cancel(self):
+        """Test that a cancelled scope stops at the next cancellation point"""
+        with cancel_scope() as scope:
+            check_cancelled()
+            scope.cancel()
+            with pytest.raises(AnalysisCancelledError) as exc_info:
+                check_cancelled()
+
+        assert not exc_info.value.timed_out
+        assert current_scope() is None
+
+    def test_deadline(self):
+        """Test that a scope times out after its timeout"""
+        with cancel_scope(0.01):
+            time.sleep(0.02)
+            with pytest.raises(AnalysisCancelledError) as exc_info:
+                check_cancelled()
+
+        assert exc_info.value.timed_out
+
+    def test_cancel_reaches_worker_process(self):
+        """Test that cancellation is seen by offload worker processes"""
+        scope = CancelScope()
+        try:
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                assert pool.submit(run_in_scope, scope, abs, -1).result() == 1
+                scope.cancel()
+                with pytest.raises(AnalysisCancelledError):
+                    pool.submit(run_in_scope, scope, abs, -1).result()
+        finally:
+            scope.close()
+
+    def test_statement_timeout(self):
+        """Test that statements get the remaining time as statement_timeout"""
+        cursor = MagicMock()
+        timeout_cursor = cursor.connection.cursor.return_value.__enter__.return_value
+
+        with cancel_scope(10):
+            _apply_scope(None, cursor, "SELECT 1", {}, None, False)
+            _release_scope(None, cursor, "SELECT 1", {}, None, False)
+
+        statement, (milliseconds,) = timeout_cursor.execute.call_args.args
+        assert statement == "SET LOCAL statement_timeout = %s"
+        assert 0 < milliseconds <= 10000
+
+    def test_cancelled_scope_runs_no_statement(self):
+        """Test that no statement is sent after the scope was cancelled"""
+        cursor = MagicMock()
+
+        with cancel_scope() as scope:
+            scope.cancel()
+            with pytest.raises(AnalysisCancelledError):
+                _apply_scope(None, cursor, "SELECT 1", {}, None, False)
+
+        cursor.connection.cursor.assert_not_called()
+
+    def test_offloader_stops_waiting(self):
+        """Test that a cancelled request stops waiting for its worker"""
+        offloader = ProcessOffloader(max_workers=1, max_queued=0)
+
+        with patch.object(offloader, "_get_pool") as mock_pool:
+            mock_pool.return_value.submit.return_value.result.side_effect = TimeoutError
+            with cancel_scope() as scope:
+                scope.cancel()
+                with pytest.raises(AnalysisCancelledError):
+                    offloader.run(abs, -1)
+
+
+class TestCancellationMiddleware:
+    """Tests for CancellationMiddleware"""
+
+    def _call(self, path, app):
+        messages = [
+            {"type": "http.request", "body": b"", "more_body": False},
+            {"type": "http.disconnect"},
+        ]
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            pass
+
+        middleware = CancellationMiddleware(app, {"/analyze": 60})
+        anyio.run(middleware, {"type": "http", "path": path}, receive, send)
+
+    def test_disconnect_cancels_scope(self):
+        """Test that a client disconnect cancels the running request"""
+        seen = []
+
+        async def app(scope, receive, send):
+            await receive()
+            cancel = current_scope()
+            with anyio.fail_after(5):
+                while not cancel.cancelled:
+                    await anyio.sleep(0.01)
+            seen.append(cancel.remaining())
+
+        self._call("/analyze", app)
+
+        assert seen and 0 < seen[0] <= 60
+
+    def test_other_paths_pass_through(self):
+        """Test that endpoints without a deadline get no scope"""
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(current_scope())
+
+        self._call("/process/analyses", app)
+
+        assert seen == [None]
+
+
+class TestCancelledResponse:
+    """Tests for responses of cancelled analyses"""
+
+    @patch("src.api.organization_routes.analyze_performance")
+    def test_timeout_returns_504(self, mock_analyze):
+        """Test that an analysis past its deadline returns 504"""
+        mock_analyze.side_effect = AnalysisCancelledError("timeout", timed_out=True)
+
+        response = client.get("/organization/performance?process_type=order-to-cash")
+
+        assert response.status_code == 504
@@ -0,0 +1,157 @@
+"""Unit tests for cost estimation and admission control"""
+
+import json
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import pytest
+from src.main import app
+from src.services.analyze_service import _measured_process_analysis
+from src.services.cost_model import (
+    AnalysisTooLargeError,
+    CostCoefficients,
+    CostModel,
+    load_calibration,
+)
+
+client = TestClient(app)
+
+_MB = 1024 * 1024
+
+# 1 ms and 1 KB per event, 1 s and 1 MB base
+_COEFFICIENTS = {"process:in_memory": CostCoefficients(1, 1e-3, 0, _MB, 1024, 0)}
+
+
+class TestCostModel:
+    """Tests for CostModel"""
+
+    def test_linear_estimate(self):
+        """Test that estimates grow linearly with the preview counts"""
+        model = CostModel(_COEFFICIENTS)
+
+        estimate = model.estimate("process:in_memory", 1024 * 10, 100)
+
+        assert estimate.seconds == pytest.approx(1 + 10.24)
+        assert estimate.memory_mb == pytest.approx(11)
+
+    def test_measured_runs_correct_runtime(self):
+        """Test that slower measured runs raise later runtime estimates"""
+        model = CostModel(_COEFFICIENTS)
+        before = model.estimate("process:in_memory", 1000, 10).seconds
+
+        model.record("process:in_memory", 1000, 10, seconds=before * 3)
+
+        after = model.estimate("process:in_memory", 1000, 10).seconds
+        assert after == pytest.approx(before * (0.8 + 0.2 * 3))
+
+    @patch("src.services.cost_model.ANALYSIS_MEMORY_BUDGET_MB", 10)
+    def test_rejects_over_memory_budget(self):
+        """Test that analyses over the memory budget are rejected"""
+        model = CostModel(_COEFFICIENTS)
+
+        with pytest.raises(AnalysisTooLargeError) as exc_info:
+            model.admit("process:in_memory", 1024 * 10, 100)
+
+        assert exc_info.value.estimate.memory_mb == pytest.approx(11)
+
+    @patch("src.services.cost_model.ANALYSIS_SYNC_SECONDS_BUDGET", 5)
+    def test_slow_analyses_run_in_background(self):
+        """Test that analyses over the runtime budget become background jobs"""
+        model = CostModel(_COEFFICIENTS)
+
+        assert not model.admit("process:in_memory", 1000, 10).background
+        assert model.admit("process:in_memory", 10000, 10).background
+        assert model.admit("process:in_memory", 0, 0, background=True).background
+
+    def test_load_calibration(self, tmp_path):
+        """Test that measured coefficients override the defaults"""
+        path = tmp_path / "cost_model.json"
+        path.write_text(json.dumps({"organization": {"bytes_per_event": 2048}}))
+
+        coefficients = load_calibration(str(path))
+
+        assert coefficients["organization"].bytes_per_event == 2048
+        assert coefficients["organization"].seconds_base == 0.3
+
+    def test_load_calibration_unknown_analysis(self, tmp_path):
+        """Test that a calibration of an unknown analysis is rejected"""
+        path = tmp_path / "cost_model.json"
+        path.write_text(json.dumps({"unknown": {"bytes_per_event": 1}}))
+
+        with pytest.raises(ValueError):
+            load_calibration(str(path))
+
+
+class TestAdmissionRoutes:
+    """Tests for admission control of analysis endpoints"""
+
+    @patch("src.services.cost_model.ANALYSIS_MEMORY_BUDGET_MB", 10)
+    @patch(
+        "src.services.analyze_service.get_preview",
+        return_value={"event_count": 10**8, "case_count": 10**6},
+    )
+    def test_too_large_returns_413(self, _):
+        """Test that an analysis over the memory budget returns 413"""
+        response = client.post(
+            "/analyze", json={"analysis_name": "test", "process_type": "order-to-cash"}
+        )
+
+        assert response.status_code == 413
+        assert response.json()["estimate"]["memory_mb"] > 10
+
+    @patch("src.services.cost_model.ANALYSIS_SYNC_SECONDS_BUDGET", 0)
+    @patch("src.api.job_routes.job_runner")
+    def test_slow_analysis_queued_as_job(self, mock_runner):
+        """Test that a synchronous request over the runtime budget gets a job"""
+        mock_runner.submit.return_value = "job-1"
+
+        response = client.post(
+            "/organization/analyze",
+            json={"analysis_name": "test", "process_type": "order-to-cash"},
+        )
+
+        assert response.status_code == 202
+        assert response.json()["job_id"] == "job-1"
+        assert response.json()["estimate"]["seconds"] > 0
+
+    @patch("src.services.cost_model.ANALYSIS_MEMORY_BUDGET_MB", 10)
+    @patch(
+        "src.services.analyze_service.get_preview",
+        return_value={"event_count": 10**8, "case_count": 10**6},
+    )
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/lead-time-stats",
+            "/organization/handover",
+            "/organization/workload",
+            "/organization/performance",
+        ],
+    )
+    def test_interactive_endpoints_admitted(self, _, path):
+        """Test that the synchronous GET analyses apply the memory budget"""
+        response = client.get(f"{path}?process_type=order-to-cash")
+
+        assert response.status_code == 413
+
+    @patch(
+        "src.services.analyze_service.get_preview",
+        side_effect=RuntimeError("connection refused"),
+    )
+    def test_admission_error_handled_by_route(self, _):
+        """Test that a failing preview query gets the route's error response"""
+        response = client.post(
+            "/analyze", json={"analysis_name": "test", "process_type": "order-to-cash"}
+        )
+
+        assert response.status_code == 500
+        assert response.json()["detail"].startswith("分析処理エラー")
+
+    @patch("src.services.analyze_service.cost_model")
+    @patch("src.services.analyze_service.offload_timed")
+    def test_runtime_measured_in_worker(self, mock_offload_timed, mock_cost_model):
+        """Test that the recorded runtime is the one measured by the worker"""
+        mock_offload_timed.return_value = ({"event_count": 7, "case_count": 3}, 1.5)
+
+        _measured_process_analysis("order-to-cash", "all", None, None, "in_memory")
+
+        mock_cost_model.record.assert_called_once_with("process:in_memory", 7, 3, 1.5)
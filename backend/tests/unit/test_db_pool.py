@@ -0,0 +1,77 @@
+"""Unit tests for connection pool telemetry"""
+
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock
+import pytest
+from sqlalchemy import exc
+from src.main import app
+from src.db.pool import InstrumentedNullPool, InstrumentedQueuePool
+
+client = TestClient(app)
+
+
+class TestInstrumentedQueuePool:
+    """Tests for InstrumentedQueuePool"""
+
+    def test_checkouts_and_saturation(self):
+        """Test that checkouts are counted and saturation reflects usage"""
+        pool = InstrumentedQueuePool(MagicMock, pool_size=2, max_overflow=0)
+
+        first = pool.connect()
+        telemetry = pool.telemetry()
+        first.close()
+
+        assert telemetry["checkouts"] == 1
+        assert telemetry["checked_out"] == 1
+        assert telemetry["saturation"] == 0.5
+        assert sum(telemetry["wait_histogram"].values()) == 1
+
+    def test_timeout_counted(self):
+        """Test that checkouts timing out on an exhausted pool are counted"""
+        pool = InstrumentedQueuePool(
+            MagicMock, pool_size=1, max_overflow=0, timeout=0.01
+        )
+
+        held = pool.connect()
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+        telemetry = pool.telemetry()
+        held.close()
+
+        assert telemetry["timeouts"] == 1
+        assert telemetry["saturation"] == 1.0
+        assert telemetry["wait_seconds_max"] < 0.01
+
+    def test_recreate_keeps_stats(self):
+        """Test that statistics survive recreating the pool (e.g. dispose)"""
+        pool = InstrumentedQueuePool(MagicMock, pool_size=1, max_overflow=0)
+        pool.connect().close()
+
+        assert pool.recreate().telemetry()["checkouts"] == 1
+
+
+class TestInstrumentedNullPool:
+    """Tests for InstrumentedNullPool (PgBouncer mode)"""
+
+    def test_connect_times_recorded(self):
+        """Test that every checkout opens a connection and is timed"""
+        pool = InstrumentedNullPool(MagicMock)
+
+        pool.connect().close()
+        pool.connect().close()
+
+        telemetry = pool.telemetry()
+        assert telemetry["pool"] == "pgbouncer"
+        assert telemetry["checkouts"] == 2
+
+
+class TestPoolTelemetryEndpoint:
+    """Tests for GET /health/db-pool"""
+
+    def test_reports_pool(self):
+        """Test that the API reports the telemetry of its pool"""
+        response = client.get("/health/db-pool")
+
+        assert response.status_code == 200
+        assert response.json()["pool"] == "queue"
+        assert "saturation" in response.json()
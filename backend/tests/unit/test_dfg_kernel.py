@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import networkx as nx
+from src.models.event_log import ColumnarEventLog
+from src.analysis.dfg_kernel import (
+    directly_follows,
+    directly_follows_by_group,
+    find_transitions,
+)
+from src.analysis.performance_metrics import convert_dfg_to_react_flow
+
+
+def _log():
+    return ColumnarEventLog.from_dataframe(
+        pd.DataFrame(
+            {
+                "case_id": ["C1", "C1", "C1", "C2", "C2", "C3"],
+                "activity": ["A", "B", "A", "A", "B", "C"],
+                "timestamp": pd.to_datetime(
+                    [
+                        "2025-01-01 10:00",
+                        "2025-01-01 12:00",
+                        "2025-01-01 13:00",
+                        "2025-01-02 10:00",
+                        "2025-01-02 14:00",
+                        "2025-01-03 10:00",
+                    ]
+                ),
+            }
+        )
+    )
+
+
+def test_transitions_masked_at_case_boundaries():
+    """Test that no transition crosses from one case into the next."""
+    transitions = find_transitions(_log())
+
+    # C1: A->B, B->A / C2: A->B / C3: none
+    assert len(transitions.sources) == 3
+    assert list(transitions.waiting_time_hours) == [2.0, 1.0, 4.0]
+
+
+def test_directly_follows_counts():
+    """Test node/edge frequencies and waiting time sums and counts."""
+    counts = directly_follows(_log())
+
+    assert dict(counts.nodes()) == {"A": 3, "B": 2, "C": 1}
+    edges = {(s, t): (f, w) for s, t, f, w in counts.edges()}
+    assert edges == {("A", "B"): (2, 3.0), ("B", "A"): (1, 1.0)}
+    assert counts.waiting_time_sum.sum() == 7.0
+    assert counts.waiting_time_count.sum() == 3
+
+
+def test_react_flow_matches_networkx_conversion():
+    """Test that direct conversion equals the NetworkX-based conversion."""
+    counts = directly_follows(_log())
+
+    graph = counts.to_networkx()
+    assert isinstance(graph, nx.DiGraph)
+    assert counts.to_react_flow() == convert_dfg_to_react_flow(graph)
+
+
+def test_directly_follows_by_group():
+    """Test that grouped counts equal per-group logs and skip ungrouped cases."""
+    log = _log()
+    # C1 -> group 1, C2 -> group 0, C3 -> excluded
+    first, second = directly_follows_by_group(log, np.array([1, 0, -1]), 2)
+
+    assert dict(first.nodes()) == {"A": 1, "B": 1}
+    assert [e[:3] for e in first.edges()] == [("A", "B", 1)]
+    assert dict(second.nodes()) == {"A": 2, "B": 1}
+    assert {(s, t): w for s, t, _, w in second.edges()} == {
+        ("A", "B"): 2.0,
+        ("B", "A"): 1.0,
+    }
+
+
+def test_directly_follows_empty_log():
+    """Test the kernel on an empty log."""
+    log = ColumnarEventLog.from_dataframe(
+        pd.DataFrame(columns=["case_id", "activity", "timestamp"])
+    )
+    counts = directly_follows(log)
+
+    assert counts.to_react_flow() == {"nodes": [], "edges": []}
+    assert np.sum(counts.edge_frequency) == 0
@@ -0,0 +1,89 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from src.models.event_log import EventLog, ColumnarEventLog
+from src.analysis.dfg_discovery import discover_dfg
+from src.analysis.performance_metrics import calculate_performance_metrics
+
+
+def _sample_df():
+    return pd.DataFrame(
+        {
+            "case_id": ["C2", "C1", "C1", "C2", "C1"],
+            "activity": ["A", "B", "A", "B", "C"],
+            "timestamp": pd.to_datetime(
+                [
+                    "2025-01-02 10:00",
+                    "2025-01-01 11:00",
+                    "2025-01-01 10:00",
+                    "2025-01-02 14:00",
+                    "2025-01-01 12:00",
+                ]
+            ),
+            "resource": ["U1", "U2", "U1", None, "U2"],
+        }
+    )
+
+
+def test_from_dataframe_encodes_and_sorts():
+    """Test dictionary encoding and sorting by case and timestamp."""
+    log = ColumnarEventLog.from_dataframe(_sample_df())
+
+    assert len(log) == 5
+    assert log.case_count == 2
+    assert log.timestamps.dtype == np.int64
+    assert list(log.case_ids[log.case_codes]) == ["C2", "C2", "C1", "C1", "C1"]
+    assert list(log.activities[log.activity_codes]) == ["A", "B", "A", "B", "C"]
+    # Missing resources are encoded as -1
+    assert log.resource_codes[1] == -1
+    assert list(log.case_starts()) == [0, 2]
+    assert list(log.case_ends()) == [1, 4]
+
+
+def test_event_list_view_round_trip():
+    """Test that the EventLog view reproduces the original events."""
+    events = [
+        EventLog(
+            case_id="C1",
+            activity="A",
+            timestamp=datetime(2025, 1, 1, 10, 0),
+            resource="User1",
+        ),
+        EventLog(
+            case_id="C1",
+            activity="B",
+            timestamp=datetime(2025, 1, 1, 11, 30),
+            resource="User2",
+        ),
+    ]
+
+    log = ColumnarEventLog.from_events(events)
+
+    assert log.to_event_list() == events
+    assert ColumnarEventLog.coerce(log) is log
+
+
+def test_columnar_log_matches_event_list():
+    """Test that analysis results are identical for both representations."""
+    df = _sample_df().fillna("U3")
+    log = ColumnarEventLog.from_dataframe(df)
+    events = [EventLog(**row) for row in df.to_dict("records")]
+
+    dfg_columnar = calculate_performance_metrics(log, discover_dfg(log))
+    dfg_list = calculate_performance_metrics(events, discover_dfg(events))
+
+    assert dict(dfg_columnar.nodes(data=True)) == dict(dfg_list.nodes(data=True))
+    assert {(s, t): d for s, t, d in dfg_columnar.edges(data=True)} == {
+        (s, t): d for s, t, d in dfg_list.edges(data=True)
+    }
+    assert dfg_columnar.edges["A", "B"]["avg_waiting_time_hours"] == 2.5
+
+
+def test_empty_dataframe():
+    """Test conversion of an empty result set."""
+    df = pd.DataFrame(columns=["case_id", "activity", "timestamp", "resource"])
+    log = ColumnarEventLog.from_dataframe(df)
+
+    assert len(log) == 0
+    assert not log
+    assert discover_dfg(log).number_of_nodes() == 0
@@ -0,0 +1,165 @@
+"""Unit tests for background analysis jobs"""
+
+import threading
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import pytest
+from src.main import app
+from src.services.job_service import (
+    JobQueueFullError,
+    JobRunner,
+    fail_interrupted_jobs,
+    renew_job_leases,
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def job_updates():
+    """Record job rows in memory instead of analysis_jobs"""
+    updates = []
+    with patch("src.services.job_service._insert_job"), patch(
+        "src.services.job_service._update_job",
+        side_effect=lambda job_id, **values: updates.append(values),
+    ):
+        yield updates
+
+
+class TestJobRunner:
+    """Tests for JobRunner"""
+
+    def test_succeeded_job(self, job_updates):
+        """Test that progress and the analysis_id are recorded"""
+        runner = JobRunner(max_workers=1, max_queued=0)
+
+        def run(progress):
+            progress(0.5)
+            return "analysis-1"
+
+        runner.submit("process", {}, run)
+        runner._executor.shutdown(wait=True)
+
+        assert [u.get("status") for u in job_updates] == ["running", None, "succeeded"]
+        assert job_updates[1] == {"progress": 0.5}
+        assert job_updates[2]["analysis_id"] == "analysis-1"
+
+    def test_failed_job(self, job_updates):
+        """Test that the error of a failed job is recorded"""
+        runner = JobRunner(max_workers=1, max_queued=0)
+
+        def run(progress):
+            raise ValueError("指定された期間にイベントが見つかりません")
+
+        runner.submit("process", {}, run)
+        runner._executor.shutdown(wait=True)
+
+        assert job_updates[-1]["status"] == "failed"
+        assert job_updates[-1]["error"] == "指定された期間にイベントが見つかりません"
+
+    def test_queue_full(self, job_updates):
+        """Test that submissions beyond workers + queue are rejected"""
+        runner = JobRunner(max_workers=1, max_queued=1)
+        release = threading.Event()
+
+        def run(progress):
+            release.wait(timeout=5)
+            return "analysis-1"
+
+        runner.submit("process", {}, run)
+        runner.submit("process", {}, run)
+        with pytest.raises(JobQueueFullError):
+            runner.submit("process", {}, run)
+
+        release.set()
+        runner._executor.shutdown(wait=True)
+        # Finished jobs free their slots
+        assert runner._slots.acquire(blocking=False)
+        assert runner._slots.acquire(blocking=False)
+
+
+class TestJobLeases:
+    """Tests for job ownership and lease expiry"""
+
+    def test_job_recorded_with_owner(self, job_updates):
+        """Test that submitted jobs are owned by the submitting process"""
+        runner = JobRunner(max_workers=1, max_queued=0)
+
+        with patch("src.services.job_service._insert_job") as mock_insert:
+            runner.submit("process", {}, lambda progress: "analysis-1")
+        runner._executor.shutdown(wait=True)
+
+        assert mock_insert.call_args.args[3] == runner.owner
+
+    @patch("src.services.job_service.engine")
+    def test_only_expired_leases_failed(self, mock_engine):
+        """Test that jobs of live processes are not failed"""
+        conn = mock_engine.begin.return_value.__enter__.return_value
+        conn.execute.return_value.rowcount = 1
+
+        assert fail_interrupted_jobs(lease_seconds=60) == 1
+
+        query, params = conn.execute.call_args.args
+        assert "COALESCE(heartbeat_at, created_at) < :expired_before" in str(query)
+        assert params["finished_at"] - params["expired_before"] == timedelta(seconds=60)
+        assert params["expired_before"] < datetime.utcnow()
+
+    @patch("src.services.job_service.engine")
+    def test_leases_renewed_by_owner(self, mock_engine):
+        """Test that a process renews only the leases of its own jobs"""
+        conn = mock_engine.begin.return_value.__enter__.return_value
+
+        renew_job_leases("host:1:abc")
+
+        query, params = conn.execute.call_args.args
+        assert "owner = :owner" in str(query)
+        assert params["owner"] == "host:1:abc"
+
+
+class TestJobRoutes:
+    """Tests for background job endpoints"""
+
+    @patch("src.api.job_routes.job_runner")
+    def test_background_analyze(self, mock_runner):
+        """Test that background=true returns 202 with the job ID"""
+        mock_runner.submit.return_value = "job-1"
+
+        response = client.post(
+            "/organization/analyze?background=true",
+            json={"analysis_name": "test", "process_type": "order-to-cash"},
+        )
+
+        assert response.status_code == 202
+        assert response.json()["job_id"] == "job-1"
+        assert response.json()["status"] == "queued"
+        assert set(response.json()["estimate"]) == {"seconds", "memory_mb"}
+        assert response.headers["location"] == "/jobs/job-1"
+        assert mock_runner.submit.call_args.args[0] == "organization"
+
+    @patch("src.api.job_routes.job_runner")
+    def test_queue_full(self, mock_runner):
+        """Test that a full queue returns 503 with Retry-After"""
+        mock_runner.submit.side_effect = JobQueueFullError("full", retry_after=30)
+
+        response = client.post(
+            "/outcome/analyze?background=true",
+            json={
+                "analysis_name": "test",
+                "process_type": "order-to-cash",
+                "metric_name": "revenue",
+                "analysis_type": "path-outcome",
+            },
+        )
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "30"
+
+    @patch("src.api.job_routes.get_job")
+    def test_job_not_found(self, mock_get_job):
+        """Test that an unknown job returns 404"""
+        mock_get_job.return_value = None
+
+        response = client.get("/jobs/unknown")
+
+        assert response.status_code == 404
@@ -0,0 +1,81 @@
+"""Unit tests for offloading analyses to worker processes"""
+
+import math
+import threading
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import pytest
+from src.main import app
+from src.services.offload import (
+    ProcessOffloader,
+    ServerBusyError,
+    offload_timed,
+    wait_for_slots,
+)
+
+client = TestClient(app)
+
+
+class TestProcessOffloader:
+    """Tests for ProcessOffloader"""
+
+    def test_runs_in_worker_process(self):
+        """Test that the result of the worker is returned"""
+        offloader = ProcessOffloader(max_workers=1, max_queued=0)
+
+        assert offloader.run(math.factorial, 5) == 120
+
+    def test_rejects_when_full(self):
+        """Test that work beyond workers + queue is rejected immediately"""
+        offloader = ProcessOffloader(max_workers=1, max_queued=0)
+        started, release = threading.Event(), threading.Event()
+
+        def hold_slot():
+            # Occupy the only slot without starting a worker process
+            with patch.object(offloader, "_get_pool") as mock_pool:
+                mock_pool.return_value.submit.return_value.result.side_effect = (
+                    lambda timeout=None: started.set() or release.wait(timeout=5)
+                )
+                offloader.run(math.factorial, 5)
+
+        worker = threading.Thread(target=hold_slot)
+        worker.start()
+        started.wait(timeout=5)
+        try:
+            with pytest.raises(ServerBusyError) as exc_info:
+                offloader.run(math.factorial, 5)
+        finally:
+            release.set()
+            worker.join()
+
+        assert exc_info.value.retry_after > 0
+
+    def test_timed_in_worker(self):
+        """Test that offload_timed returns the result and the runtime"""
+        result, seconds = offload_timed(math.factorial, 5)
+
+        assert result == 120
+        assert seconds >= 0
+
+    def test_background_work_waits_for_slot(self):
+        """Test that work inside wait_for_slots queues instead of being rejected"""
+        offloader = ProcessOffloader(max_workers=1, max_queued=0)
+        assert offloader._slots.acquire(blocking=False)
+        threading.Timer(0.2, offloader._slots.release).start()
+
+        with wait_for_slots():
+            assert offloader.run(math.factorial, 5) == 120
+
+
+class TestServerBusyResponse:
+    """Tests for the 503 response of rejected work"""
+
+    @patch("src.api.organization_routes.analyze_handover")
+    def test_busy_returns_503(self, mock_analyze):
+        """Test that a full pool returns 503 with Retry-After"""
+        mock_analyze.side_effect = ServerBusyError("busy", retry_after=5)
+
+        response = client.get("/organization/handover?process_type=order-to-cash")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
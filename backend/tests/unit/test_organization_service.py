@@ -0,0 +1,181 @@
+"""Unit tests for organization service"""
+
+from datetime import datetime
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock, patch
+from src.services.cost_model import CostCoefficients, CostModel
+from src.services.organization_service import (
+    compute_handover,
+    compute_workload,
+    compute_performance,
+    create_organization_analysis,
+)
+
+
+def _org_df():
+    return pd.DataFrame(
+        {
+            "case_id": ["C1", "C1", "C1", "C2", "C2", "C2"],
+            "activity": ["A", "B", "C", "A", "B", "C"],
+            "timestamp": pd.to_datetime(
+                [
+                    "2025-01-01 10:00",
+                    "2025-01-01 12:00",
+                    "2025-01-01 13:00",
+                    "2025-01-02 10:00",
+                    "2025-01-02 14:00",
+                    "2025-01-02 15:00",
+                ]
+            ),
+            "resource": ["E1", "E2", "E2", "E1", "E3", "E2"],
+            "employee_id": ["E1", "E2", "E2", "E1", None, "E2"],
+            "employee_name": ["Alice", "Bob", "Bob", "Alice", None, "Bob"],
+            "role": ["R", "R", "R", "R", None, "R"],
+            "department_id": ["D1", "D2", "D2", "D1", None, "D2"],
+            "department_name": ["Sales", "Ops", "Ops", "Sales", None, "Ops"],
+            "department_type": ["T", "T", "T", "T", None, "T"],
+        }
+    )
+
+
+class TestComputeHandover:
+    """Tests for compute_handover function"""
+
+    def test_employee_level(self):
+        """Test handover counts and waiting time between employees"""
+        result = compute_handover(_org_df(), "employee")
+
+        assert {n["id"] for n in result["nodes"]} == {"E1", "E2"}
+        edges = {(e["source"], e["target"]): e for e in result["edges"]}
+        # C1: E1->E2 (2h), E2->E2 is not a handover; C2: E1->None, None->E2 skipped
+        assert list(edges) == [("E1", "E2")]
+        assert edges[("E1", "E2")]["handover_count"] == 1
+        assert edges[("E1", "E2")]["avg_waiting_time_hours"] == 2.0
+
+    def test_unordered_input(self):
+        """Test that handovers are computed per case regardless of row order"""
+        df = _org_df()
+        shuffled = df.iloc[[5, 0, 3, 2, 4, 1]]
+
+        assert (
+            compute_handover(shuffled, "department")["edges"]
+            == compute_handover(df, "department")["edges"]
+        )
+
+    def test_empty(self):
+        """Test handover with no events"""
+        result = compute_handover(_org_df().iloc[0:0], "department")
+
+        assert result == {"nodes": [], "edges": [], "aggregation_level": "department"}
+
+
+class TestComputeWorkloadAndPerformance:
+    """Tests for compute_workload / compute_performance functions"""
+
+    def test_workload(self):
+        """Test activity and case counts per employee"""
+        result = compute_workload(_org_df(), "employee")
+
+        workload = {w["resource_id"]: w for w in result["workload"]}
+        assert workload["E2"]["activity_count"] == 3
+        assert workload["E2"]["case_count"] == 2
+        assert workload["E1"]["activity_count"] == 2
+
+    def test_performance(self):
+        """Test duration attribution to the resource of the current activity"""
+        result = compute_performance(_org_df(), "department")
+
+        performance = {p["resource_id"]: p for p in result["performance"]}
+        # D1: 2h (C1) + 4h (C2); D2: 1h (C1)
+        assert performance["D1"]["avg_duration_hours"] == 3.0
+        assert performance["D1"]["total_duration_hours"] == 6.0
+        assert performance["D1"]["activity_count"] == 2
+        assert performance["D2"]["median_duration_hours"] == 1.0
+
+
+class TestCreateOrganizationAnalysis:
+    """Tests for create_organization_analysis function"""
+
+    @patch("src.services.organization_service.engine")
+    @patch("src.services.organization_service.load_event_log_with_organization")
+    def test_single_extraction(self, mock_load, mock_engine):
+        """Test that all three analyses share one database extraction"""
+        mock_load.return_value = _org_df()
+        conn = MagicMock()
+        conn.execute.return_value.fetchone.return_value = (
+            "id-1",
+            datetime(2025, 1, 1),
+        )
+        mock_engine.connect.return_value.__enter__.return_value = conn
+
+        result = create_organization_analysis("test", "order-to-cash")
+
+        assert mock_load.call_count == 1
+        assert result["analysis_id"] == "id-1"
+        assert result["node_count"] == 2
+        assert result["resource_count"] == 2
+
+    @patch("src.services.organization_service.engine")
+    @patch("src.services.organization_service._sort_by_case")
+    @patch("src.services.organization_service.load_event_log_with_organization")
+    def test_single_sort(self, mock_load, mock_sort, mock_engine):
+        """Test that handover and performance share one case/timestamp sort"""
+        mock_load.return_value = _org_df()
+        mock_sort.side_effect = lambda df: df
+        conn = MagicMock()
+        conn.execute.return_value.fetchone.return_value = ("id-1", datetime(2025, 1, 1))
+        mock_engine.connect.return_value.__enter__.return_value = conn
+
+        create_organization_analysis("test", "order-to-cash")
+
+        assert mock_sort.call_count == 1
+
+    @patch("src.services.organization_service.engine")
+    @patch("src.services.organization_service.load_event_log_with_organization")
+    def test_filter_dates_stored_in_utc(self, mock_load, mock_engine):
+        """Test that the stored dates are the (UTC) bounds the log was filtered by"""
+        mock_load.return_value = _org_df()
+        conn = MagicMock()
+        conn.execute.return_value.fetchone.return_value = ("id-1", datetime(2025, 1, 1))
+        mock_engine.connect.return_value.__enter__.return_value = conn
+
+        create_organization_analysis(
+            "test",
+            "order-to-cash",
+            filter_mode="case_start",
+            date_from="2025-01-01T09:00:00+09:00",
+            date_to="2025/01/31",
+        )
+
+        filtered = mock_load.call_args[0][2:]
+        stored = conn.execute.call_args[0][1]
+        assert filtered == (datetime(2025, 1, 1), datetime(2025, 1, 31))
+        assert (stored["date_from"], stored["date_to"]) == filtered
+
+    @patch("src.services.organization_service.engine")
+    @patch("src.services.organization_service.load_event_log_with_organization")
+    def test_runtime_recorded(self, mock_load, mock_engine):
+        """Test that a computed analysis corrects the organization estimate"""
+        mock_load.return_value = _org_df()
+        conn = MagicMock()
+        conn.execute.return_value.fetchone.return_value = ("id-1", datetime(2025, 1, 1))
+        mock_engine.connect.return_value.__enter__.return_value = conn
+        # 100 s per event: the measured run is far faster than estimated
+        model = CostModel({"organization": CostCoefficients(0, 100, 0, 0, 0, 0)})
+        before = model.estimate("organization", 6, 2).seconds
+
+        with patch("src.services.organization_service.cost_model", model):
+            create_organization_analysis("test", "order-to-cash")
+
+        assert model.estimate("organization", 6, 2).seconds < before
+
+    @patch("src.services.organization_service.load_event_log_with_organization")
+    def test_invalid_filter_date(self, mock_load):
+        """Test that an unparseable date is rejected before computing"""
+        with pytest.raises(ValueError):
+            create_organization_analysis(
+                "test", "order-to-cash", filter_mode="case_end", date_from="soon"
+            )
+
+        mock_load.assert_not_called()
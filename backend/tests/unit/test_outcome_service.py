@@ -100,6 +100,45 @@ class TestAnalyzePathOutcome:
         assert len(result["nodes"]) > 0
         assert len(result["edges"]) > 0
 
+    @patch("src.services.outcome_service.pd.read_sql")
+    def test_analyze_path_outcome_edge_stats(self, mock_read_sql):
+        """Test per-edge outcome statistics joined by case"""
+        mock_db = Mock()
+        mock_db.bind = Mock()
+
+        events_df = pd.DataFrame(
+            {
+                "case_id": ["CASE-001"] * 3 + ["CASE-002"] * 2 + ["CASE-003"] * 2,
+                "activity": ["A", "B", "B", "A", "C", "A", "C"],
+                "timestamp": pd.date_range("2025-01-01", periods=7, freq="h"),
+            }
+        )
+        # CASE-003 has no outcome
+        outcomes_df = pd.DataFrame(
+            {"case_id": ["CASE-001", "CASE-002"], "metric_value": [1000.0, 4000.0]}
+        )
+
+        def read_sql_side_effect(query, *args, **kwargs):
+            if "fct_event_log" in str(query):
+                return events_df
+            else:
+                return outcomes_df
+
+        mock_read_sql.side_effect = read_sql_side_effect
+
+        result = analyze_path_outcome(mock_db, "order-to-cash", "revenue", None)
+
+        edges = {(e["source"], e["target"]): e["data"] for e in result["edges"]}
+        ac_stats = edges[("A", "C")]["outcome_stats"]["revenue"]
+        assert edges[("A", "C")]["frequency"] == 2
+        assert ac_stats["avg"] == 4000.0
+        assert ac_stats["count"] == 1
+        assert edges[("B", "B")]["outcome_stats"]["revenue"]["total"] == 1000.0
+        assert result["summary"]["total_cases"] == 3
+        assert result["summary"]["top_paths"] == [
+            {"source": "A", "target": "C", "avg_outcome": 4000.0}
+        ]
+
     @patch("src.services.outcome_service.pd.read_sql")
     def test_analyze_path_outcome_with_date_filter(self, mock_read_sql):
         """Test path outcome analysis with date filter"""
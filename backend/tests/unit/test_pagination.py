@@ -0,0 +1,101 @@
+"""Unit tests for keyset pagination of analysis lists"""
+
+from datetime import datetime
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import pytest
+from src.main import app
+from src.api.pagination import decode_cursor, encode_cursor
+
+client = TestClient(app)
+
+ANALYSIS_IDS = [
+    "00000000-0000-0000-0000-000000000003",
+    "00000000-0000-0000-0000-000000000002",
+    "00000000-0000-0000-0000-000000000001",
+]
+
+
+def _summaries():
+    return [
+        {
+            "analysis_id": analysis_id,
+            "analysis_name": f"Analysis {i}",
+            "process_type": "order-to-cash",
+            "metric_name": "revenue",
+            "analysis_type": "path-outcome",
+            "created_at": datetime(2025, 10, 5 - i),
+        }
+        for i, analysis_id in enumerate(ANALYSIS_IDS)
+    ]
+
+
+class TestCursor:
+    """Tests for cursor encoding"""
+
+    def test_round_trip(self):
+        """Test that a cursor decodes to the encoded position"""
+        created_at = datetime(2025, 10, 5, 12, 30, 15, 123456)
+
+        cursor = encode_cursor(created_at, ANALYSIS_IDS[0])
+
+        assert decode_cursor(cursor) == (created_at, ANALYSIS_IDS[0])
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("x", "y")])
+    def test_invalid_cursor(self, cursor):
+        """Test that malformed cursors are rejected"""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestListPagination:
+    """Tests for paginated list endpoints"""
+
+    @patch("src.services.outcome_service.get_outcome_analyses")
+    def test_next_cursor_header(self, mock_get_analyses):
+        """Test that a full page is trimmed and points to its last row"""
+        mock_get_analyses.return_value = _summaries()
+
+        response = client.get("/outcome/analyses?limit=2")
+
+        assert response.status_code == 200
+        assert [a["analysis_id"] for a in response.json()] == ANALYSIS_IDS[:2]
+        assert decode_cursor(response.headers["x-next-cursor"]) == (
+            datetime(2025, 10, 4),
+            ANALYSIS_IDS[1],
+        )
+        assert mock_get_analyses.call_args.kwargs["limit"] == 3
+
+    @patch("src.services.outcome_service.get_outcome_analyses")
+    def test_last_page(self, mock_get_analyses):
+        """Test that the last page has no next cursor"""
+        mock_get_analyses.return_value = _summaries()[2:]
+        cursor = encode_cursor(datetime(2025, 10, 4), ANALYSIS_IDS[1])
+
+        response = client.get(f"/outcome/analyses?limit=2&cursor={cursor}")
+
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+        assert "x-next-cursor" not in response.headers
+        assert mock_get_analyses.call_args.kwargs["after"] == (
+            datetime(2025, 10, 4),
+            ANALYSIS_IDS[1],
+        )
+
+    @patch("src.services.outcome_service.get_outcome_analyses")
+    def test_without_limit_returns_all(self, mock_get_analyses):
+        """Test that clients not passing limit still get the whole list"""
+        mock_get_analyses.return_value = _summaries()
+
+        response = client.get("/outcome/analyses")
+
+        assert response.status_code == 200
+        assert len(response.json()) == 3
+        assert "x-next-cursor" not in response.headers
+        assert mock_get_analyses.call_args.kwargs["limit"] is None
+
+    def test_invalid_cursor_rejected(self):
+        """Test that an invalid cursor returns 400"""
+        response = client.get("/organization/analyses?cursor=invalid")
+
+        assert response.status_code == 400
@@ -0,0 +1,98 @@
+"""Unit tests for the parallel map-reduce aggregation"""
+
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from src.models.event_log import ColumnarEventLog
+from src.analysis.dfg_kernel import directly_follows
+from src.analysis.parallel import (
+    count_transitions_sparse,
+    merge_transition_counts,
+    parallel_directly_follows,
+)
+from src.services.organization_service import compute_handover
+
+
+def _log(n_events=700, events_per_case=7):
+    rng = np.random.default_rng(0)
+    return ColumnarEventLog.from_dataframe(
+        pd.DataFrame(
+            {
+                "case_id": [f"C{i // events_per_case:04d}" for i in range(n_events)],
+                "activity": rng.choice(list("ABCDE"), n_events),
+                "timestamp": pd.Timestamp("2025-01-01")
+                + pd.to_timedelta(rng.integers(0, 48, n_events).cumsum(), unit="h"),
+            }
+        )
+    )
+
+
+def _org_df():
+    log = _log(n_events=70)
+    df = log.to_dataframe()
+    employees = np.array(["E1", "E2", "E3", None], dtype=object)
+    df["employee_id"] = np.random.default_rng(1).choice(employees, len(df))
+    df["employee_name"] = df["employee_id"].str.lower()
+    return df
+
+
+class TestMergeTransitionCounts:
+    """Tests for merging partial aggregates"""
+
+    def test_partitions_merge_to_single_pass(self):
+        """Test that merged partition counts equal one pass over the log"""
+        log = _log()
+        n = len(log.activities)
+        partitions = log.case_codes % 3
+        parts = []
+        for p in range(3):
+            positions = np.flatnonzero(partitions == p)
+            parts.append(
+                count_transitions_sparse(
+                    log.case_codes[positions],
+                    log.activity_codes[positions],
+                    log.timestamps[positions],
+                    positions,
+                    n,
+                )
+            )
+        whole = count_transitions_sparse(
+            log.case_codes,
+            log.activity_codes,
+            log.timestamps,
+            np.arange(len(log)),
+            n,
+        )
+
+        merged = merge_transition_counts(parts)
+
+        assert np.array_equal(merged.node_frequency, whole.node_frequency)
+        assert np.array_equal(merged.edge_keys, whole.edge_keys)
+        assert np.array_equal(merged.edge_frequency, whole.edge_frequency)
+        assert np.array_equal(merged.first_seen, whole.first_seen)
+        assert np.allclose(merged.waiting_time_sum, whole.waiting_time_sum)
+
+
+@patch("src.analysis.parallel.PARALLEL_MIN_EVENTS", 0)
+class TestParallelExecution:
+    """Tests for aggregation in worker processes"""
+
+    def test_directly_follows(self):
+        """Test that the parallel DFG equals the single-pass DFG"""
+        log = _log()
+
+        expected = directly_follows(log)
+        result = parallel_directly_follows(log, workers=2)
+
+        assert np.array_equal(result.node_frequency, expected.node_frequency)
+        assert np.array_equal(result.edge_frequency, expected.edge_frequency)
+        assert np.allclose(result.waiting_time_sum, expected.waiting_time_sum)
+        assert result.to_react_flow() == expected.to_react_flow()
+
+    @patch("src.analysis.parallel.PARALLEL_WORKERS", 2)
+    def test_handover(self):
+        """Test that parallel handover counts equal the in-memory ones"""
+        expected = compute_handover(_org_df(), "employee")
+        result = compute_handover(_org_df(), "employee", execution_mode="parallel")
+
+        assert result == expected
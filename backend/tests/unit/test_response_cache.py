@@ -0,0 +1,121 @@
+"""Unit tests for the stored result response cache"""
+
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from src.main import app
+from src.api.response_cache import CachedBody, ResponseCache
+from src.models.outcome import OutcomeAnalysisDetail
+from src.services.result_storage import (
+    StoredBody,
+    decode_result,
+    dump_json,
+    encode_result,
+)
+
+client = TestClient(app)
+
+
+def _analysis():
+    return {
+        "analysis_id": "test-id-1",
+        "analysis_name": "Test Analysis",
+        "process_type": "order-to-cash",
+        "metric_name": "revenue",
+        "analysis_type": "path-outcome",
+        "created_at": "2025-10-05T00:00:00",
+        "result_data": {"nodes": [], "edges": [], "summary": {}},
+    }
+
+
+class TestConditionalGet:
+    """Tests for ETag / If-None-Match on stored analyses"""
+
+    @patch("src.services.outcome_service.get_outcome_analysis_by_id")
+    def test_body_cached_and_revalidated(self, mock_get_analysis):
+        """Test that repeated and conditional requests skip the database"""
+        mock_get_analysis.return_value = _analysis()
+
+        first = client.get("/outcome/analyses/test-id-1")
+        second = client.get("/outcome/analyses/test-id-1")
+        etag = first.headers["etag"]
+        not_modified = client.get(
+            "/outcome/analyses/test-id-1", headers={"If-None-Match": etag}
+        )
+
+        assert mock_get_analysis.call_count == 1
+        assert first.status_code == second.status_code == 200
+        assert first.json()["created_at"] == "2025-10-05T00:00:00"
+        assert second.content == first.content
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+        assert not_modified.content == b""
+
+    @patch("src.services.outcome_service.get_outcome_analysis_by_id")
+    def test_stale_etag_returns_body(self, mock_get_analysis):
+        """Test that a non-matching ETag gets the full body"""
+        mock_get_analysis.return_value = _analysis()
+
+        response = client.get(
+            "/outcome/analyses/test-id-1", headers={"If-None-Match": '"other"'}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["analysis_id"] == "test-id-1"
+
+
+class TestResponseCache:
+    """Tests for ResponseCache bounds"""
+
+    def test_memory_budget(self):
+        """Test that least recently used bodies are evicted to fit the budget"""
+        cache = ResponseCache(max_entries=10, max_bytes=10)
+        cache.put("a", CachedBody(b"1234", '"a"'))
+        cache.put("b", CachedBody(b"1234", '"b"'))
+        cache.get("a")
+        cache.put("c", CachedBody(b"1234", '"c"'))
+        cache.put("huge", CachedBody(b"x" * 11, '"huge"'))
+
+        assert cache.get("b") is None
+        assert cache.get("huge") is None
+        assert cache.get("a") is not None
+        assert cache.size == 8
+
+
+class TestCompressedStorage:
+    """Tests for gzip-compressed stored bodies"""
+
+    @patch("src.services.result_storage.RESULT_STORAGE_FORMAT", "gzip")
+    def test_round_trip(self):
+        """Test that the stored body is the compressed response body"""
+        detail = OutcomeAnalysisDetail.model_validate(_analysis())
+
+        stored = encode_result(detail)
+
+        assert len(stored) < len(dump_json(detail))
+        assert decode_result(stored) == detail.model_dump(mode="json")
+
+    def test_jsonb_format_stores_no_body(self):
+        """Test that the default format keeps results in JSONB"""
+        assert encode_result(_analysis()) is None
+
+    @patch("src.services.result_storage.RESULT_STORAGE_FORMAT", "gzip")
+    @patch("src.services.outcome_service.get_outcome_analysis_by_id")
+    def test_served_precompressed(self, mock_get_analysis):
+        """Test that stored bytes are sent as-is to clients accepting gzip"""
+        detail = OutcomeAnalysisDetail.model_validate(_analysis())
+        mock_get_analysis.return_value = StoredBody(encode_result(detail))
+
+        compressed = client.get(
+            "/outcome/analyses/test-id-1", headers={"Accept-Encoding": "gzip"}
+        )
+        identity = client.get(
+            "/outcome/analyses/test-id-1", headers={"Accept-Encoding": "identity"}
+        )
+
+        assert mock_get_analysis.call_count == 1
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.headers["vary"] == "Accept-Encoding"
+        assert compressed.json() == detail.model_dump(mode="json")
+        assert "content-encoding" not in identity.headers
+        assert identity.content == dump_json(detail)
+        assert identity.headers["etag"] != compressed.headers["etag"]
@@ -0,0 +1,130 @@
+"""Unit tests for the analysis result cache"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+import pytest
+from src.services.result_cache import ResultCache, _wait_for
+
+
+class TestResultCache:
+    """Tests for ResultCache"""
+
+    @patch("src.services.result_cache.get_data_version", return_value="run-1")
+    def test_hit_returns_copy(self, _):
+        """Test that a hit skips computation and returns an independent copy"""
+        cache = ResultCache()
+        compute = Mock(return_value={"nodes": [1]})
+
+        first, first_hit = cache.get_or_compute("process", {"a": 1}, compute)
+        first["nodes"].append(2)
+        second, second_hit = cache.get_or_compute("process", {"a": 1}, compute)
+
+        assert (first_hit, second_hit) == (False, True)
+        assert compute.call_count == 1
+        assert second == {"nodes": [1]}
+
+    @patch("src.services.result_cache.get_data_version")
+    def test_new_data_version_invalidates(self, mock_version):
+        """Test that a dbt run makes older entries unreachable and evicts them"""
+        cache = ResultCache()
+        compute = Mock(side_effect=["old", "new"])
+
+        mock_version.return_value = "run-1"
+        cache.get_or_compute("preview", {"a": 1}, compute)
+        cache.clear()  # forget the remembered version
+        mock_version.return_value = "run-2"
+        result, hit = cache.get_or_compute("preview", {"a": 1}, compute)
+
+        assert (result, hit) == ("new", False)
+        assert len(cache._entries) == 1
+
+    def test_no_data_version_disables_cache(self):
+        """Test that nothing is cached before a dbt run is recorded"""
+        cache = ResultCache()
+        compute = Mock(return_value="result")
+
+        cache.get_or_compute("preview", {"a": 1}, compute)
+        _, hit = cache.get_or_compute("preview", {"a": 1}, compute)
+
+        assert not hit
+        assert compute.call_count == 2
+
+    @patch("src.services.result_cache.get_data_version", return_value="run-1")
+    def test_least_recently_used_entry_evicted(self, _):
+        """Test the entry limit"""
+        cache = ResultCache(max_entries=2)
+        for key in [1, 2, 1, 3]:
+            cache.get_or_compute("preview", {"key": key}, lambda key=key: key)
+
+        assert cache.get_or_compute("preview", {"key": 1}, Mock())[1]
+        assert not cache.get_or_compute("preview", {"key": 2}, Mock(return_value=2))[1]
+
+    @patch("src.services.result_cache.get_data_version", return_value="run-1")
+    def test_memory_budget(self, _):
+        """Test that entries are evicted to keep the pickled size in the budget"""
+        cache = ResultCache(max_bytes=1500)
+        cache.get_or_compute("process", {"key": 1}, lambda: "x" * 1000)
+        cache.get_or_compute("process", {"key": 2}, lambda: "y" * 1000)
+        cache.get_or_compute("process", {"key": 3}, lambda: "z" * 2000)
+
+        assert list(cache._entries) == [("run-1", "process", '{"key": 2}')]
+        assert 1000 < cache.size <= 1500
+
+
+class TestSingleFlight:
+    """Tests for coalescing identical concurrent computations"""
+
+    def _run_concurrently(self, cache, compute, n_requests=4):
+        """Run n identical requests; the first computes once all others wait for it"""
+        started = threading.Event()
+        # The computation and every waiting duplicate meet here
+        all_waiting = threading.Barrier(n_requests, timeout=5)
+
+        def blocking_compute():
+            started.set()
+            all_waiting.wait()
+            return compute()
+
+        def wait_for(flight):
+            all_waiting.wait()
+            return _wait_for(flight)
+
+        with patch(
+            "src.services.result_cache._wait_for", side_effect=wait_for
+        ), ThreadPoolExecutor(max_workers=n_requests) as executor:
+            first = executor.submit(
+                cache.get_or_compute, "lead_time", {"a": 1}, blocking_compute
+            )
+            started.wait(timeout=5)
+            others = [
+                executor.submit(cache.get_or_compute, "lead_time", {"a": 1}, compute)
+                for _ in range(n_requests - 1)
+            ]
+            return [first] + others
+
+    def test_duplicates_share_one_computation(self):
+        """Test that concurrent duplicates wait for the computation in flight"""
+        cache = ResultCache()
+        compute = Mock(return_value={"case_count": 3})
+
+        futures = self._run_concurrently(cache, compute)
+        results = [future.result() for future in futures]
+
+        assert compute.call_count == 1
+        assert results[0] == ({"case_count": 3}, False)
+        assert all(result == ({"case_count": 3}, True) for result in results[1:])
+        assert not cache._in_flight
+
+    def test_error_shared_with_waiting_requests(self):
+        """Test that a failed computation fails every waiting request"""
+        cache = ResultCache()
+        compute = Mock(side_effect=ValueError("指定された期間にイベントが見つかりません"))
+
+        futures = self._run_concurrently(cache, compute)
+
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+        assert compute.call_count == 1
+        assert not cache._in_flight
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+from src.models.event_log import ColumnarEventLog
+from src.analysis.dfg_kernel import directly_follows
+from src.analysis.streaming import StreamingLogAggregator
+
+
+def _events_df():
+    return pd.DataFrame(
+        {
+            "case_id": ["C1", "C1", "C1", "C2", "C2", "C3", "C4", "C4"],
+            "activity": ["A", "B", "C", "A", "B", "A", "D", "A"],
+            "timestamp": pd.to_datetime(
+                [
+                    "2025-01-01 10:00",
+                    "2025-01-01 12:00",
+                    "2025-01-01 13:00",
+                    "2025-01-02 10:00",
+                    "2025-01-02 14:00",
+                    "2025-01-03 10:00",
+                    "2025-01-04 10:00",
+                    "2025-01-04 16:00",
+                ]
+            ),
+        }
+    )
+
+
+def _stream(df, chunksize):
+    aggregator = StreamingLogAggregator()
+    for start in range(0, len(df), chunksize):
+        aggregator.add_chunk(df.iloc[start : start + chunksize])
+    aggregator.finish()
+    return aggregator
+
+
+def test_chunked_result_matches_in_memory():
+    """Test that every chunk size gives the in-memory DFG and lead times."""
+    df = _events_df()
+    expected = directly_follows(ColumnarEventLog.from_dataframe(df))
+
+    for chunksize in [1, 2, 3, 5, len(df)]:
+        aggregator = _stream(df, chunksize)
+        counts = aggregator.dfg_counts()
+
+        assert counts.to_react_flow() == expected.to_react_flow()
+        assert aggregator.event_count == 8
+        assert aggregator.case_count == 4
+        assert list(aggregator.case_lead_times()) == [3.0, 4.0, 0.0, 6.0]
+
+
+def test_variants_across_chunk_boundaries():
+    """Test that a case split over chunks is one variant."""
+    df = pd.concat([_events_df().iloc[:3], _events_df().iloc[:3].assign(case_id="C9")])
+    aggregator = _stream(df, 2)
+
+    assert list(aggregator.case_variants()) == [0, 0]
+    assert aggregator.variant_path(0) == ["A", "B", "C"]
+
+
+def test_empty_stream():
+    """Test finishing without any rows."""
+    aggregator = StreamingLogAggregator()
+    aggregator.finish()
+
+    assert aggregator.event_count == 0
+    assert aggregator.case_count == 0
+    assert aggregator.dfg_counts().to_react_flow() == {"nodes": [], "edges": []}
+    assert np.sum(aggregator.dfg_counts().edge_frequency) == 0
@@ -0,0 +1,56 @@
+import pandas as pd
+from src.models.event_log import ColumnarEventLog
+from src.analysis.variants import VariantIndex
+
+
+def _log():
+    return ColumnarEventLog.from_dataframe(
+        pd.DataFrame(
+            {
+                "case_id": ["C1", "C1", "C2", "C2", "C2", "C3", "C3", "C4", "C4", "C4"],
+                "activity": ["A", "B", "A", "C", "B", "A", "B", "A", "C", "B"],
+                "timestamp": pd.to_datetime(
+                    [
+                        "2025-01-01 10:00",
+                        "2025-01-01 11:00",
+                        "2025-01-02 10:00",
+                        "2025-01-02 11:00",
+                        "2025-01-02 12:00",
+                        "2025-01-03 10:00",
+                        "2025-01-03 11:00",
+                        "2025-01-04 10:00",
+                        "2025-01-04 11:00",
+                        "2025-01-04 12:00",
+                    ]
+                ),
+            }
+        )
+    )
+
+
+def test_cases_grouped_by_variant():
+    """Test variant ids, counts and case lists."""
+    log = _log()
+    variants = VariantIndex.from_log(log)
+
+    assert len(variants) == 2
+    assert list(variants.case_variants) == [0, 1, 0, 1]
+    assert list(variants.counts) == [2, 2]
+    assert list(log.activities[variants.traces[1]]) == ["A", "C", "B"]
+    assert list(log.case_ids[variants.case_codes(1)]) == ["C2", "C4"]
+
+
+def test_most_frequent_prefers_first_variant_on_ties():
+    """Test that ties are broken by first appearance."""
+    assert VariantIndex.from_log(_log()).most_frequent() == 0
+
+
+def test_empty_log():
+    """Test the variant index of an empty log."""
+    log = ColumnarEventLog.from_dataframe(
+        pd.DataFrame(columns=["case_id", "activity", "timestamp"])
+    )
+    variants = VariantIndex.from_log(log)
+
+    assert len(variants) == 0
+    assert variants.case_variants.shape == (0,)
@@ -0,0 +1,16 @@
+{% macro record_dbt_run() %}
+-- Records every dbt invocation that may change the marts.
+-- The API uses the latest invocation_id as data version of its result cache.
+{% if flags.WHICH in ('run', 'build', 'seed', 'snapshot') %}
+    CREATE TABLE IF NOT EXISTS public.dbt_run_log (
+        invocation_id VARCHAR(64) PRIMARY KEY,
+        command VARCHAR(20) NOT NULL,
+        finished_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    INSERT INTO public.dbt_run_log (invocation_id, command)
+    VALUES ('{{ invocation_id }}', '{{ flags.WHICH }}')
+    ON CONFLICT (invocation_id) DO NOTHING;
+{% else %}
+    SELECT 1;
+{% endif %}
+{% endmacro %}
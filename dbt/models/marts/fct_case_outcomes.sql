@@ -1,5 +1,17 @@
 -- 全プロセスタイプの成果データを統合
-{{ config(materialized='table') }}
+-- インクリメンタル: 未取り込み、または値が変わった行のみを (process_type, case_id, metric_name) 単位で置き換える
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['process_type', 'case_id', 'metric_name'],
+        post_hook=[
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_fct_case_outcomes_key ON {{ this }} (process_type, case_id, metric_name)"
+        ]
+    )
+}}
+
+WITH outcomes AS (
 
 SELECT
     process_type,
@@ -58,3 +70,24 @@ SELECT
     metric_value::numeric,
     metric_unit
 FROM {{ ref('outcome_system_development_2024') }}
+
+)
+
+SELECT
+    process_type,
+    case_id,
+    metric_name,
+    metric_value,
+    metric_unit
+FROM outcomes s
+{% if is_incremental() %}
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM {{ this }} t
+    WHERE t.process_type = s.process_type
+      AND t.case_id = s.case_id
+      AND t.metric_name = s.metric_name
+      AND t.metric_value IS NOT DISTINCT FROM s.metric_value
+      AND t.metric_unit IS NOT DISTINCT FROM s.metric_unit
+)
+{% endif %}
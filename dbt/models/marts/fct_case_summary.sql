@@ -0,0 +1,30 @@
+-- Fact table: Case Summary
+-- One row per case with start, end, lead time, event count, activity count and trace
+-- Used by the API for case_start / case_end filtering, preview and lead time statistics
+-- (trace lets execution_mode=mart find the happy path without reading events)
+{{
+    config(
+        materialized='table',
+        post_hook=[
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_case_summary_key ON {{ this }} (process_type, case_id)",
+            "CREATE INDEX IF NOT EXISTS idx_case_summary_start ON {{ this }} (process_type, case_start_at) INCLUDE (case_id)",
+            "CREATE INDEX IF NOT EXISTS idx_case_summary_end ON {{ this }} (process_type, case_end_at) INCLUDE (case_id)"
+        ]
+    )
+}}
+
+SELECT
+    process_type,
+    case_id,
+    MIN(timestamp) AS case_start_at,
+    MAX(timestamp) AS case_end_at,
+    EXTRACT(EPOCH FROM MAX(timestamp) - MIN(timestamp))::float8 / 3600.0 AS lead_time_hours,
+    COUNT(*) AS event_count,
+    COUNT(DISTINCT activity) AS activity_count,
+    -- Activities in timestamp order, separated by CHR(31) (unit separator)
+    STRING_AGG(activity, CHR(31) ORDER BY timestamp) AS trace
+FROM
+    {{ ref('fct_event_log') }}
+GROUP BY
+    process_type,
+    case_id
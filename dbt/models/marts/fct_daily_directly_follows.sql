@@ -0,0 +1,52 @@
+-- Fact table: Daily Directly-Follows
+-- Directly-follows relation pre-aggregated per process type, case start day and case end day
+-- One row per (source_activity, target_activity); target_activity is NULL for the last event of a case,
+-- so summing frequency over a source_activity gives its node frequency
+{{
+    config(
+        materialized='table',
+        post_hook=[
+            "CREATE INDEX IF NOT EXISTS idx_daily_dfg_case_start ON {{ this }} (process_type, case_start_date)",
+            "CREATE INDEX IF NOT EXISTS idx_daily_dfg_case_end ON {{ this }} (process_type, case_end_date)"
+        ]
+    )
+}}
+
+WITH ordered_events AS (
+    SELECT
+        process_type,
+        activity,
+        LEAD(activity) OVER w AS next_activity,
+        EXTRACT(EPOCH FROM LEAD(timestamp) OVER w - timestamp)::float8 / 3600.0 AS waiting_time_hours,
+        MIN(timestamp) OVER (PARTITION BY process_type, case_id) AS case_start_at,
+        MAX(timestamp) OVER (PARTITION BY process_type, case_id) AS case_end_at,
+        -- Event order of the analysis query (ORDER BY case_id, timestamp); used to order activities
+        ROW_NUMBER() OVER (PARTITION BY process_type ORDER BY case_id, timestamp) AS event_order
+    FROM
+        {{ ref('fct_event_log') }}
+    WINDOW w AS (PARTITION BY process_type, case_id ORDER BY timestamp)
+)
+
+SELECT
+    process_type,
+    case_start_at::date AS case_start_date,
+    -- Cases starting exactly at 00:00 still match "BETWEEN date_from AND date_to" on their start day
+    case_start_at = case_start_at::date AS case_start_at_midnight,
+    case_end_at::date AS case_end_date,
+    case_end_at = case_end_at::date AS case_end_at_midnight,
+    activity AS source_activity,
+    next_activity AS target_activity,
+    COUNT(*) AS frequency,
+    SUM(waiting_time_hours) AS waiting_time_sum_hours,
+    COUNT(waiting_time_hours) AS waiting_time_count,
+    MIN(event_order) AS first_seen
+FROM
+    ordered_events
+GROUP BY
+    process_type,
+    case_start_at::date,
+    case_start_at = case_start_at::date,
+    case_end_at::date,
+    case_end_at = case_end_at::date,
+    activity,
+    next_activity
@@ -1,16 +1,39 @@
 -- Fact table: Event Log
 -- Transforms all process events into standard event log format for process mining
 -- Enriched with organizational information (employee and department)
+-- Incremental: only rows that are not yet in the table, or whose resource or employee/department
+-- attributes changed (e.g. after editing the master seeds), are processed.
+-- New rows are matched on (process_type, case_id, timestamp, activity) rather than on a timestamp
+-- watermark, so late-arriving events for existing cases are picked up as well.
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['process_type', 'case_id', 'timestamp', 'activity'],
+        post_hook=[
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_fct_event_log_key ON {{ this }} (process_type, case_id, timestamp, activity)"
+        ]
+    )
+}}
 
-WITH event_log AS (
+WITH enriched_events AS (
     SELECT
-        process_type,
-        case_id,
-        activity,
-        timestamp,
-        resource AS employee_id
+        s.process_type,
+        s.case_id,
+        s.activity,
+        s.timestamp,
+        s.resource,
+        emp.employee_id,
+        emp.employee_name,
+        emp.role,
+        emp.department_id,
+        dept.department_name,
+        dept.department_type,
+        dept.parent_department_id
     FROM
-        {{ ref('stg_all_events') }}
+        {{ ref('stg_all_events') }} s
+        LEFT JOIN {{ ref('master_employees') }} emp ON s.resource = emp.employee_id
+        LEFT JOIN {{ ref('master_departments') }} dept ON emp.department_id = dept.department_id
 )
 
 SELECT
@@ -18,19 +41,31 @@ SELECT
     e.case_id,
     e.activity,
     e.timestamp,
-    e.employee_id AS resource,
-    emp.employee_id,
-    emp.employee_name,
-    emp.role,
-    emp.department_id,
-    dept.department_name,
-    dept.department_type,
-    dept.parent_department_id
+    e.resource,
+    e.employee_id,
+    e.employee_name,
+    e.role,
+    e.department_id,
+    e.department_name,
+    e.department_type,
+    e.parent_department_id
 FROM
-    event_log e
-    LEFT JOIN {{ ref('master_employees') }} emp ON e.employee_id = emp.employee_id
-    LEFT JOIN {{ ref('master_departments') }} dept ON emp.department_id = dept.department_id
-ORDER BY
-    e.process_type,
-    e.case_id,
-    e.timestamp
+    enriched_events e
+{% if is_incremental() %}
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM {{ this }} t
+    WHERE t.process_type = e.process_type
+      AND t.case_id = e.case_id
+      AND t.timestamp = e.timestamp
+      AND t.activity = e.activity
+      AND t.resource IS NOT DISTINCT FROM e.resource
+      AND t.employee_id IS NOT DISTINCT FROM e.employee_id
+      AND t.employee_name IS NOT DISTINCT FROM e.employee_name
+      AND t.role IS NOT DISTINCT FROM e.role
+      AND t.department_id IS NOT DISTINCT FROM e.department_id
+      AND t.department_name IS NOT DISTINCT FROM e.department_name
+      AND t.department_type IS NOT DISTINCT FROM e.department_type
+      AND t.parent_department_id IS NOT DISTINCT FROM e.parent_department_id
+)
+{% endif %}